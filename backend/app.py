@@ -3,20 +3,36 @@ FastAPI backend for CV2Profile application
 Handles file upload, AI extraction, and export functionality
 """
 
+import asyncio
 import os
+import json
+import time
 import uuid
 import tempfile
 import shutil
-from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
-from fastapi import FastAPI, UploadFile, File, HTTPException, Form
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 import uvicorn
 from dotenv import load_dotenv
 
-from core.extractor import extract_cv_data
+from core.extractor import EXTRACTION_MODE, EXTRACTION_MODES, extract_cv_data, stream_cv_data
+from core.extraction_cache import get_extraction_cache
+from core.openai_pool import get_client_pool, close_client_pool
+from core.resilience import get_resilient_caller
+from core.rate_limiter import get_rate_limiter
+from core.endpoints import endpoints_configured, get_endpoint_pool, reset_endpoint_pools
+from core.cascade import get_cascade_stats
+from core.jobs import Job, JobManager, QueueFullError
+from core.batch import run_bounded, unpack_zip
+from core.pdf_text import shutdown_pdf_executor
+from core.session_store import SessionReaper, close_session_store, get_job_store, get_session_store
+from core.blob_store import BlobCollector, close_blob_store, get_blob_store
+from core.upload_spool import SpooledForm, SpooledUpload, UploadTooLarge, spool_form, sweep_spool
+from core.render_cache import get_render_cache, render_key
 from core.template_renderer import render_profile_html
 from core.exporters import ProfileExporter
 
@@ -34,26 +50,154 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# In-memory session storage (replace with Redis in production)
-sessions: Dict[str, Dict[str, Any]] = {}
+# Upload limits
+ALLOWED_CONTENT_TYPES = ["application/pdf", "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+                         "image/jpeg", "image/png"]
+ALLOWED_EXTENSIONS = ["pdf", "docx", "jpg", "jpeg", "png"]
+MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+# Allowance for multipart boundaries and form fields in single-file uploads
+UPLOAD_FORM_OVERHEAD = 64 * 1024
+SINGLE_UPLOAD_PATHS = ("/api/upload", "/api/upload/stream")
+BATCH_UPLOAD_PATH = "/api/upload/batch"
 
-# Cleanup old sessions every hour
-def cleanup_sessions():
-    """Remove sessions older than 1 hour"""
-    current_time = datetime.now()
-    expired_sessions = []
+# Batch upload limits
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "5"))
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "20"))
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "200"))
+# Total decompressed size of the files in one ZIP archive
+BATCH_MAX_UNPACKED_SIZE = int(os.getenv("BATCH_MAX_UNPACKED_SIZE", str(500 * 1024 * 1024)))
+# Request body size of one batch upload (all files and ZIP archives together)
+BATCH_MAX_UPLOAD_SIZE = int(os.getenv("BATCH_MAX_UPLOAD_SIZE", str(MAX_FILE_SIZE * BATCH_MAX_FILES)))
+
+def form_body(files: Dict[str, Any], fields: Dict[str, Any]) -> Dict[str, Any]:
+    """OpenAPI request body of an upload route (the routes parse the form themselves)"""
+    properties = {name: {"type": "string", "format": "binary"} for name in files}
+    if "files" in properties:
+        properties["files"] = {"type": "array", "items": properties["files"]}
+    properties.update(fields)
+    return {"requestBody": {"required": True, "content": {"multipart/form-data": {
+        "schema": {"type": "object", "properties": properties, "required": list(files)}
+    }}}}
+
+def get_file_type(filename: str) -> Optional[str]:
+    """Map a file name to the extractor file type, None if unsupported"""
+    file_extension = filename.split(".")[-1].lower()
+    if file_extension == "pdf":
+        return "pdf"
+    elif file_extension == "docx":
+        return "docx"
+    elif file_extension in ["jpg", "jpeg"]:
+        return "jpg"
+    elif file_extension == "png":
+        return "png"
+    return None
+
+def validate_mode(mode: Optional[str]) -> Optional[str]:
+    """Check an optional extraction mode form field (single, split, fast, cascade)"""
+    if mode and mode not in EXTRACTION_MODES:
+        raise HTTPException(status_code=400, detail=f"Unsupported mode (use one of: {', '.join(EXTRACTION_MODES)})")
+    return mode or None
+
+# Sessions live in the configured store (SESSION_STORE: memory, sqlite, redis)
+# so they are shared between workers and survive restarts
+def remove_session_files(session_data: Dict[str, Any]) -> int:
+    """
+    Release the upload and exports of a session, returns the bytes released
+    (files no other session references are deleted by the blob collector)
+    """
+    released = get_blob_store().release(session_data["id"])
+    # Sessions from before the blob store kept their upload in temp/
+    temp_file = session_data.get("temp_file")
+    if temp_file and os.path.exists(temp_file):
+        released += os.path.getsize(temp_file)
+        os.remove(temp_file)
+    return released
+
+# Expired sessions (SESSION_TTL, sliding on access) are removed by a background
+# task in batches, not during uploads
+session_reaper = SessionReaper(remove_session_files)
+# Job status records (own namespace) expire after JOB_RESULT_TTL; they hold no files
+job_status_reaper = SessionReaper(lambda record: 0, namespace="job")
+
+# Uploads and exports are stored once per content hash (temp/blobs) with a disk
+# quota; unreferenced files (and stale upload spool files) are deleted in the background
+blob_collector = BlobCollector(sweep=sweep_spool)
+
+async def load_session(session_id: str) -> Dict[str, Any]:
+    """Session data or 404 (the store is read in a worker thread)"""
+    session_data = await asyncio.to_thread(get_session_store().get, session_id)
+    if session_data is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return session_data
+
+def create_session(company: str, filename: str, extracted_data: Dict[str, Any], upload: SpooledUpload) -> str:
+    """
+    Store an extracted CV as a new editing session and return its id
+    (blocking file and store I/O, call via asyncio.to_thread)
+    """
+    session_id = str(uuid.uuid4())
     
-    for session_id, session_data in sessions.items():
-        if current_time - session_data.get("created_at", current_time) > timedelta(hours=1):
-            expired_sessions.append(session_id)
+    # The spooled upload moves into the blob store (identical files are kept once)
+    blob_store = get_blob_store()
+    blob_store.put_file(upload.path, upload.sha256)
+    blob_store.acquire(session_id, "upload", upload.sha256)
+    
+    # Store session data
+    get_session_store().put(session_id, {
+        "id": session_id,
+        "company": company,
+        "original_filename": filename,
+        "extracted_data": extracted_data,
+        "created_at": datetime.now().isoformat(),
+        "upload_sha256": upload.sha256
+    })
+    
+    return session_id
+
+async def extract_upload(upload: SpooledUpload, file_type: str, openai_key: Optional[str],
+                         **options) -> Dict[str, Any]:
+    """Run AI extraction on a spooled upload (memory-mapped, hash known from ingestion)"""
+    with upload.mapped() as file_bytes:
+        return await extract_cv_data(file_bytes, file_type, openai_key, content_hash=upload.sha256, **options)
+
+async def process_upload_job(job: Job) -> Dict[str, Any]:
+    """Run AI extraction for a queued upload and create its session"""
+    payload = job.payload
+    upload: SpooledUpload = payload["upload"]
+    try:
+        extracted_data = await extract_upload(
+            upload, payload["file_type"], payload["openai_key"],
+            on_progress=job.progress, mode=payload.get("mode")
+        )
+        session_id = await asyncio.to_thread(
+            create_session, payload["company"], payload["filename"], extracted_data, upload
+        )
+    except BaseException:
+        upload.discard()
+        raise
     
-    for session_id in expired_sessions:
-        # Clean up temporary files
-        if "temp_file" in sessions[session_id]:
-            temp_file = sessions[session_id]["temp_file"]
-            if os.path.exists(temp_file):
-                os.remove(temp_file)
-        del sessions[session_id]
+    return {
+        "session_id": session_id,
+        "extracted_data": extracted_data,
+        "company": payload["company"],
+        "message": "CV uploaded and processed successfully"
+    }
+
+def discard_job_upload(job: Job):
+    """Delete the spooled upload of a job that will never run"""
+    job.payload["upload"].discard()
+
+# Background extraction workers (bounded concurrency). Job status is mirrored
+# to the job namespace of the session store, so with SESSION_STORE=sqlite/redis
+# any worker answers polls
+job_manager = JobManager(
+    process_upload_job,
+    workers=int(os.getenv("JOB_WORKERS", "4")),
+    max_queue=int(os.getenv("JOB_MAX_QUEUE", "100")),
+    result_ttl=float(os.getenv("JOB_RESULT_TTL", "3600")),
+    discard=discard_job_upload,
+    store=get_job_store
+)
 
 @app.on_event("startup")
 async def startup_event():
@@ -61,100 +205,408 @@ async def startup_event():
     # Create necessary directories
     os.makedirs("temp", exist_ok=True)
     os.makedirs("static", exist_ok=True)
+    # Spool files left behind by a crashed worker
+    await asyncio.to_thread(sweep_spool)
+    
+    # Shared OpenAI connection pool for all uploads
+    get_client_pool()
+    
+    await job_manager.start()
+    await session_reaper.start()
+    await job_status_reaper.start()
+    await blob_collector.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release shared resources"""
+    await session_reaper.stop()
+    await job_status_reaper.stop()
+    await blob_collector.stop()
+    await job_manager.stop()
+    await close_client_pool()
+    reset_endpoint_pools()
+    shutdown_pdf_executor()
+    close_session_store()
+    close_blob_store()
+
+@app.middleware("http")
+async def limit_upload_size(request, call_next):
+    """Reject uploads by their Content-Length before the body is read"""
+    if request.method == "POST" and request.url.path in (*SINGLE_UPLOAD_PATHS, BATCH_UPLOAD_PATH):
+        content_length = request.headers.get("content-length")
+        if request.url.path == BATCH_UPLOAD_PATH:
+            limit, detail = BATCH_MAX_UPLOAD_SIZE, f"Upload too large (max {BATCH_MAX_UPLOAD_SIZE // (1024 * 1024)}MB)"
+        else:
+            limit, detail = MAX_FILE_SIZE + UPLOAD_FORM_OVERHEAD, "File too large (max 10MB)"
+        if content_length and content_length.isdigit() and int(content_length) > limit:
+            return JSONResponse(status_code=413, content={"detail": detail})
+    return await call_next(request)
 
 @app.get("/")
 async def root():
     """Health check endpoint"""
     return {"message": "CV2Profile API is running", "version": "1.0.0"}
 
-@app.post("/api/upload")
-async def upload_cv(
-    file: UploadFile = File(...),
-    company: str = Form("galdora")
-):
+@app.get("/api/cache/stats")
+async def cache_stats():
     """
-    Upload CV file and extract data using AI
+    Extraction cache statistics (hits, misses, size)
     """
+    cache = get_extraction_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+@app.get("/api/render-cache/stats")
+async def render_cache_stats():
+    """
+    Render cache statistics for previews and exports (hits, misses, hit ratio, size)
+    """
+    cache = get_render_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+@app.get("/api/openai/stats")
+async def openai_stats():
+    """
+    OpenAI call metrics: connection pool, endpoints, retries, hedging,
+    circuit breaker, latency, rate limit buckets, model cascade
+    """
+    rate_limiter = get_rate_limiter()
+    resilience = get_resilient_caller().stats()
     try:
+        pool = get_endpoint_pool()
+    except ValueError:
+        endpoints = None
+    else:
+        endpoints = pool.stats()
+        # Extraction calls are guarded by the per-endpoint breakers
+        resilience["breaker"] = pool.breaker_stats()
+    return {
+        "pool": get_client_pool().stats(),
+        "endpoints": endpoints,
+        "resilience": resilience,
+        "rate_limit": rate_limiter.stats() if rate_limiter is not None else {"enabled": False},
+        "cascade": get_cascade_stats().stats()
+    }
+
+async def read_form(request: Request, max_bytes: int, file_limit, max_files: int = 1) -> SpooledForm:
+    """
+    Parse a multipart upload while it arrives; file parts are spooled to disk
+    in chunks and dropped once over file_limit(filename), the request is
+    rejected as soon as the body exceeds max_bytes. The caller owns the spool files.
+    """
+    try:
+        return await spool_form(request.stream(), request.headers.get("content-type", ""), max_bytes,
+                                file_limit, max_files=max_files)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid upload: {str(e)}")
+
+async def read_upload(request: Request) -> Tuple[SpooledUpload, str, str, Dict[str, str], Optional[str]]:
+    """
+    Read a single CV upload (form field `file`, spooled to disk in chunks,
+    stops at 10MB) and validate it, return (upload, file_type, openai_key,
+    form fields, mode). The caller owns the spool file.
+    """
+    # Get OpenAI API key
+    openai_key = os.getenv("OPENAI_API_KEY")
+    if not openai_key and not endpoints_configured():
+        raise HTTPException(status_code=500, detail="OpenAI API key not configured")
+    
+    form = await read_form(request, MAX_FILE_SIZE + UPLOAD_FORM_OVERHEAD, lambda filename: MAX_FILE_SIZE)
+    try:
+        file = next((part for part in form.files if part.field == "file"), None)
+        if file is None:
+            raise HTTPException(status_code=400, detail="No file uploaded")
+        mode = validate_mode(form.get("mode"))
+        
         # Validate file type
-        allowed_types = ["application/pdf", "application/vnd.openxmlformats-officedocument.wordprocessingml.document", 
-                        "image/jpeg", "image/png"]
-        if file.content_type not in allowed_types:
+        if file.content_type not in ALLOWED_CONTENT_TYPES:
             raise HTTPException(status_code=400, detail="Unsupported file type")
         
-        # Validate file size (10MB max)
-        file_bytes = await file.read()
-        if len(file_bytes) > 10 * 1024 * 1024:
-            raise HTTPException(status_code=400, detail="File too large (max 10MB)")
-        
-        # Get OpenAI API key
-        openai_key = os.getenv("OPENAI_API_KEY")
-        if not openai_key:
-            raise HTTPException(status_code=500, detail="OpenAI API key not configured")
-        
         # Determine file type
-        file_extension = file.filename.split(".")[-1].lower()
-        if file_extension == "pdf":
-            file_type = "pdf"
-        elif file_extension == "docx":
-            file_type = "docx"
-        elif file_extension in ["jpg", "jpeg"]:
-            file_type = "jpg"
-        elif file_extension == "png":
-            file_type = "png"
-        else:
+        file_type = get_file_type(file.filename)
+        if file_type is None:
             raise HTTPException(status_code=400, detail="Unsupported file extension")
         
-        # Extract CV data using AI
-        extracted_data = await extract_cv_data(file_bytes, file_type, openai_key)
-        
-        # Create session
-        session_id = str(uuid.uuid4())
-        
-        # Save file temporarily
-        temp_file = f"temp/{session_id}_{file.filename}"
-        with open(temp_file, "wb") as f:
-            f.write(file_bytes)
-        
-        # Store session data
-        sessions[session_id] = {
-            "id": session_id,
-            "company": company,
-            "original_filename": file.filename,
-            "extracted_data": extracted_data,
-            "created_at": datetime.now(),
-            "temp_file": temp_file
-        }
+        # Validate file size (10MB max), checked while reading
+        if file.too_large:
+            raise HTTPException(status_code=400, detail="File too large (max 10MB)")
+    except BaseException:
+        form.discard()
+        raise
+    
+    return file.upload, file_type, openai_key, form.fields, mode
+
+SINGLE_UPLOAD_FORM = form_body(["file"], {"company": {"type": "string", "default": "galdora"},
+                                         "mode": {"type": "string", "enum": list(EXTRACTION_MODES)}})
+
+@app.post("/api/upload", openapi_extra=SINGLE_UPLOAD_FORM)
+async def upload_cv(request: Request):
+    """
+    Upload CV file and queue it for AI extraction.
+    Returns 202 with a job id; poll /api/jobs/{job_id} for the result.
+    mode=fast returns rule-based results without a structuring call (triage)
+    """
+    try:
+        upload, file_type, openai_key, fields, mode = await read_upload(request)
         
-        # Cleanup old sessions
-        cleanup_sessions()
+        # Queue extraction; the worker creates the session when done
+        try:
+            job = job_manager.submit({
+                "upload": upload,
+                "file_type": file_type,
+                "filename": upload.filename,
+                "company": fields.get("company", "galdora"),
+                "openai_key": openai_key,
+                "mode": mode
+            })
+        except BaseException:
+            upload.discard()
+            raise
         
-        return {
-            "session_id": session_id,
-            "extracted_data": extracted_data,
-            "company": company,
-            "message": "CV uploaded and processed successfully"
-        }
+        return JSONResponse(status_code=202, content={
+            "job_id": job.id,
+            "status": job.status,
+            "status_url": f"/api/jobs/{job.id}",
+            "events_url": f"/api/jobs/{job.id}/events",
+            "message": "CV uploaded, extraction queued"
+        })
         
     except HTTPException:
         raise
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
 
+@app.post("/api/upload/stream", openapi_extra=SINGLE_UPLOAD_FORM)
+async def upload_cv_stream(request: Request):
+    """
+    Upload CV file and stream the extraction as Server-Sent Events.
+    Sends a `section` event for each top-level section (personal, experience,
+    education, skills, certifications) as soon as the model has produced it,
+    then a `done` event with the new session id.
+    """
+    upload, file_type, openai_key, fields, mode = await read_upload(request)
+    company = fields.get("company", "galdora")
+    
+    def sse(event: str, data: Dict[str, Any]) -> str:
+        return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    
+    async def event_stream():
+        session_id = None
+        try:
+            with upload.mapped() as file_bytes:
+                async for section, value in stream_cv_data(file_bytes, file_type, openai_key, mode=mode,
+                                                           content_hash=upload.sha256):
+                    if section is not None:
+                        yield sse("section", {"section": section, "data": value})
+                        continue
+                    
+                    session_id = await asyncio.to_thread(create_session, company, upload.filename, value, upload)
+                    yield sse("done", {
+                        "session_id": session_id,
+                        "extracted_data": value,
+                        "company": company,
+                        "message": "CV uploaded and processed successfully"
+                    })
+        except Exception as e:
+            yield sse("error", {"detail": f"Error processing file: {str(e)}"})
+        finally:
+            # Failed or client gone before the session took over the file
+            if session_id is None:
+                upload.discard()
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+@app.post("/api/upload/batch", openapi_extra=form_body(["files"], {
+    "company": {"type": "string", "default": "galdora"},
+    "concurrency": {"type": "integer", "default": BATCH_CONCURRENCY},
+    "mode": {"type": "string", "enum": list(EXTRACTION_MODES)}
+}))
+async def upload_batch(request: Request):
+    """
+    Upload many CV files (or ZIP archives of CVs) and extract them in parallel.
+    Streams one NDJSON line per file as soon as it finishes, then a summary line.
+    Each successfully extracted file gets its own session.
+    """
+    openai_key = os.getenv("OPENAI_API_KEY")
+    if not openai_key and not endpoints_configured():
+        raise HTTPException(status_code=500, detail="OpenAI API key not configured")
+    
+    def file_limit(filename: str) -> int:
+        return BATCH_MAX_UPLOAD_SIZE if filename.lower().endswith(".zip") else MAX_FILE_SIZE
+    
+    form = await read_form(request, BATCH_MAX_UPLOAD_SIZE, file_limit, max_files=BATCH_MAX_FILES)
+    
+    # Collect (filename, spooled upload, error) for every file, unpacking ZIP archives
+    items = []
+    pending = []
+    
+    def spooled(upload: SpooledUpload) -> SpooledUpload:
+        pending.append(upload)
+        return upload
+    
+    try:
+        mode = validate_mode(form.get("mode"))
+        company = form.get("company", "galdora")
+        try:
+            concurrency = int(form.get("concurrency", BATCH_CONCURRENCY))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="concurrency must be an integer")
+        
+        for part in form.files:
+            if part.field != "files":
+                continue
+            file_type = get_file_type(part.filename)
+            if part.filename.lower().endswith(".zip"):
+                if part.too_large:
+                    raise HTTPException(status_code=400, detail=f"{part.filename}: File too large "
+                                                                f"(max {BATCH_MAX_UPLOAD_SIZE // (1024 * 1024)}MB)")
+                try:
+                    with part.upload.mapped() as zip_bytes:
+                        archive_files = await asyncio.to_thread(
+                            unpack_zip, zip_bytes, ALLOWED_EXTENSIONS, MAX_FILE_SIZE, BATCH_MAX_FILES,
+                            BATCH_MAX_UNPACKED_SIZE
+                        )
+                except ValueError as e:
+                    raise HTTPException(status_code=400, detail=f"{part.filename}: {str(e)}")
+                finally:
+                    part.upload.discard()
+                items.extend((member.filename, spooled(member), None) for member in archive_files)
+            elif file_type is None:
+                items.append((part.filename, None, "Unsupported file extension"))
+            elif part.too_large:
+                items.append((part.filename, None, "File too large (max 10MB)"))
+            else:
+                items.append((part.filename, spooled(part.upload), None))
+        
+        if not items:
+            raise HTTPException(status_code=400, detail="No supported files in upload")
+        if len(items) > BATCH_MAX_FILES:
+            raise HTTPException(status_code=400, detail=f"Too many files (max {BATCH_MAX_FILES})")
+    except BaseException:
+        for upload in pending:
+            upload.discard()
+        form.discard()
+        raise
+    # Parts that did not become an item (unsupported extension, other fields)
+    for part in form.files:
+        if part.upload is not None and part.upload not in pending:
+            part.upload.discard()
+    
+    concurrency = max(1, min(concurrency, BATCH_MAX_CONCURRENCY))
+    
+    async def extract_one(index: int, item) -> Dict[str, Any]:
+        filename, upload, error = item
+        result = {"index": index, "filename": filename}
+        if error:
+            return {**result, "status": "failed", "error": error, "duration": 0.0}
+        
+        start = time.perf_counter()
+        try:
+            extracted_data = await extract_upload(upload, get_file_type(filename), openai_key, mode=mode)
+            session_id = await asyncio.to_thread(create_session, company, filename, extracted_data, upload)
+            # The session owns the file now
+            pending.remove(upload)
+            result.update(status="completed", session_id=session_id, extracted_data=extracted_data)
+        except Exception as e:
+            result.update(status="failed", error=str(e))
+        result["duration"] = round(time.perf_counter() - start, 3)
+        return result
+    
+    async def result_stream():
+        start = time.perf_counter()
+        completed = 0
+        failed = 0
+        try:
+            async for result in run_bounded(items, extract_one, concurrency):
+                if result["status"] == "completed":
+                    completed += 1
+                else:
+                    failed += 1
+                yield json.dumps(result, ensure_ascii=False) + "\n"
+        finally:
+            # Failed files and files not reached (client disconnected)
+            for upload in pending:
+                upload.discard()
+        
+        yield json.dumps({
+            "event": "summary",
+            "total": len(items),
+            "completed": completed,
+            "failed": failed,
+            "company": company,
+            "concurrency": concurrency,
+            "mode": mode or EXTRACTION_MODE,
+            "duration": round(time.perf_counter() - start, 3)
+        }) + "\n"
+    
+    return StreamingResponse(result_stream(), media_type="application/x-ndjson")
+
+@app.get("/api/jobs/stats")
+async def job_stats():
+    """
+    Job queue metrics (queue depth, wait time, run time) and expiry of the
+    shared job status records
+    """
+    return {**job_manager.stats(), "status_expiry": job_status_reaper.stats()}
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Get extraction job status (and result once completed)
+    """
+    status = await asyncio.to_thread(job_manager.lookup, job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return status
+
+@app.get("/api/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """
+    Stream job progress as Server-Sent Events until the job finishes
+    """
+    if await asyncio.to_thread(job_manager.lookup, job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    async def event_stream():
+        async for event in job_manager.subscribe(job_id):
+            yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+@app.get("/api/sessions/stats")
+async def session_stats():
+    """
+    Session store backend, number of stored sessions and expiry counters
+    (expired sessions, reclaimed bytes)
+    """
+    return {**await asyncio.to_thread(get_session_store().stats), "expiry": session_reaper.stats()}
+
+@app.get("/api/blobs/stats")
+async def blob_stats():
+    """
+    Blob store usage (files, bytes, quota, references, deduplicated writes)
+    and background collection counters
+    """
+    return {**get_blob_store().stats(), "collector": blob_collector.stats()}
+
 @app.get("/api/session/{session_id}")
 async def get_session(session_id: str):
     """
     Get session data
     """
-    if session_id not in sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    session_data = sessions[session_id]
+    session_data = await load_session(session_id)
     return {
         "session_id": session_id,
         "company": session_data["company"],
         "extracted_data": session_data["extracted_data"],
-        "created_at": session_data["created_at"].isoformat()
+        "created_at": session_data["created_at"]
     }
 
 @app.put("/api/session/{session_id}")
@@ -165,54 +617,70 @@ async def update_session(
     """
     Update session data (for editing)
     """
-    if session_id not in sessions:
+    if await asyncio.to_thread(get_session_store().patch, session_id, {"extracted_data": extracted_data}) is None:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    sessions[session_id]["extracted_data"] = extracted_data
+    # Renderings of the previous data are stale now
+    cache = get_render_cache()
+    if cache is not None:
+        cache.invalidate(session_id)
+    
     return {"message": "Session updated successfully"}
 
+def render_cached(session_id: str, session_data: Dict[str, Any], kind: str, render, **options):
+    """
+    Rendered output of a session from the render cache, rendered with
+    render(extracted_data, company, **options) on a miss
+    """
+    extracted_data = session_data["extracted_data"]
+    company = session_data["company"]
+    cache = get_render_cache()
+    if cache is None:
+        return render(extracted_data, company, **options)
+    
+    key = render_key(kind, extracted_data, company, **options)
+    rendered = cache.get(key, session_id)
+    if rendered is None:
+        rendered = render(extracted_data, company, **options)
+        cache.put(key, rendered, session_id)
+    return rendered
+
 @app.post("/api/generate-preview/{session_id}")
 async def generate_preview(session_id: str):
     """
     Generate HTML preview for the profile
     """
-    if session_id not in sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    session_data = sessions[session_id]
-    extracted_data = session_data["extracted_data"]
-    company = session_data["company"]
+    session_data = await load_session(session_id)
     
     try:
-        html_content = render_profile_html(extracted_data, company)
+        html_content = render_cached(session_id, session_data, "html", render_profile_html, template_type="modern")
         return HTMLResponse(content=html_content)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating preview: {str(e)}")
 
+def store_export(session_id: str, name: str, content: bytes) -> str:
+    """Keep an export in the blob store as the session's `name`, returns its path"""
+    blob_store = get_blob_store()
+    sha256 = blob_store.put_bytes(content)
+    # Replaces the previous export of this kind; the old file becomes garbage
+    blob_store.acquire(session_id, name, sha256)
+    return blob_store.path(sha256)
+
 @app.post("/api/export/pdf/{session_id}")
 async def export_pdf(session_id: str):
     """
     Export profile as PDF
     """
-    if session_id not in sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    session_data = sessions[session_id]
-    extracted_data = session_data["extracted_data"]
+    session_data = await load_session(session_id)
     company = session_data["company"]
     
     try:
-        # Generate PDF directly from data
+        # Generate PDF directly from data (or reuse the last rendering of the same data)
         exporter = ProfileExporter()
-        pdf_bytes = exporter.generate_pdf_from_data(extracted_data, company)
-        
-        # Save temporary PDF
-        temp_pdf = f"temp/{session_id}_profile.pdf"
-        with open(temp_pdf, "wb") as f:
-            f.write(pdf_bytes)
+        pdf_bytes = render_cached(session_id, session_data, "pdf", exporter.generate_pdf_from_data, template="modern")
         
         return FileResponse(
-            temp_pdf,
+            store_export(session_id, "export.pdf", pdf_bytes),
             media_type="application/pdf",
             filename=f"profile_{company}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
         )
@@ -225,25 +693,16 @@ async def export_docx(session_id: str):
     """
     Export profile as DOCX
     """
-    if session_id not in sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    session_data = sessions[session_id]
-    extracted_data = session_data["extracted_data"]
+    session_data = await load_session(session_id)
     company = session_data["company"]
     
     try:
-        # Generate DOCX
+        # Generate DOCX (or reuse the last rendering of the same data)
         exporter = ProfileExporter()
-        docx_bytes = exporter.generate_docx(extracted_data, company)
-        
-        # Save temporary DOCX
-        temp_docx = f"temp/{session_id}_profile.docx"
-        with open(temp_docx, "wb") as f:
-            f.write(docx_bytes)
+        docx_bytes = render_cached(session_id, session_data, "docx", exporter.generate_docx)
         
         return FileResponse(
-            temp_docx,
+            store_export(session_id, "export.docx", docx_bytes),
             media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
             filename=f"profile_{company}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.docx"
         )
@@ -256,17 +715,15 @@ async def delete_session(session_id: str):
     """
     Delete session and cleanup files
     """
-    if session_id not in sessions:
+    session_data = await asyncio.to_thread(get_session_store().delete, session_id)
+    if session_data is None:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    session_data = sessions[session_id]
-    
-    # Clean up temporary files
-    if "temp_file" in session_data and os.path.exists(session_data["temp_file"]):
-        os.remove(session_data["temp_file"])
-    
-    # Remove session
-    del sessions[session_id]
+    # Clean up temporary files and cached renderings
+    await asyncio.to_thread(remove_session_files, session_data)
+    cache = get_render_cache()
+    if cache is not None:
+        cache.invalidate(session_id)
     
     return {"message": "Session deleted successfully"}
 
@@ -0,0 +1 @@
+# CV2Profile Benchmarks
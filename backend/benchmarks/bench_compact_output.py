@@ -0,0 +1,76 @@
+"""
+Benchmark: verbose vs compact output schema for the structuring call
+
+The mock server's latency grows with the generated output, like a real model.
+The verbose schema repeats every key per entry (models mirror the indented
+example in the prompt); the compact schema uses short keys and positional
+arrays. Output tokens are counted with the local tokenizer (core.compaction;
+without tiktoken the estimate ignores whitespace, latency still reflects it).
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_compact_output --token-latency 0.02
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Any, Callable, Dict, Tuple
+
+from benchmarks.mock_openai_server import MockOpenAIServer
+from benchmarks.bench_split_extraction import SAMPLE_TEXT, larger_cv
+from core.compaction import count_tokens
+from core.extractor import CVExtractor
+from resources.extraction_rules import encode_compact_output
+
+# Measure extraction, not the shared OpenAI quota (core.rate_limiter)
+os.environ.setdefault("OPENAI_RATE_LIMIT_ENABLED", "false")
+
+
+def responder(data: Dict[str, Any], encode: Callable[[Dict[str, Any]], str], sizes: list):
+    def respond(body):
+        content = encode(data)
+        sizes.append(count_tokens(content))
+        return content
+    return respond
+
+
+async def run(base_url: str, compact: bool) -> Tuple[float, Dict[str, Any]]:
+    extractor = CVExtractor("mock", base_url=base_url, mode="single", compact_output=compact)
+    start = time.perf_counter()
+    result = await extractor._structure_with_openai(SAMPLE_TEXT)
+    elapsed = time.perf_counter() - start
+    await extractor.aclose()
+    return elapsed, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.3, help="time to first token (s)")
+    parser.add_argument("--token-latency", type=float, default=0.02, help="seconds per output token")
+    parser.add_argument("--entries", type=int, default=6, help="experience entries in the sample CV")
+    args = parser.parse_args()
+
+    data = larger_cv(args.entries)
+    variants = [
+        ("verbose, indented", False, lambda d: json.dumps(d, ensure_ascii=False, indent=4)),
+        ("verbose, minified", False, lambda d: json.dumps(d, ensure_ascii=False, separators=(",", ":"))),
+        ("compact", True,
+         lambda d: json.dumps(encode_compact_output(d), ensure_ascii=False, separators=(",", ":"))),
+    ]
+
+    baseline = None
+    for name, compact, encode in variants:
+        sizes = []
+        with MockOpenAIServer(latency=args.latency, token_latency=args.token_latency,
+                              responder=responder(data, encode, sizes)) as server:
+            elapsed, result = asyncio.run(run(server.base_url, compact))
+        assert {section: result[section] for section in data} == data, f"{name}: decoded result differs"
+        baseline = baseline or (sizes[0], elapsed)
+        print(f"{name:<20} output tokens {sizes[0]:>5} ({sizes[0] / baseline[0]:4.0%})  "
+              f"latency {elapsed:5.2f}s ({elapsed / baseline[1]:4.0%})")
+
+
+if __name__ == "__main__":
+    main()
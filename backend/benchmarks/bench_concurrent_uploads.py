@@ -0,0 +1,74 @@
+"""
+Benchmark: concurrent extractions against the local mock OpenAI server
+
+Compares the old pattern (synchronous OpenAI client called inside a coroutine,
+which blocks the event loop) with the async CVExtractor. With N concurrent
+uploads the blocking variant takes ~N x latency, the async one ~1 x latency.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_concurrent_uploads --uploads 10 --latency 0.5
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+from openai import OpenAI
+
+from benchmarks.mock_openai_server import MockOpenAIServer
+from core.extractor import CVExtractor, STRUCTURING_MODEL
+
+# Measure extraction, not the shared OpenAI quota (core.rate_limiter)
+os.environ.setdefault("OPENAI_RATE_LIMIT_ENABLED", "false")
+
+SAMPLE_TEXT = "Max Mustermann\nBerlin\nSenior Developer bei Beispiel GmbH 01/2020 - Heute"
+
+
+async def run_blocking(base_url: str, uploads: int) -> float:
+    """Old behaviour: sync client inside an async function"""
+    client = OpenAI(api_key="mock", base_url=base_url, http_client=httpx.Client())
+
+    async def one_upload():
+        client.chat.completions.create(
+            model=STRUCTURING_MODEL,
+            messages=[{"role": "user", "content": SAMPLE_TEXT}],
+        )
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one_upload() for _ in range(uploads)))
+    elapsed = time.perf_counter() - start
+    client.close()
+    return elapsed
+
+
+async def run_async(base_url: str, uploads: int) -> float:
+    """New behaviour: awaitable AsyncOpenAI calls overlap"""
+    extractor = CVExtractor("mock", base_url=base_url)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(extractor._structure_with_openai(SAMPLE_TEXT) for _ in range(uploads)))
+    elapsed = time.perf_counter() - start
+    await extractor.aclose()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.5)
+    args = parser.parse_args()
+
+    with MockOpenAIServer(latency=args.latency) as server:
+        blocking = asyncio.run(run_blocking(server.base_url, args.uploads))
+        non_blocking = asyncio.run(run_async(server.base_url, args.uploads))
+
+    print(f"{args.uploads} concurrent uploads, mock latency {args.latency:.2f}s")
+    print(f"  blocking (sync client): {blocking:6.2f}s")
+    print(f"  async client:           {non_blocking:6.2f}s")
+    print(f"  speedup:                {blocking / non_blocking:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
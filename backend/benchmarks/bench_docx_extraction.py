@@ -0,0 +1,133 @@
+"""
+Benchmark: streaming DOCX reader vs python-docx paragraphs
+
+Generates CV-like documents (header with contact data, tables for the
+stations, footer) of increasing size and compares core.docx_text with the
+previous implementation (python-docx object model, body paragraphs only)
+and a python-docx reader with the same coverage (tables, headers, footers):
+time, peak memory (RSS growth in a fresh process, covers lxml as well) and
+the number of characters found.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_docx_extraction [--stations 10 200 2000] [--runs 5]
+"""
+
+import argparse
+import io
+import multiprocessing
+import resource
+import statistics
+import time
+from typing import Callable, Dict, Tuple
+
+from docx import Document
+from docx.oxml.ns import qn
+from docx.table import Table
+from docx.text.paragraph import Paragraph
+
+from core.docx_text import extract_docx_text
+
+
+def python_docx_text(file_bytes: bytes) -> str:
+    """Previous implementation: body paragraphs via the python-docx object model"""
+    doc = Document(io.BytesIO(file_bytes))
+    text = ""
+    for paragraph in doc.paragraphs:
+        text += paragraph.text + "\n"
+    return text.strip()
+
+
+def python_docx_full_text(file_bytes: bytes) -> str:
+    """python-docx with the same coverage: headers, body paragraphs and tables in order, footers"""
+    doc = Document(io.BytesIO(file_bytes))
+    lines = [paragraph.text for section in doc.sections for paragraph in section.header.paragraphs]
+    for block in doc.element.body.iterchildren():
+        if block.tag == qn("w:p"):
+            lines.append(Paragraph(block, doc).text)
+        elif block.tag == qn("w:tbl"):
+            for row in Table(block, doc).rows:
+                lines.append(" | ".join(cell.text for cell in row.cells))
+    lines += [paragraph.text for section in doc.sections for paragraph in section.footer.paragraphs]
+    return "\n".join(line for line in lines if line.strip())
+
+
+def streaming_text(file_bytes: bytes) -> str:
+    return extract_docx_text(file_bytes)[0]
+
+
+READERS: Dict[str, Callable[[bytes], str]] = {
+    "python-docx": python_docx_text,
+    "python-docx, full": python_docx_full_text,
+    "streaming": streaming_text,
+}
+
+
+def sample_docx(stations: int) -> bytes:
+    """CV layout: contact data in the header, one table row per station"""
+    doc = Document()
+    section = doc.sections[0]
+    section.header.paragraphs[0].text = "Max Mustermann · max@example.com · +49 170 1234567 · 10115 Berlin"
+    section.footer.paragraphs[0].text = "Lebenslauf Max Mustermann"
+    doc.add_heading("Lebenslauf", 0)
+    doc.add_paragraph("Erfahrener Softwareentwickler mit Schwerpunkt Backend und Cloud-Architektur.")
+    doc.add_heading("Berufserfahrung", 1)
+    table = doc.add_table(rows=0, cols=2)
+    for index in range(stations):
+        cells = table.add_row().cells
+        cells[0].text = f"{index % 12 + 1:02d}/{2000 + index % 24} - Heute"
+        cells[1].text = (
+            f"Senior Developer bei Beispiel GmbH {index}\n"
+            "Entwicklung von Microservices mit Python, FastAPI und PostgreSQL; "
+            "Einführung von CI/CD und Betreuung von Junior-Entwicklern."
+        )
+    doc.add_heading("Kenntnisse", 1)
+    doc.add_paragraph("Python, FastAPI, PostgreSQL, Docker, Kubernetes, AWS")
+    output = io.BytesIO()
+    doc.save(output)
+    return output.getvalue()
+
+
+def _measure(reader: str, file_bytes: bytes, warm_up: bytes, runs: int, queue):
+    """Child process: median time, RSS growth (KiB) and characters for one reader"""
+    function = READERS[reader]
+    function(warm_up)
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        text = function(file_bytes)
+        times.append(time.perf_counter() - start)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before
+    queue.put((statistics.median(times), peak, len(text)))
+
+
+def measure(reader: str, file_bytes: bytes, warm_up: bytes, runs: int) -> Tuple[float, int, int]:
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_measure, args=(reader, file_bytes, warm_up, runs, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stations", type=int, nargs="+", default=[10, 200, 2000])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    warm_up = sample_docx(1)
+    for stations in args.stations:
+        file_bytes = sample_docx(stations)
+        print(f"{stations} stations ({len(file_bytes) / 1024:.0f} KiB)")
+        results = {reader: measure(reader, file_bytes, warm_up, args.runs) for reader in READERS}
+        for reader, (seconds, peak_kib, chars) in results.items():
+            print(f"  {reader:<18} {seconds * 1000:8.1f} ms  peak +{peak_kib / 1024:6.1f} MiB  {chars:>8} chars")
+        streaming = results["streaming"][0]
+        print(f"  speedup {results['python-docx'][0] / streaming:.1f}x vs. previous, "
+              f"{results['python-docx, full'][0] / streaming:.1f}x vs. python-docx with the same coverage")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark: vision upload with and without image pre-processing
+
+Sends each image to the local mock OpenAI server once as the raw upload and
+once after preprocess_image(), and reports bytes, estimated vision tokens
+and request time on loopback plus the estimated transfer time at a given
+uplink bandwidth (what a recruiter's office connection sees). Without arguments a synthetic 4000px phone photo is used.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_image_preprocessing [--uplink-mbps 20] [image ...]
+"""
+
+import argparse
+import asyncio
+import base64
+import io
+import os
+import random
+import time
+
+from PIL import Image, ImageDraw
+
+from benchmarks.mock_openai_server import MockOpenAIServer
+from core.extractor import CVExtractor, VISION_MODEL
+from core.image_preprocessing import preprocess_image, sniff_mime_type
+
+# Measure extraction, not the shared OpenAI quota (core.rate_limiter)
+os.environ.setdefault("OPENAI_RATE_LIMIT_ENABLED", "false")
+
+
+def synthetic_photo(width: int = 3000, height: int = 4000) -> bytes:
+    """Noisy 'photo of a CV page' with lines of text-like strokes"""
+    image = Image.new("RGB", (width, height), (236, 232, 225))
+    draw = ImageDraw.Draw(image)
+    rng = random.Random(42)
+    for y in range(200, height - 200, 60):
+        x = 200
+        while x < width - 400:
+            word = rng.randint(40, 220)
+            draw.rectangle([x, y, x + word, y + 28], fill=(rng.randint(20, 60),) * 3)
+            x += word + rng.randint(20, 40)
+    noise = Image.effect_noise((width, height), 24).convert("RGB")
+    image = Image.blend(image, noise, 0.15)
+    output = io.BytesIO()
+    image.save(output, format="JPEG", quality=95)
+    return output.getvalue()
+
+
+async def send(extractor: CVExtractor, image_bytes: bytes, mime_type: str) -> float:
+    base64_image = base64.b64encode(image_bytes).decode("utf-8")
+    start = time.perf_counter()
+    await extractor.client.chat.completions.create(
+        model=VISION_MODEL,
+        messages=[{
+            "role": "user",
+            "content": [
+                {"type": "text", "text": "Extract all text from this CV image."},
+                {"type": "image_url", "image_url": {"url": f"data:{mime_type};base64,{base64_image}"}}
+            ]
+        }],
+        max_tokens=4000
+    )
+    return time.perf_counter() - start
+
+
+async def run(images, base_url: str, uplink_mbps: float):
+    extractor = CVExtractor("mock", base_url=base_url)
+    for name, raw in images:
+        processed, mime_type, stats = preprocess_image(raw)
+        raw_time = await send(extractor, raw, sniff_mime_type(raw))
+        processed_time = await send(extractor, processed, mime_type)
+        print(f"{name}")
+        print(f"  bytes:          {stats['bytes_before']:>10,} -> {stats['bytes_after']:>10,}")
+        print(f"  size:           {stats.get('size_before')} -> {stats.get('size_after')} ({mime_type})")
+        print(f"  vision tokens:  {stats.get('vision_tokens_before')} -> {stats.get('vision_tokens_after')}")
+        print(f"  preprocessing:  {stats['seconds']:.3f}s")
+        # base64 inflates the payload by 4/3
+        raw_upload = len(raw) * 4 / 3 * 8 / (uplink_mbps * 1_000_000)
+        processed_upload = len(processed) * 4 / 3 * 8 / (uplink_mbps * 1_000_000)
+        print(f"  request time:   {raw_time:.3f}s -> {processed_time:.3f}s (loopback)")
+        print(f"  upload @{uplink_mbps:g}Mbit: {raw_upload:.3f}s -> {processed_upload:.3f}s")
+        print(f"  latency saved:  {raw_upload + raw_time - processed_upload - processed_time - stats['seconds']:.3f}s "
+              f"(incl. preprocessing)")
+    await extractor.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("images", nargs="*")
+    parser.add_argument("--uplink-mbps", type=float, default=20.0)
+    args = parser.parse_args()
+
+    if args.images:
+        images = [(path, open(path, "rb").read()) for path in args.images]
+    else:
+        images = [("synthetic 3000x4000 JPEG", synthetic_photo())]
+
+    # Zero model latency: measure transfer/encoding only
+    with MockOpenAIServer(latency=0.0) as server:
+        asyncio.run(run(images, server.base_url, args.uplink_mbps))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark: resilience layer against a fault-injecting mock server
+
+Scenarios: transient 500/429 errors (retries with backoff), a fully failing
+upstream (circuit breaker fails fast) and slow tail responses (hedging).
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_resilience --calls 100
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from typing import Any, Dict, List
+
+from openai import AsyncOpenAI
+
+from benchmarks.mock_openai_server import MockOpenAIServer
+from core.extractor import CVExtractor
+from core.resilience import CircuitBreaker, ResilientCaller
+
+# Measure extraction, not the shared OpenAI quota (core.rate_limiter)
+os.environ.setdefault("OPENAI_RATE_LIMIT_ENABLED", "false")
+
+SAMPLE_TEXT = "Max Mustermann\nBerlin\nSenior Developer bei Beispiel GmbH 01/2020 - Heute"
+
+
+async def run_scenario(calls: int, server_options: Dict[str, Any], caller: ResilientCaller) -> Dict[str, Any]:
+    """Run sequential structuring calls, return success count and latency percentiles"""
+    with MockOpenAIServer(**server_options) as server:
+        client = AsyncOpenAI(api_key="mock", base_url=server.base_url, max_retries=0)
+        extractor = CVExtractor(client=client, resilience=caller)
+        latencies: List[float] = []
+        succeeded = 0
+        try:
+            for _ in range(calls):
+                start = time.perf_counter()
+                try:
+                    await extractor._structure_with_openai(SAMPLE_TEXT)
+                    succeeded += 1
+                except Exception:
+                    pass
+                latencies.append(time.perf_counter() - start)
+        finally:
+            await client.close()
+        latencies.sort()
+        return {
+            "succeeded": succeeded,
+            "requests": server.request_count,
+            "p50": latencies[len(latencies) // 2],
+            "p99": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+            "total": sum(latencies),
+            "stats": caller.stats(),
+        }
+
+
+def report(name: str, result: Dict[str, Any], calls: int):
+    stats = result["stats"]
+    print(f"{name:<28} ok {result['succeeded']:>3}/{calls}  requests {result['requests']:>4}  "
+          f"p50 {result['p50']:.3f}s  p99 {result['p99']:.3f}s  total {result['total']:.2f}s  "
+          f"retries {stats['retries']}  hedged {stats['hedged']}  rejected {stats['rejected']}")
+
+
+async def main(calls: int, latency: float):
+    print(f"{calls} calls per scenario, base latency {latency}s\n")
+
+    no_retries = ResilientCaller(max_retries=0, breaker=CircuitBreaker(failure_threshold=0))
+    report("30% errors, no retries", await run_scenario(
+        calls, dict(latency=latency, error_rate=0.3, seed=1), no_retries), calls)
+    report("30% errors, retries", await run_scenario(
+        calls, dict(latency=latency, error_rate=0.3, seed=1), ResilientCaller(backoff_base=0.05)), calls)
+    report("30% 429s, retries", await run_scenario(
+        calls, dict(latency=latency, error_rate=0.3, error_status=429, seed=1),
+        ResilientCaller(backoff_base=0.05)), calls)
+
+    report("upstream down, no breaker", await run_scenario(
+        calls, dict(latency=latency, error_rate=1.0),
+        ResilientCaller(max_retries=2, backoff_base=0.05, breaker=CircuitBreaker(failure_threshold=0))), calls)
+    report("upstream down, breaker", await run_scenario(
+        calls, dict(latency=latency, error_rate=1.0),
+        ResilientCaller(max_retries=2, backoff_base=0.05, breaker=CircuitBreaker(5, reset_timeout=30))), calls)
+
+    slow = dict(latency=latency, slow_rate=0.04, slow_latency=latency * 10, seed=5)
+    report("4% slow tail, no hedging", await run_scenario(calls, slow, ResilientCaller()), calls)
+    report("4% slow tail, hedging", await run_scenario(
+        calls, slow, ResilientCaller(hedge=True, hedge_min_samples=10)), calls)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.1)
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.latency))
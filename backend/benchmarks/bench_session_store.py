@@ -0,0 +1,162 @@
+"""
+Benchmark: session store backends under many concurrent sessions
+
+Every simulated user creates a session with an extracted CV, reads it,
+saves a number of edits (patch + read, like the editor) and deletes it.
+The users run on a thread pool, like requests on uvicorn workers. The Redis
+backend runs against the local stand-in (benchmarks.mock_redis_server) or,
+with --redis-url, against a real server.
+
+The expiry part measures cleanup rounds with 1% of the stored sessions
+expired and with none expired (the common case): the previous full scan
+over all sessions (run on every upload) vs. the expiry heap of the memory
+store and the expires_at index of SQLite.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_session_store [--sessions 2000] [--threads 32] [--edits 5]
+        [--stored 1000 10000 100000]
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from benchmarks.mock_openai_server import SAMPLE_CV_DATA
+from benchmarks.mock_redis_server import MockRedisServer
+from benchmarks.bench_split_extraction import larger_cv
+from core.session_store import MemorySessionStore, RedisSessionStore, SessionStore, SQLiteSessionStore
+
+
+def user(store: SessionStore, edits: int, data: Dict) -> Dict[str, List[float]]:
+    """One editing session, returns latencies per operation"""
+    timings: Dict[str, List[float]] = {"put": [], "get": [], "patch": [], "delete": []}
+
+    def timed(operation: str, *args):
+        start = time.perf_counter()
+        result = getattr(store, operation)(*args)
+        timings[operation].append(time.perf_counter() - start)
+        return result
+
+    session_id = str(uuid.uuid4())
+    timed("put", session_id, {"id": session_id, "company": "galdora", "extracted_data": data,
+                              "temp_file": f"temp/{session_id}_cv.pdf"})
+    assert timed("get", session_id) is not None
+    for edit in range(edits):
+        data = dict(data, personal=dict(data["personal"], summary=f"Bearbeitet ({edit})"))
+        assert timed("patch", session_id, {"extracted_data": data}) is not None
+        timed("get", session_id)
+    assert timed("delete", session_id) is not None
+    return timings
+
+
+def run(store: SessionStore, sessions: int, threads: int, edits: int, data: Dict) -> Dict[str, object]:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(executor.map(lambda _: user(store, edits, data), range(sessions)))
+    elapsed = time.perf_counter() - start
+    latencies = {operation: sorted(value for result in results for value in result[operation])
+                 for operation in results[0]}
+    return {
+        "seconds": elapsed,
+        "ops": sum(len(values) for values in latencies.values()),
+        "latencies": latencies,
+    }
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def full_scan_cleanup(sessions: Dict[str, Dict], ttl: float) -> int:
+    """Previous cleanup: check every session's created_at"""
+    now = time.time()
+    expired = [session_id for session_id, data in sessions.items() if now - data["created_at"] > ttl]
+    for session_id in expired:
+        del sessions[session_id]
+    return len(expired)
+
+
+def fill(store: Optional[SessionStore], stored: int, expired: int) -> Dict[str, Dict]:
+    """stored sessions, the first `expired` of them already expired"""
+    sessions = {}
+    now = time.time()
+    for index in range(stored):
+        age = 7200 if index < expired else 0
+        data = {"id": str(index), "created_at": now - age, "temp_file": f"temp/{index}_cv.pdf"}
+        sessions[str(index)] = data
+        if store is not None:
+            store.put(str(index), data, ttl_seconds=-1 if age else None)
+    return sessions
+
+
+def timed_round(cleanup, expected: int) -> float:
+    start = time.perf_counter()
+    assert cleanup() == expected
+    return (time.perf_counter() - start) * 1000
+
+
+def bench_expiry(stored_sizes: List[int], directory: str):
+    print("expiry round (ms): 1% expired / none expired")
+    for stored in stored_sizes:
+        expired = max(1, stored // 100)
+        sessions = fill(None, stored, expired)
+        rounds = [timed_round(lambda: full_scan_cleanup(sessions, 3600), count) for count in (expired, 0)]
+        line = f"  {stored:>7} sessions  full scan {rounds[0]:7.2f} / {rounds[1]:7.2f}"
+        for name, store in (("heap", MemorySessionStore()),
+                            ("sqlite index", SQLiteSessionStore(os.path.join(directory, f"expiry{stored}.db")))):
+            fill(store, stored, expired)
+            rounds = [timed_round(lambda: len(store.purge_expired()), count) for count in (expired, 0)]
+            line += f"  {name} {rounds[0]:7.2f} / {rounds[1]:5.2f}"
+            store.close()
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--edits", type=int, default=5, help="saved edits per session")
+    parser.add_argument("--entries", type=int, default=6, help="experience entries per CV")
+    parser.add_argument("--redis-url", default=None, help="real server instead of the stand-in")
+    parser.add_argument("--stored", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="stored sessions for the expiry round")
+    args = parser.parse_args()
+
+    data = larger_cv(args.entries) if args.entries else SAMPLE_CV_DATA
+    directory = tempfile.mkdtemp()
+    redis_server: Optional[MockRedisServer] = None
+    if args.redis_url is None:
+        redis_server = MockRedisServer().start()
+    stores = {
+        "memory": MemorySessionStore(),
+        "sqlite (WAL)": SQLiteSessionStore(os.path.join(directory, "sessions.db")),
+        "redis" + (" (stand-in)" if redis_server else ""): RedisSessionStore(
+            args.redis_url or redis_server.url, max_connections=args.threads
+        ),
+    }
+
+    print(f"{args.sessions} sessions, {args.threads} threads, {args.edits} edits each")
+    try:
+        for name, store in stores.items():
+            result = run(store, args.sessions, args.threads, args.edits, data)
+            latencies = result["latencies"]
+            print(f"  {name:<20} {result['ops'] / result['seconds']:8.0f} ops/s  "
+                  + "  ".join(f"{operation} p50 {statistics.median(values) * 1000:5.2f} ms "
+                              f"p99 {percentile(values, 0.99) * 1000:6.2f} ms"
+                              for operation, values in latencies.items() if operation in ("get", "patch")))
+            assert store.count() == 0
+            store.close()
+    finally:
+        if redis_server is not None:
+            redis_server.stop()
+
+    bench_expiry(args.stored, directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark: single-call vs schema-split structuring
+
+The mock server's latency grows with the number of generated tokens, like a
+real model. Single mode generates the whole document in one call; split mode
+generates each section in its own concurrent call.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_split_extraction --token-latency 0.02
+"""
+
+import argparse
+import asyncio
+import os
+import re
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from benchmarks.mock_openai_server import MockOpenAIServer, SAMPLE_CV_DATA
+from core.extractor import CVExtractor
+
+# Measure extraction, not the shared OpenAI quota (core.rate_limiter)
+os.environ.setdefault("OPENAI_RATE_LIMIT_ENABLED", "false")
+
+SAMPLE_TEXT = "Max Mustermann\nBerlin\nSenior Developer bei Beispiel GmbH 01/2020 - Heute"
+
+
+def larger_cv(entries: int):
+    """Sample CV with more experience entries, closer to a real document"""
+    data = dict(SAMPLE_CV_DATA)
+    data["experience"] = SAMPLE_CV_DATA["experience"] * entries
+    data["education"] = SAMPLE_CV_DATA["education"] * max(1, entries // 3)
+    data["skills"] = SAMPLE_CV_DATA["skills"] * 4
+    return data
+
+
+def section_responder(data):
+    """Answer section prompts with only that section, everything else with the full document"""
+    def respond(body):
+        prompt = body["messages"][-1]["content"]
+        match = re.search(r'NUR den Abschnitt "(\w+)"', prompt)
+        if match:
+            return {match.group(1): data[match.group(1)]}
+        return data
+    return respond
+
+
+async def run(base_url: str, mode: str) -> Tuple[float, Optional[Dict[str, Any]]]:
+    extractor = CVExtractor("mock", base_url=base_url, mode=mode)
+    start = time.perf_counter()
+    result = await extractor._structure(SAMPLE_TEXT)
+    elapsed = time.perf_counter() - start
+    await extractor.aclose()
+    assert set(result) >= {"personal", "experience", "education", "skills", "certifications"}
+    return elapsed, extractor.metrics.get("section_seconds")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.3, help="time to first token (s)")
+    parser.add_argument("--token-latency", type=float, default=0.02, help="seconds per output token")
+    parser.add_argument("--entries", type=int, default=6, help="experience entries in the sample CV")
+    args = parser.parse_args()
+
+    data = larger_cv(args.entries)
+    with MockOpenAIServer(latency=args.latency, token_latency=args.token_latency,
+                          responder=section_responder(data)) as server:
+        single, _ = asyncio.run(run(server.base_url, "single"))
+        split, section_seconds = asyncio.run(run(server.base_url, "split"))
+
+    print(f"single call:   {single:6.2f}s")
+    print(f"schema split:  {split:6.2f}s  (sections done at {section_seconds})")
+    print(f"speedup:       {single / split:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
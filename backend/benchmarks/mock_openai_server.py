@@ -0,0 +1,239 @@
+"""
+Local stand-in for the OpenAI chat completions API
+Used by the benchmarks to measure extraction behaviour without network or API costs
+"""
+
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional
+
+# Canned extraction result returned by the mock
+SAMPLE_CV_DATA: Dict[str, Any] = {
+    "personal": {
+        "name": "Max Mustermann",
+        "city": "Berlin",
+        "summary": "Erfahrener Softwareentwickler mit Schwerpunkt Backend"
+    },
+    "experience": [
+        {
+            "position": "Senior Developer",
+            "company": "Beispiel GmbH",
+            "start_date": "01/2020",
+            "end_date": "Heute",
+            "description": "Entwicklung von Microservices"
+        }
+    ],
+    "education": [
+        {
+            "degree": "B.Sc. Informatik",
+            "institution": "TU Berlin",
+            "start_date": "10/2014",
+            "end_date": "09/2018",
+            "description": ""
+        }
+    ],
+    "skills": ["Python", "FastAPI", "PostgreSQL"],
+    "certifications": []
+}
+
+
+class MockOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        # Keep benchmark output clean
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        server: "MockOpenAIServer" = self.server.mock  # type: ignore[attr-defined]
+        server.request_count += 1
+
+        # Fault injection: upstream errors and slow (tail latency) responses
+        fail, slow = server.draw_faults()
+        if fail:
+            server.error_count += 1
+            time.sleep(server.latency / 4)
+            self._send_json(server.error_status, {
+                "error": {"message": "Injected fault", "type": "server_error", "code": None}
+            }, headers={"retry-after": "0"} if server.error_status == 429 else None)
+            return
+
+        response = server.respond(body)
+        # Responders may return raw text to simulate malformed model output
+        content = response if isinstance(response, str) else json.dumps(response, ensure_ascii=False)
+        # Generation time grows with the output, like a real model
+        latency = server.latency + server.token_latency * len(content) / 4
+        if slow:
+            latency += server.slow_latency
+        if body.get("stream"):
+            self._send_stream(body, content, latency, server)
+            return
+
+        time.sleep(latency)
+
+        payload = {
+            "id": "chatcmpl-mock",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "mock"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop"
+                }
+            ],
+            "usage": {
+                "prompt_tokens": 500,
+                "completion_tokens": len(content) // 4,
+                "total_tokens": 500 + len(content) // 4
+            }
+        }
+        self._send_json(200, payload, headers=server.response_headers)
+
+    def _send_stream(self, body: Dict[str, Any], content: str, latency: float, server: "MockOpenAIServer"):
+        """Stream the content as chat.completion.chunk events spread over the latency"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        for name, value in (server.response_headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+
+        pieces = [content[i:i + server.chunk_size] for i in range(0, len(content), server.chunk_size)]
+        delay = latency / max(len(pieces), 1)
+        for piece in pieces:
+            time.sleep(delay)
+            self._write_event({
+                "id": "chatcmpl-mock",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body.get("model", "mock"),
+                "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]
+            })
+        self._write_chunk(b"data: [DONE]\n\n")
+        self._write_chunk(b"")
+
+    def _write_event(self, payload: Dict[str, Any]):
+        self._write_chunk(f"data: {json.dumps(payload)}\n\n".encode("utf-8"))
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class _ThreadingServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+    def handle_error(self, request, client_address):
+        # Clients hang up on purpose (hedged requests, deadlines)
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            super().handle_error(request, client_address)
+
+
+class MockOpenAIServer:
+    """
+    Threaded HTTP server answering /v1/chat/completions after
+    latency + token_latency * output tokens seconds.
+    responder(request_body) may return a custom JSON document per request
+    (or raw text, e.g. truncated JSON).
+    Faults: error_rate of the requests fail with error_status, slow_rate of
+    them take slow_latency longer (seeded, reproducible).
+    response_headers are added to successful responses (e.g. x-ratelimit-*).
+    Use as a context manager; base_url points the OpenAI client at it.
+    """
+
+    def __init__(self, latency: float = 0.5, response_data: Optional[Dict[str, Any]] = None,
+                 host: str = "127.0.0.1", port: int = 0, chunk_size: int = 16,
+                 token_latency: float = 0.0,
+                 responder: Optional[Callable[[Dict[str, Any]], Any]] = None,
+                 error_rate: float = 0.0, error_status: int = 500,
+                 slow_rate: float = 0.0, slow_latency: float = 0.0, seed: Optional[int] = None,
+                 response_headers: Optional[Dict[str, str]] = None):
+        self.latency = latency
+        self.token_latency = token_latency
+        self.response_data = response_data or SAMPLE_CV_DATA
+        self.responder = responder
+        self.chunk_size = chunk_size
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.response_headers = response_headers
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self.request_count = 0
+        self.error_count = 0
+        self._httpd = _ThreadingServer((host, port), MockOpenAIHandler)
+        self._httpd.mock = self  # type: ignore[attr-defined]
+        self._thread: Optional[threading.Thread] = None
+
+    def draw_faults(self):
+        """(fail, slow) for the next request"""
+        with self._random_lock:
+            return self._random.random() < self.error_rate, self._random.random() < self.slow_rate
+
+    def respond(self, body: Dict[str, Any]) -> Any:
+        if self.responder is not None:
+            return self.responder(body)
+        return self.response_data
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a mock OpenAI server")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--slow-rate", type=float, default=0.0)
+    parser.add_argument("--slow-latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = MockOpenAIServer(latency=args.latency, port=args.port, error_rate=args.error_rate,
+                              error_status=args.error_status, slow_rate=args.slow_rate,
+                              slow_latency=args.slow_latency).start()
+    print(f"Mock OpenAI server running at {server.base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
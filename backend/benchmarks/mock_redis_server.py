@@ -0,0 +1,260 @@
+"""
+Local stand-in for a Redis server
+Speaks RESP2 and implements the commands core.session_store uses (strings
+with expiry, sorted sets, WATCH/MULTI/EXEC), so the Redis session backend
+can be tested and benchmarked without a Redis installation
+"""
+
+import socket
+import socketserver
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class _Nil:
+    pass
+
+
+NIL = _Nil()
+
+
+class MockRedisHandler(socketserver.StreamRequestHandler):
+    def setup(self):
+        super().setup()
+        # Pipelined replies go out as separate small writes
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.watched: Dict[bytes, int] = {}
+        self.queued: Optional[List[List[bytes]]] = None
+        self.dirty = False
+
+    def handle(self):
+        server: "MockRedisServer" = self.server.mock  # type: ignore[attr-defined]
+        while True:
+            command = self._read_command()
+            if command is None:
+                return
+            self.wfile.write(self._encode(self._dispatch(server, command)))
+
+    def _read_command(self) -> Optional[List[bytes]]:
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            return line.split()
+        arguments = []
+        for _ in range(int(line[1:-2])):
+            length = int(self.rfile.readline()[1:-2])
+            arguments.append(self.rfile.read(length + 2)[:-2])
+        return arguments
+
+    def _dispatch(self, server: "MockRedisServer", command: List[bytes]) -> Any:
+        name = command[0].upper()
+        if self.queued is not None and name not in (b"EXEC", b"DISCARD", b"MULTI", b"WATCH"):
+            if name not in server.COMMANDS:
+                self.dirty = True
+                return Exception(f"ERR unknown command '{name.decode()}'")
+            self.queued.append(command)
+            return "QUEUED"
+        if name == b"MULTI":
+            self.queued = []
+            return "OK"
+        if name == b"DISCARD":
+            self.queued, self.watched, self.dirty = None, {}, False
+            return "OK"
+        if name == b"WATCH":
+            with server.lock:
+                for key in command[1:]:
+                    self.watched[key] = server.versions.get(key, 0)
+            return "OK"
+        if name == b"UNWATCH":
+            self.watched = {}
+            return "OK"
+        if name == b"EXEC":
+            if self.queued is None:
+                return Exception("ERR EXEC without MULTI")
+            queued, watched, dirty = self.queued, self.watched, self.dirty
+            self.queued, self.watched, self.dirty = None, {}, False
+            if dirty:
+                return Exception("EXECABORT Transaction discarded because of previous errors.")
+            with server.lock:
+                if any(server.versions.get(key, 0) != version for key, version in watched.items()):
+                    return NIL
+                return [server.execute(queued_command) for queued_command in queued]
+        if name not in server.COMMANDS:
+            return Exception(f"ERR unknown command '{name.decode()}'")
+        with server.lock:
+            return server.execute(command)
+
+    def _encode(self, value: Any) -> bytes:
+        if value is NIL or value is None:
+            return b"$-1\r\n" if value is None else b"*-1\r\n"
+        if isinstance(value, Exception):
+            return b"-" + str(value).encode() + b"\r\n"
+        if isinstance(value, str):
+            return b"+" + value.encode() + b"\r\n"
+        if isinstance(value, int):
+            return b":%d\r\n" % value
+        if isinstance(value, bytes):
+            return b"$%d\r\n%s\r\n" % (len(value), value)
+        return b"*%d\r\n" % len(value) + b"".join(self._encode(item) for item in value)
+
+
+class _ThreadingServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 256
+
+
+class MockRedisServer:
+    """
+    Threaded single-database Redis stand-in. Commands run under one lock
+    (like Redis' single thread); expired keys are removed lazily.
+    Use as a context manager; url points a client at it.
+    """
+
+    COMMANDS = {b"PING", b"GET", b"SET", b"DEL", b"EXISTS", b"EXPIRE", b"ZADD", b"ZREM", b"ZCARD",
+                b"ZSCORE", b"ZRANGEBYSCORE", b"DBSIZE", b"FLUSHDB", b"SELECT", b"AUTH"}
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.lock = threading.Lock()
+        # key -> (value, expires_at or None); sorted sets are dicts member -> score
+        self.data: Dict[bytes, Tuple[Any, Optional[float]]] = {}
+        # Incremented on every write, for WATCH
+        self.versions: Dict[bytes, int] = {}
+        self.command_count = 0
+        self._server = _ThreadingServer((host, port), MockRedisHandler)
+        self._server.mock = self  # type: ignore[attr-defined]
+        self._thread: Optional[threading.Thread] = None
+
+    def _get(self, key: bytes) -> Any:
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= time.time():
+            del self.data[key]
+            self._touch(key)
+            return None
+        return entry[0]
+
+    def _touch(self, key: bytes):
+        self.versions[key] = self.versions.get(key, 0) + 1
+
+    def execute(self, command: List[bytes]) -> Any:
+        """Run one command (caller holds the lock)"""
+        self.command_count += 1
+        name, arguments = command[0].upper(), command[1:]
+        if name in (b"PING", b"SELECT", b"AUTH"):
+            return "PONG" if name == b"PING" else "OK"
+        if name == b"GET":
+            value = self._get(arguments[0])
+            return value if value is None or isinstance(value, bytes) else Exception("WRONGTYPE")
+        if name == b"SET":
+            key, value, options = arguments[0], arguments[1], [option.upper() for option in arguments[2:]]
+            entry = self.data.get(key)
+            expires_at = None
+            if b"KEEPTTL" in options and entry is not None:
+                expires_at = entry[1]
+            if b"EX" in options:
+                expires_at = time.time() + int(arguments[2 + options.index(b"EX") + 1])
+            if b"PX" in options:
+                expires_at = time.time() + int(arguments[2 + options.index(b"PX") + 1]) / 1000
+            self.data[key] = (value, expires_at)
+            self._touch(key)
+            return "OK"
+        if name == b"DEL":
+            removed = 0
+            for key in arguments:
+                if self._get(key) is not None:
+                    del self.data[key]
+                    self._touch(key)
+                    removed += 1
+            return removed
+        if name == b"EXISTS":
+            return sum(1 for key in arguments if self._get(key) is not None)
+        if name == b"EXPIRE":
+            value = self._get(arguments[0])
+            if value is None:
+                return 0
+            self.data[arguments[0]] = (value, time.time() + int(arguments[1]))
+            self._touch(arguments[0])
+            return 1
+        if name == b"ZADD":
+            members = self._get(arguments[0]) or {}
+            flags = []
+            while arguments[1 + len(flags)].upper() in (b"XX", b"NX"):
+                flags.append(arguments[1 + len(flags)].upper())
+            pairs = arguments[1 + len(flags):]
+            added = 0
+            for score, member in zip(pairs[0::2], pairs[1::2]):
+                if (b"XX" in flags and member not in members) or (b"NX" in flags and member in members):
+                    continue
+                added += member not in members
+                members[member] = float(score)
+            self.data[arguments[0]] = (members, None)
+            self._touch(arguments[0])
+            return added
+        if name == b"ZREM":
+            members = self._get(arguments[0]) or {}
+            removed = sum(1 for member in arguments[1:] if members.pop(member, None) is not None)
+            if removed:
+                self._touch(arguments[0])
+            return removed
+        if name == b"ZCARD":
+            return len(self._get(arguments[0]) or {})
+        if name == b"ZSCORE":
+            score = (self._get(arguments[0]) or {}).get(arguments[1])
+            return None if score is None else repr(score).encode()
+        if name == b"ZRANGEBYSCORE":
+            low, high = (float(bound.replace(b"inf", b"Infinity")) for bound in arguments[1:3])
+            members = self._get(arguments[0]) or {}
+            found = [member for member, score in sorted(members.items(), key=lambda item: item[1])
+                     if low <= score <= high]
+            if len(arguments) > 3 and arguments[3].upper() == b"LIMIT":
+                offset, count = int(arguments[4]), int(arguments[5])
+                found = found[offset:] if count < 0 else found[offset:offset + count]
+            return found
+        if name == b"DBSIZE":
+            return len(self.data)
+        if name == b"FLUSHDB":
+            for key in list(self.data):
+                self._touch(key)
+            self.data.clear()
+            return "OK"
+        return Exception(f"ERR unknown command '{name.decode()}'")
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a Redis stand-in")
+    parser.add_argument("--port", type=int, default=6380)
+    args = parser.parse_args()
+
+    server = MockRedisServer(port=args.port).start()
+    print(f"Mock Redis server running at {server.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
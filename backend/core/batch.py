@@ -0,0 +1,76 @@
+"""
+Batch processing helpers for CV2Profile
+Bounded parallel execution and ZIP unpacking for multi-file uploads
+"""
+
+import asyncio
+import os
+import zipfile
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Sequence, TypeVar
+
+from core.upload_spool import Buffer, SpooledUpload, UploadTooLarge, open_buffer, spool_file
+
+T = TypeVar("T")
+
+
+async def run_bounded(items: Sequence[T], worker: Callable[[int, T], Awaitable[Any]],
+                      concurrency: int) -> AsyncIterator[Any]:
+    """
+    Run worker(index, item) for all items with at most `concurrency` running at once.
+    Yields results in completion order, so the total time approaches the slowest item
+    (per concurrency slot) instead of the sum.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def guarded(index: int, item: T):
+        async with semaphore:
+            return await worker(index, item)
+
+    tasks = [asyncio.create_task(guarded(index, item)) for index, item in enumerate(items)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Client disconnected or caller stopped iterating
+        for task in tasks:
+            task.cancel()
+
+
+def unpack_zip(zip_bytes: Buffer, allowed_extensions: Sequence[str], max_file_size: int,
+               max_files: int, max_total_size: int) -> List[SpooledUpload]:
+    """
+    Spool every supported file in a ZIP archive to its own file, one member
+    at a time. Oversized entries are rejected from the header before being
+    decompressed; the decompressed bytes are counted as well (per file and
+    max_total_size for the archive), since headers can lie.
+    """
+    files: List[SpooledUpload] = []
+    try:
+        with zipfile.ZipFile(open_buffer(zip_bytes)) as archive:
+            for info in archive.infolist():
+                name = os.path.basename(info.filename)
+                if info.is_dir() or not name or info.filename.startswith("__MACOSX/") or name.startswith("."):
+                    continue
+                if name.rsplit(".", 1)[-1].lower() not in allowed_extensions:
+                    continue
+                if info.file_size > max_file_size:
+                    raise ValueError(f"{name}: file too large (max {max_file_size // (1024 * 1024)}MB)")
+                if len(files) >= max_files:
+                    raise ValueError(f"Too many files in archive (max {max_files})")
+                remaining = max_total_size - sum(upload.size for upload in files)
+                with archive.open(info) as member:
+                    try:
+                        files.append(spool_file(member, min(max_file_size, remaining), name))
+                    except UploadTooLarge:
+                        if remaining < max_file_size:
+                            raise ValueError(
+                                f"Archive too large when unpacked (max {max_total_size // (1024 * 1024)}MB)"
+                            )
+                        raise ValueError(f"{name}: file too large (max {max_file_size // (1024 * 1024)}MB)")
+    except BaseException as e:
+        for upload in files:
+            upload.discard()
+        if isinstance(e, zipfile.BadZipFile):
+            raise ValueError("Invalid ZIP archive")
+        raise
+    return files
@@ -0,0 +1,383 @@
+"""
+Content-addressed file storage for CV2Profile
+Uploads and exports are stored once per SHA-256 under temp/blobs and
+referenced by sessions; unreferenced files and the least recently used
+ones above the disk quota are removed by a background collector
+"""
+
+import asyncio
+import hashlib
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+BLOB_STORE_DIR = os.getenv("BLOB_STORE_DIR", os.path.join("temp", "blobs"))
+# Disk quota for all stored files; least recently used files are evicted above it
+BLOB_STORE_MAX_BYTES = int(os.getenv("BLOB_STORE_MAX_BYTES", str(1024 * 1024 * 1024)))
+# Background collection interval and the minimum age before a file may be deleted
+# (downloads that already looked up a path keep working)
+BLOB_GC_INTERVAL = float(os.getenv("BLOB_GC_INTERVAL", "60"))
+BLOB_GC_GRACE = float(os.getenv("BLOB_GC_GRACE", "300"))
+
+_HASH_CHUNK = 1024 * 1024
+# Temporary files of put_bytes; left behind only if a worker died mid-write
+_INCOMING_PREFIX = "incoming_"
+
+
+def file_sha256(path: str) -> str:
+    """Hex SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BlobStore:
+    """
+    Files named by their SHA-256, with an SQLite index (WAL, shared by all
+    workers on the host) of sizes, last access and references. A reference
+    is (owner, name), e.g. (session id, "export.pdf"); a file without
+    references is garbage once it is older than the grace period.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = BLOB_STORE_MAX_BYTES, grace_seconds: float = BLOB_GC_GRACE):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.grace_seconds = grace_seconds
+        self.stored = 0
+        self.deduplicated = 0
+        self.collected = 0
+        self.evicted = 0
+        self.orphans = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        # Autocommit mode: transactions are started explicitly (BEGIN IMMEDIATE)
+        self._conn = sqlite3.connect(os.path.join(directory, "index.db"), check_same_thread=False,
+                                     timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS blobs (
+                sha256 TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS blob_refs (
+                owner TEXT NOT NULL,
+                name TEXT NOT NULL,
+                sha256 TEXT NOT NULL,
+                PRIMARY KEY (owner, name)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_blobs_last_access ON blobs(last_access)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_blob_refs_sha256 ON blob_refs(sha256)")
+
+    def path(self, sha256: str) -> str:
+        """Location of a blob (sharded by the first two hex digits)"""
+        return os.path.join(self.directory, sha256[:2], sha256)
+
+    def _transaction(self, work):
+        """Run work() in a write transaction (caller holds the lock)"""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = work()
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        return result
+
+    def _touch_existing(self, sha256: str, now: float) -> bool:
+        """Mark a stored blob as used; False if it is not (or no longer) on disk"""
+        if self._conn.execute("SELECT 1 FROM blobs WHERE sha256 = ?", (sha256,)).fetchone() is None:
+            return False
+        if not os.path.exists(self.path(sha256)):
+            self._conn.execute("DELETE FROM blobs WHERE sha256 = ?", (sha256,))
+            return False
+        self._conn.execute("UPDATE blobs SET last_access = ? WHERE sha256 = ?", (now, sha256))
+        return True
+
+    def put_file(self, source: str, sha256: Optional[str] = None) -> str:
+        """
+        Take over a file (moved, not copied) and return its hash. If the
+        content is already stored, the file is deleted instead.
+        """
+        sha256 = sha256 or file_sha256(source)
+        size = os.path.getsize(source)
+        target = self.path(sha256)
+
+        def store() -> bool:
+            now = time.time()
+            if self._touch_existing(sha256, now):
+                os.remove(source)
+                return False
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            try:
+                os.replace(source, target)
+            except OSError:
+                # Spool directory on another file system
+                shutil.move(source, target)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO blobs (sha256, size, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (sha256, size, now, now)
+            )
+            return True
+
+        with self._lock:
+            added = self._transaction(store)
+        if added:
+            self.stored += 1
+        else:
+            self.deduplicated += 1
+        return sha256
+
+    def put_bytes(self, data: bytes) -> str:
+        """Store content from memory and return its hash"""
+        sha256 = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            if self._transaction(lambda: self._touch_existing(sha256, time.time())):
+                self.deduplicated += 1
+                return sha256
+        handle = tempfile.NamedTemporaryFile(dir=self.directory, prefix=_INCOMING_PREFIX, delete=False)
+        try:
+            with handle:
+                handle.write(data)
+        except BaseException:
+            os.remove(handle.name)
+            raise
+        return self.put_file(handle.name, sha256)
+
+    def open(self, sha256: str) -> Optional[str]:
+        """Path of a stored blob (marked as used), None if it is gone"""
+        with self._lock:
+            if not self._transaction(lambda: self._touch_existing(sha256, time.time())):
+                return None
+        return self.path(sha256)
+
+    def acquire(self, owner: str, name: str, sha256: str):
+        """Reference a blob as owner's `name`, replacing what that name referenced before"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO blob_refs (owner, name, sha256) VALUES (?, ?, ?)", (owner, name, sha256)
+            )
+
+    def release(self, owner: str) -> int:
+        """
+        Drop all references of an owner. Returns the bytes that are now
+        unreferenced (deleted by the next collection after the grace period).
+        """
+        def drop() -> int:
+            rows = self._conn.execute(
+                "DELETE FROM blob_refs WHERE owner = ? RETURNING sha256", (owner,)
+            ).fetchall()
+            released = 0
+            for sha256 in {sha256 for sha256, in rows}:
+                row = self._conn.execute(
+                    "SELECT size FROM blobs WHERE sha256 = ? "
+                    "AND NOT EXISTS (SELECT 1 FROM blob_refs WHERE blob_refs.sha256 = blobs.sha256)",
+                    (sha256,)
+                ).fetchone()
+                released += row[0] if row else 0
+            return released
+
+        with self._lock:
+            return self._transaction(drop)
+
+    def _delete(self, sha256: str):
+        """Remove a blob, its references and its file (caller is in a transaction)"""
+        self._conn.execute("DELETE FROM blob_refs WHERE sha256 = ?", (sha256,))
+        self._conn.execute("DELETE FROM blobs WHERE sha256 = ?", (sha256,))
+        try:
+            os.remove(self.path(sha256))
+        except FileNotFoundError:
+            pass
+
+    def _sweep_incoming(self, cutoff: float) -> Tuple[int, int]:
+        """Delete put_bytes temporary files older than cutoff; returns (files, bytes)"""
+        removed = freed = 0
+        for entry in os.scandir(self.directory):
+            if not entry.name.startswith(_INCOMING_PREFIX):
+                continue
+            try:
+                stat = entry.stat()
+                if entry.is_file() and stat.st_mtime < cutoff:
+                    os.remove(entry.path)
+                    removed += 1
+                    freed += stat.st_size
+            except FileNotFoundError:
+                # Taken over by put_file in the meantime
+                continue
+        return removed, freed
+
+    def collect(self, limit: Optional[int] = None) -> Tuple[int, int]:
+        """
+        Delete unreferenced blobs, then evict least recently used blobs
+        (unreferenced first) while the store is over its quota. Only blobs
+        idle for the grace period are touched. Stale temporary files of
+        interrupted writes are deleted as well. Returns (blobs, bytes) removed.
+        """
+        def sweep() -> Tuple[int, int, int]:
+            cutoff = time.time() - self.grace_seconds
+            garbage = self._conn.execute(
+                "SELECT sha256, size FROM blobs WHERE last_access <= ? "
+                "AND NOT EXISTS (SELECT 1 FROM blob_refs WHERE blob_refs.sha256 = blobs.sha256) "
+                "ORDER BY last_access LIMIT ?",
+                (cutoff, -1 if limit is None else limit)
+            ).fetchall()
+            for sha256, _ in garbage:
+                self._delete(sha256)
+            removed = len(garbage)
+            freed = sum(size for _, size in garbage)
+
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+            evicted = 0
+            if total > self.max_bytes:
+                candidates = self._conn.execute(
+                    "SELECT sha256, size FROM blobs WHERE last_access <= ? ORDER BY "
+                    "EXISTS (SELECT 1 FROM blob_refs WHERE blob_refs.sha256 = blobs.sha256), last_access",
+                    (cutoff,)
+                )
+                victims: List[Tuple[str, int]] = []
+                for sha256, size in candidates:
+                    if total <= self.max_bytes:
+                        break
+                    victims.append((sha256, size))
+                    total -= size
+                for sha256, size in victims:
+                    self._delete(sha256)
+                    freed += size
+                evicted = len(victims)
+            return removed, evicted, freed
+
+        with self._lock:
+            removed, evicted, freed = self._transaction(sweep)
+        orphans, orphan_bytes = self._sweep_incoming(time.time() - self.grace_seconds)
+        self.collected += removed
+        self.evicted += evicted
+        self.orphans += orphans
+        return removed + evicted, freed + orphan_bytes
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            blobs, total_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs"
+            ).fetchone()
+            references, referenced = self._conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT sha256) FROM blob_refs"
+            ).fetchone()
+        return {
+            "blobs": blobs,
+            "bytes": total_bytes,
+            "max_bytes": self.max_bytes,
+            "references": references,
+            "referenced_blobs": referenced,
+            "stored": self.stored,
+            "deduplicated": self.deduplicated,
+            "collected": self.collected,
+            "evicted": self.evicted,
+            "orphans": self.orphans,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_store: Optional[BlobStore] = None
+_store_lock = threading.Lock()
+
+
+def get_blob_store() -> BlobStore:
+    """Process-wide blob store (BLOB_STORE_DIR, BLOB_STORE_MAX_BYTES)"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = BlobStore(BLOB_STORE_DIR)
+        return _store
+
+
+def close_blob_store():
+    """Close the process-wide store (call at shutdown)"""
+    global _store
+    with _store_lock:
+        store, _store = _store, None
+    if store is not None:
+        store.close()
+
+
+class BlobCollector:
+    """
+    Runs BlobStore.collect on a timer in a worker thread, outside of requests.
+    sweep: further cleanup per round (e.g. stale upload spool files),
+    returns (files, bytes) removed.
+    """
+
+    def __init__(self, store: Optional[BlobStore] = None, interval: float = BLOB_GC_INTERVAL,
+                 sweep: Optional[Callable[[], Tuple[int, int]]] = None):
+        self.store = store
+        self.interval = interval
+        self.sweep = sweep
+        self.swept_files = 0
+        self.runs = 0
+        self.removed_blobs = 0
+        self.reclaimed_bytes = 0
+        self.errors = 0
+        self.last_run_seconds: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Start the timer task (call from the running event loop)"""
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+            except (OSError, sqlite3.Error):
+                # Index locked or file system busy: try again next round
+                self.errors += 1
+
+    async def run_once(self) -> int:
+        """One collection; returns the number of blobs removed"""
+        started = time.perf_counter()
+        removed, freed = await asyncio.to_thread((self.store or get_blob_store()).collect)
+        if self.sweep is not None:
+            swept, swept_bytes = await asyncio.to_thread(self.sweep)
+            self.swept_files += swept
+            freed += swept_bytes
+        self.runs += 1
+        self.removed_blobs += removed
+        self.reclaimed_bytes += freed
+        self.last_run_seconds = round(time.perf_counter() - started, 4)
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "interval_seconds": self.interval,
+            "runs": self.runs,
+            "removed_blobs": self.removed_blobs,
+            "swept_files": self.swept_files,
+            "reclaimed_bytes": self.reclaimed_bytes,
+            "errors": self.errors,
+            "last_run_seconds": self.last_run_seconds,
+        }
@@ -0,0 +1,63 @@
+"""
+Model cascade for CV2Profile
+Structuring runs on a fast, cheap model first and escalates to the large model
+only when the result fails validation; tracks escalation rate and tier latency
+"""
+
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+# Tier 1 model of the cascade (tier 2 is the regular structuring model)
+CASCADE_FAST_MODEL = os.getenv("CASCADE_FAST_MODEL", "gpt-4o-mini")
+
+
+class CascadeStats:
+    """Process-wide counters: results per tier, escalations and latency"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.extractions = 0
+        self.escalations = 0
+        self._tiers: Dict[str, Dict[str, float]] = {}
+
+    def record(self, tiers: List[Dict[str, Any]]):
+        """Record one cascade run (the per-tier entries of the extraction metrics)"""
+        with self._lock:
+            self.extractions += 1
+            if len(tiers) > 1:
+                self.escalations += 1
+            for tier in tiers:
+                counters = self._tiers.setdefault(tier["tier"], {"calls": 0, "accepted": 0, "seconds": 0.0})
+                counters["calls"] += 1
+                counters["accepted"] += int(not tier["problems"])
+                counters["seconds"] += tier["seconds"]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "fast_model": CASCADE_FAST_MODEL,
+                "extractions": self.extractions,
+                "escalations": self.escalations,
+                "escalation_rate": round(self.escalations / self.extractions, 3) if self.extractions else None,
+                "tiers": {
+                    name: {
+                        "calls": int(counters["calls"]),
+                        "accepted": int(counters["accepted"]),
+                        "avg_seconds": round(counters["seconds"] / counters["calls"], 3),
+                    }
+                    for name, counters in self._tiers.items()
+                },
+            }
+
+
+_stats: Optional[CascadeStats] = None
+_stats_lock = threading.Lock()
+
+
+def get_cascade_stats() -> CascadeStats:
+    global _stats
+    with _stats_lock:
+        if _stats is None:
+            _stats = CascadeStats()
+        return _stats
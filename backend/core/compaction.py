@@ -0,0 +1,164 @@
+"""
+Input compaction for CV2Profile
+Removes repeated page headers/footers, page numbers and whitespace noise from
+extracted text and enforces an input token budget before the structuring call
+"""
+
+import math
+import os
+import re
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+COMPACTION_ENABLED = os.getenv("COMPACTION_ENABLED", "true").lower() not in ("0", "false", "no")
+# Maximum input tokens for the structuring prompt, 0 = unlimited
+INPUT_TOKEN_BUDGET = int(os.getenv("INPUT_TOKEN_BUDGET", "24000"))
+
+# Page separator used by core.pdf_text
+PAGE_BREAK = "\f"
+# Headers/footers are looked for in the first and last lines of every page
+HEADER_FOOTER_LINES = 2
+
+PAGE_NUMBER_PATTERN = re.compile(
+    r"^(?:(?:seite|page|s\.)\s*\d+(?:\s*(?:von|of|/)\s*\d+)?|[-–]?\s*\d{1,3}\s*[-–]?|\d{1,3}\s*/\s*\d{1,3})$",
+    re.IGNORECASE,
+)
+_INVISIBLE_CHARS = re.compile("[\u200b\u200c\u200d\u2060\ufeff\u00ad]")
+_HORIZONTAL_SPACE = re.compile("[ \t\u00a0\u2000-\u200a\u202f\u3000]+")
+# "Soft-\nware" -> "Software" (only when the next line continues in lowercase),
+# but not suspended hyphens: "Hard-\nund Software", "Projekt-\noder Teamleitung"
+_HYPHENATED_BREAK = re.compile(r"(\w)-\n(?!(?:und|oder|bis|sowie|bzw|noch|and|or|to)\b)(?=[a-zäöüß])")
+_APPROXIMATE_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+_tokenizer: Optional[Tuple[str, Callable[[str], int]]] = None
+
+
+def _approximate_tokens(text: str) -> int:
+    """Tokenizer-free estimate: ~one token per 4 word characters, one per symbol"""
+    return sum(math.ceil(len(piece) / 4) for piece in _APPROXIMATE_TOKEN_PATTERN.findall(text))
+
+
+def get_tokenizer() -> Tuple[str, Callable[[str], int]]:
+    """
+    (name, count_function) of the local tokenizer: tiktoken's cl100k_base
+    (the GPT-4 encoding) if installed, otherwise a regex-based estimate
+    """
+    global _tokenizer
+    if _tokenizer is None:
+        try:
+            import tiktoken
+            encoding = tiktoken.get_encoding("cl100k_base")
+            _tokenizer = ("cl100k_base", lambda text: len(encoding.encode(text, disallowed_special=())))
+        except Exception:
+            # Not installed, or the encoding file could not be loaded (offline)
+            _tokenizer = ("estimate", _approximate_tokens)
+    return _tokenizer
+
+
+def count_tokens(text: str) -> int:
+    """Number of input tokens for text"""
+    return get_tokenizer()[1](text)
+
+
+def settings_fingerprint() -> str:
+    """Identifies the current compaction settings (part of the cache key)"""
+    return f"compact{int(COMPACTION_ENABLED)}/{INPUT_TOKEN_BUDGET}"
+
+
+def _line_signature(line: str) -> str:
+    """Page headers/footers differ only in numbers ("Seite 2 von 5")"""
+    return re.sub(r"\d+", "#", line.strip().lower())
+
+
+def _repeated_lines(pages: List[List[str]]) -> set:
+    """
+    Signatures of header/footer lines: text lines at the top or bottom of
+    at least half of the pages (min. 2)
+    """
+    if len(pages) < 2:
+        return set()
+    counts = Counter()
+    for lines in pages:
+        lines = [line for line in lines if line.strip()]
+        edges = lines[:HEADER_FOOTER_LINES] + lines[-HEADER_FOOTER_LINES:]
+        counts.update({_line_signature(line) for line in edges})
+    threshold = max(2, math.ceil(len(pages) / 2))
+    return {
+        signature for signature, count in counts.items()
+        if count >= threshold and len(signature) <= 120 and sum(ch.isalpha() for ch in signature) >= 3
+    }
+
+
+def _truncate_to_budget(text: str, budget: int) -> str:
+    """Cut text at a line boundary so that it fits into budget tokens"""
+    lines = text.split("\n")
+    low, high = 0, len(lines)
+    # Binary search over the number of lines kept
+    while low < high:
+        middle = (low + high + 1) // 2
+        if count_tokens("\n".join(lines[:middle])) <= budget:
+            low = middle
+        else:
+            high = middle - 1
+    return "\n".join(lines[:low]).rstrip()
+
+
+def compact_text(text: str, token_budget: Optional[int] = None,
+                 chunk_threshold: int = 0) -> Tuple[str, Dict[str, Any]]:
+    """
+    Compact extracted CV text for the structuring prompt.
+    Text above chunk_threshold tokens is split into chunks later on and is not
+    cut to the budget (each chunk stays far below it).
+    Returns (text, stats) with token counts before and after.
+    """
+    token_budget = INPUT_TOKEN_BUDGET if token_budget is None else token_budget
+    tokenizer_name, tokens = get_tokenizer()
+    tokens_before = tokens(text)
+    chars_before = len(text)
+
+    text = _INVISIBLE_CHARS.sub("", text.replace("\r\n", "\n").replace("\r", "\n"))
+    pages = [page.split("\n") for page in text.split(PAGE_BREAK)]
+    repeated = _repeated_lines(pages)
+
+    removed_repeated = 0
+    removed_page_numbers = 0
+    kept: List[str] = []
+    for page in pages:
+        text_lines = [index for index, line in enumerate(page) if line.strip()]
+        edges = set(text_lines[:HEADER_FOOTER_LINES] + text_lines[-HEADER_FOOTER_LINES:])
+        for index, line in enumerate(page):
+            line = _HORIZONTAL_SPACE.sub(" ", line).strip()
+            if index in edges and _line_signature(line) in repeated:
+                removed_repeated += 1
+                continue
+            if line and PAGE_NUMBER_PATTERN.match(line):
+                removed_page_numbers += 1
+                continue
+            kept.append(line)
+        kept.append("")
+
+    compacted = "\n".join(kept)
+    compacted = _HYPHENATED_BREAK.sub(r"\1", compacted)
+    compacted = re.sub(r"\n{3,}", "\n\n", compacted).strip()
+
+    tokens_after = tokens(compacted)
+    truncated = False
+    chunked = bool(chunk_threshold) and tokens_after > chunk_threshold
+    if token_budget and tokens_after > token_budget and not chunked:
+        compacted = _truncate_to_budget(compacted, token_budget)
+        tokens_after = tokens(compacted)
+        truncated = True
+
+    stats = {
+        "tokenizer": tokenizer_name,
+        "tokens_before": tokens_before,
+        "tokens_after": tokens_after,
+        "chars_before": chars_before,
+        "chars_after": len(compacted),
+        "removed_repeated_lines": removed_repeated,
+        "removed_page_numbers": removed_page_numbers,
+        "token_budget": token_budget,
+        "truncated": truncated,
+        "chunked": chunked,
+    }
+    return compacted, stats
@@ -0,0 +1,181 @@
+"""
+DOCX text extraction for CV2Profile
+Streams word/document.xml plus headers and footers through an incremental
+XML parser instead of building the python-docx object model; keeps reading
+order and includes tables and text boxes
+"""
+
+import re
+import time
+import zipfile
+from typing import Any, Dict, Iterator, List, Tuple
+from xml.etree.ElementTree import XMLParser
+
+from core.upload_spool import Buffer, open_buffer
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+MC = "{http://schemas.openxmlformats.org/markup-compatibility/2006}"
+
+# Bump when the extracted text changes (part of the extraction cache key)
+DOCX_READER_VERSION = "1"
+
+# Table cells of one row are joined with this separator
+CELL_SEPARATOR = " | "
+READ_CHUNK_SIZE = 64 * 1024
+
+_HEADER_PART = re.compile(r"^word/header(\d*)\.xml$")
+_FOOTER_PART = re.compile(r"^word/footer(\d*)\.xml$")
+
+_TEXT = f"{W}t"
+_PARAGRAPH = f"{W}p"
+_ROW = f"{W}tr"
+_CELL = f"{W}tc"
+_TABLE = f"{W}tbl"
+_TEXTBOX = f"{W}txbxContent"
+_FALLBACK = f"{MC}Fallback"
+_FRAMES = {_PARAGRAPH: "p", _ROW: "tr", _CELL: "tc"}
+
+# Run content that stands for a character
+_RUN_CHARACTERS = {
+    f"{W}tab": "\t",
+    f"{W}br": "\n",
+    f"{W}cr": "\n",
+    f"{W}noBreakHyphen": "-",
+    f"{W}softHyphen": "",
+}
+
+
+class _Frame:
+    """Open paragraph, table row or table cell while parsing"""
+
+    __slots__ = ("kind", "parts", "lines")
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        # Paragraph: text pieces; row: cell texts
+        self.parts: List[str] = []
+        # Paragraph: text box lines anchored in it; cell: its lines
+        self.lines: List[str] = []
+
+
+class _PartReader:
+    """
+    Parser target for one WordprocessingML part: collects lines in reading
+    order without building elements. Paragraphs become lines, table rows one
+    line with the cells joined, text boxes follow their anchor paragraph.
+    """
+
+    def __init__(self, stats: Dict[str, int]):
+        self.stats = stats
+        self.lines: List[str] = []
+        self._frames: List[_Frame] = []
+        self._in_text = False
+        # Depth inside mc:Fallback (duplicate VML copy of text boxes etc.)
+        self._skip = 0
+
+    def _deliver(self, lines: List[str]):
+        # Lines go to the enclosing cell or anchor paragraph, else to the output
+        for frame in reversed(self._frames):
+            if frame.kind != "tr":
+                frame.lines.extend(lines)
+                return
+        self.lines.extend(lines)
+
+    def start(self, tag: str, attrib: Dict[str, str]):
+        if tag == _FALLBACK:
+            self._skip += 1
+        elif self._skip:
+            return
+        elif tag == _TEXT:
+            self._in_text = bool(self._frames) and self._frames[-1].kind == "p"
+        elif tag in _RUN_CHARACTERS:
+            if self._frames and self._frames[-1].kind == "p":
+                self._frames[-1].parts.append(_RUN_CHARACTERS[tag])
+        elif tag in _FRAMES:
+            self._frames.append(_Frame(_FRAMES[tag]))
+        elif tag == _TEXTBOX:
+            self.stats["textboxes"] += 1
+        elif tag == _TABLE:
+            self.stats["tables"] += 1
+
+    def data(self, text: str):
+        if self._in_text:
+            self._frames[-1].parts.append(text)
+
+    def end(self, tag: str):
+        if tag == _FALLBACK:
+            self._skip -= 1
+        elif self._skip:
+            return
+        elif tag == _TEXT:
+            self._in_text = False
+        elif tag == _PARAGRAPH:
+            frame = self._frames.pop()
+            self.stats["paragraphs"] += 1
+            text = "".join(frame.parts).strip()
+            self._deliver(([text] if text else []) + frame.lines)
+        elif tag == _CELL:
+            frame = self._frames.pop()
+            cell = "\n".join(frame.lines).strip()
+            if self._frames and self._frames[-1].kind == "tr":
+                self._frames[-1].parts.append(cell)
+        elif tag == _ROW:
+            frame = self._frames.pop()
+            row = CELL_SEPARATOR.join(cell for cell in frame.parts if cell)
+            if row:
+                self._deliver([row])
+
+    def close(self):
+        pass
+
+
+def _part_lines(stream, stats: Dict[str, int]) -> Iterator[str]:
+    """Lines of one part, parsed chunk by chunk from the (compressed) archive stream"""
+    reader = _PartReader(stats)
+    parser = XMLParser(target=reader)
+    while True:
+        chunk = stream.read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        parser.feed(chunk)
+        yield from reader.lines
+        reader.lines.clear()
+    parser.close()
+    yield from reader.lines
+
+
+def _numbered_parts(names: List[str], pattern: "re.Pattern[str]") -> List[str]:
+    """Header/footer part names in numeric order"""
+    found = [(int(match.group(1) or 0), name) for name in names for match in [pattern.match(name)] if match]
+    return [name for _, name in sorted(found)]
+
+
+def extract_docx_text(file_bytes: Buffer) -> Tuple[str, Dict[str, Any]]:
+    """
+    Extract text from a DOCX file: headers, body, footers (each distinct
+    header/footer once). Returns (text, stats).
+    """
+    started = time.perf_counter()
+    stats: Dict[str, Any] = {"paragraphs": 0, "tables": 0, "textboxes": 0, "parts": 0}
+    sections: List[str] = []
+    seen = set()
+
+    with zipfile.ZipFile(open_buffer(file_bytes)) as archive:
+        names = archive.namelist()
+        if "word/document.xml" not in names:
+            raise ValueError("Not a Word document (word/document.xml missing)")
+        parts = (_numbered_parts(names, _HEADER_PART) + ["word/document.xml"]
+                 + _numbered_parts(names, _FOOTER_PART))
+        for name in parts:
+            with archive.open(name) as stream:
+                text = "\n".join(_part_lines(stream, stats))
+            stats["parts"] += 1
+            # Documents often repeat the same header for first/even/odd pages
+            if text and (name == "word/document.xml" or text not in seen):
+                seen.add(text)
+                sections.append(text)
+
+    text = "\n".join(sections)
+    stats["chars"] = len(text)
+    stats["seconds"] = round(time.perf_counter() - started, 4)
+    return text, stats
@@ -0,0 +1,218 @@
+"""
+OpenAI endpoint pool for CV2Profile
+Several API keys / OpenAI-compatible base URLs with weighted or
+least-outstanding-requests routing, per-endpoint health tracking and
+per-stage (vision / structuring) models
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from openai import AsyncOpenAI
+
+from core.openai_pool import get_client_pool
+from core.resilience import CircuitBreaker, CircuitOpenError
+
+ROUTING_STRATEGIES = ["least_outstanding", "weighted"]
+
+
+class Endpoint:
+    """One API key + base URL with its own models, weight and health state"""
+
+    def __init__(self, name: str, client: AsyncOpenAI, models: Optional[Dict[str, Optional[str]]] = None,
+                 weight: float = 1.0, breaker: Optional[CircuitBreaker] = None):
+        self.name = name
+        self.client = client
+        # Stage -> model; a stage mapped to None is not served by this endpoint
+        self.models = models or {}
+        self.weight = max(weight, 0.001)
+        self.breaker = breaker or CircuitBreaker(failure_threshold=3, reset_timeout=30.0)
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.total_seconds = 0.0
+
+    def supports(self, stage: str) -> bool:
+        return stage not in self.models or bool(self.models[stage])
+
+    def model_for(self, stage: str, default: str) -> str:
+        return self.models.get(stage) or default
+
+    @property
+    def healthy(self) -> bool:
+        """Circuit closed, or open long enough that a probe may be sent"""
+        breaker = self.breaker
+        if breaker.state == "open":
+            return time.monotonic() - breaker.opened_at >= breaker.reset_timeout
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "base_url": str(self.client.base_url),
+            "weight": self.weight,
+            "models": self.models,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "failures": self.failures,
+            "avg_seconds": round(self.total_seconds / self.requests, 3) if self.requests else None,
+            **self.breaker.stats(),
+        }
+
+
+class EndpointPool:
+    """
+    Routes each request to a healthy endpoint that serves the stage.
+    Endpoints already tried for the same call are avoided, so retries and
+    hedged requests fail over to another endpoint.
+    """
+
+    def __init__(self, endpoints: List[Endpoint], strategy: str = "least_outstanding"):
+        if not endpoints:
+            raise ValueError("Endpoint pool needs at least one endpoint")
+        if strategy not in ROUTING_STRATEGIES:
+            raise ValueError(f"Unknown routing strategy: {strategy}")
+        self.endpoints = endpoints
+        self.strategy = strategy
+        self._lock = threading.Lock()
+
+    def pick(self, stage: str, exclude: Iterable[Endpoint] = ()) -> Endpoint:
+        """Choose an endpoint for stage; raises CircuitOpenError if none is healthy"""
+        with self._lock:
+            candidates = [endpoint for endpoint in self.endpoints if endpoint.supports(stage)]
+            if not candidates:
+                raise ValueError(f"No OpenAI endpoint configured for stage '{stage}'")
+            healthy = [endpoint for endpoint in candidates if endpoint.healthy]
+            excluded: Set[int] = {id(endpoint) for endpoint in exclude}
+            while healthy:
+                fresh = [endpoint for endpoint in healthy if id(endpoint) not in excluded]
+                endpoint = self._choose(fresh or healthy)
+                # Recovering endpoints admit a single probe request at a time
+                if endpoint.breaker.allow():
+                    endpoint.outstanding += 1
+                    endpoint.requests += 1
+                    return endpoint
+                healthy.remove(endpoint)
+            raise CircuitOpenError("All OpenAI endpoints are unavailable (circuit breakers open)")
+
+    def _choose(self, candidates: List[Endpoint]) -> Endpoint:
+        if self.strategy == "weighted":
+            return random.choices(candidates, weights=[endpoint.weight for endpoint in candidates])[0]
+        lowest = min(endpoint.outstanding / endpoint.weight for endpoint in candidates)
+        return random.choice([
+            endpoint for endpoint in candidates if endpoint.outstanding / endpoint.weight == lowest
+        ])
+
+    def release(self, endpoint: Endpoint, seconds: float, failed: bool):
+        """Record the outcome of a request started with pick()"""
+        with self._lock:
+            endpoint.outstanding -= 1
+            endpoint.total_seconds += seconds
+            if failed:
+                endpoint.failures += 1
+
+    def breaker_stats(self) -> Dict[str, Any]:
+        """
+        Circuit state of the pool: closed while any endpoint is closed, open
+        once all of them are; plus each endpoint's breaker
+        """
+        breakers = {endpoint.name: endpoint.breaker.stats() for endpoint in self.endpoints}
+        states = {breaker["state"] for breaker in breakers.values()}
+        state = "closed" if "closed" in states else "half_open" if "half_open" in states else "open"
+        return {"state": state, "endpoints": breakers}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "strategy": self.strategy,
+            "endpoints": [endpoint.stats() for endpoint in self.endpoints],
+        }
+
+
+def build_endpoint_pool(config: List[Dict[str, Any]], strategy: str = "least_outstanding",
+                        failure_threshold: int = 3, reset_timeout: float = 30.0) -> EndpointPool:
+    """
+    Build a pool from endpoint definitions:
+    {"name", "api_key", "base_url", "weight", "structuring_model",
+     "structuring_fast_model", "vision_model"}
+    ("vision_model": null marks an endpoint without vision support)
+    """
+    client_pool = get_client_pool()
+    endpoints = []
+    for index, entry in enumerate(config):
+        if not entry.get("api_key"):
+            raise ValueError(f"Endpoint {index + 1} has no api_key")
+        models = {
+            stage: entry[f"{stage}_model"]
+            for stage in ("structuring", "structuring_fast", "vision") if f"{stage}_model" in entry
+        }
+        endpoints.append(Endpoint(
+            name=entry.get("name") or f"endpoint-{index + 1}",
+            client=client_pool.get_client(entry["api_key"], entry.get("base_url")),
+            models=models,
+            weight=float(entry.get("weight", 1.0)),
+            breaker=CircuitBreaker(failure_threshold=failure_threshold, reset_timeout=reset_timeout),
+        ))
+    return EndpointPool(endpoints, strategy=strategy)
+
+
+def load_endpoint_config() -> Optional[List[Dict[str, Any]]]:
+    """Endpoint definitions from OPENAI_ENDPOINTS (JSON) or OPENAI_ENDPOINTS_FILE, None if not configured"""
+    raw = os.getenv("OPENAI_ENDPOINTS")
+    path = os.getenv("OPENAI_ENDPOINTS_FILE")
+    if not raw and path:
+        with open(path, "r", encoding="utf-8") as f:
+            raw = f.read()
+    if not raw:
+        return None
+    config = json.loads(raw)
+    if not isinstance(config, list):
+        raise ValueError("OPENAI_ENDPOINTS must be a JSON list of endpoint objects")
+    return config
+
+
+def endpoints_configured() -> bool:
+    return bool(os.getenv("OPENAI_ENDPOINTS") or os.getenv("OPENAI_ENDPOINTS_FILE"))
+
+
+_pools: Dict[Optional[str], EndpointPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_endpoint_pool(api_key: Optional[str] = None) -> EndpointPool:
+    """
+    Process-wide endpoint pool. Uses the configured endpoints
+    (OPENAI_ENDPOINTS / OPENAI_ENDPOINTS_FILE) if present, otherwise a
+    single endpoint for api_key (or OPENAI_API_KEY)
+    """
+    configured = endpoints_configured()
+    key = None if configured else (api_key or os.getenv("OPENAI_API_KEY"))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            if configured:
+                config = load_endpoint_config()
+            elif key:
+                config = [{"name": "default", "api_key": key}]
+            else:
+                raise ValueError("OpenAI API key not configured")
+            pool = build_endpoint_pool(
+                config,
+                strategy=os.getenv("OPENAI_ROUTING", "least_outstanding"),
+                # OPENAI_CIRCUIT_* (the former process-wide breaker) applies per endpoint as well
+                failure_threshold=int(
+                    os.getenv("OPENAI_ENDPOINT_FAILURES") or os.getenv("OPENAI_CIRCUIT_FAILURES") or "3"
+                ),
+                reset_timeout=float(os.getenv("OPENAI_ENDPOINT_RESET") or os.getenv("OPENAI_CIRCUIT_RESET") or "30"),
+            )
+            _pools[key] = pool
+        return pool
+
+
+def reset_endpoint_pools():
+    """Forget cached pools (after the connection pool was closed)"""
+    with _pools_lock:
+        _pools.clear()
@@ -0,0 +1,189 @@
+"""
+Persistent extraction cache for CV2Profile
+Stores structured CV data on disk (SQLite), keyed by file hash, prompt version and model
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional
+
+
+def build_cache_key(file_bytes: bytes, *parts: str, file_sha256: Optional[str] = None) -> str:
+    """
+    Build a content-addressed cache key from the file bytes and any
+    additional parts (prompt fingerprint, model name, extraction mode).
+    file_sha256: hex digest of the file if already known (computed while uploading)
+    """
+    digest = hashlib.sha256()
+    digest.update(bytes.fromhex(file_sha256) if file_sha256 else hashlib.sha256(file_bytes).digest())
+    for part in parts:
+        digest.update(b"\x00")
+        digest.update(str(part).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def fingerprint_text(*texts: str) -> str:
+    """Short stable hash of one or more prompt texts"""
+    digest = hashlib.sha256()
+    for text in texts:
+        digest.update(text.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()[:16]
+
+
+class ExtractionCache:
+    def __init__(self, db_path: str, max_bytes: int = 50 * 1024 * 1024, ttl_seconds: int = 30 * 24 * 3600):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # One connection shared across threads, serialized by the lock
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS extractions (
+                key TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_extractions_last_access ON extractions(last_access)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return cached data for key, or None on miss/expiry"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, created_at FROM extractions WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            data, created_at = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM extractions WHERE key = ?", (key,))
+                self._conn.commit()
+                self.evictions += 1
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE extractions SET last_access = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+
+        return json.loads(data)
+
+    def put(self, key: str, data: Dict[str, Any]):
+        """Store data for key and evict least recently used entries above the size limit"""
+        payload = json.dumps(data, ensure_ascii=False)
+        size = len(payload.encode("utf-8"))
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO extractions (key, data, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, payload, size, now, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        """Drop expired entries, then LRU entries until the cache fits max_bytes"""
+        if self.ttl_seconds:
+            cursor = self._conn.execute(
+                "DELETE FROM extractions WHERE created_at < ?", (now - self.ttl_seconds,)
+            )
+            self.evictions += max(cursor.rowcount, 0)
+
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM extractions").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        stale_keys = []
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM extractions ORDER BY last_access ASC"
+        ):
+            if total <= self.max_bytes:
+                break
+            stale_keys.append((key,))
+            total -= size
+
+        self._conn.executemany("DELETE FROM extractions WHERE key = ?", stale_keys)
+        self.evictions += len(stale_keys)
+
+    def clear(self):
+        """Remove all cached entries"""
+        with self._lock:
+            self._conn.execute("DELETE FROM extractions")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current cache size"""
+        with self._lock:
+            entries, total_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM extractions"
+            ).fetchone()
+
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": total_bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_cache: Optional[ExtractionCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_extraction_cache() -> Optional[ExtractionCache]:
+    """
+    Process-wide extraction cache configured from environment variables.
+    Returns None if caching is disabled (EXTRACTION_CACHE_ENABLED=false)
+    """
+    global _cache
+    if os.getenv("EXTRACTION_CACHE_ENABLED", "true").lower() in ("0", "false", "no"):
+        return None
+
+    with _cache_lock:
+        if _cache is None:
+            _cache = ExtractionCache(
+                db_path=os.getenv("EXTRACTION_CACHE_PATH", os.path.join("temp", "extraction_cache.db")),
+                max_bytes=int(os.getenv("EXTRACTION_CACHE_MAX_BYTES", str(50 * 1024 * 1024))),
+                ttl_seconds=int(os.getenv("EXTRACTION_CACHE_TTL", str(30 * 24 * 3600))),
+            )
+        return _cache
@@ -3,79 +3,403 @@ AI-based CV data extraction using OpenAI API
 Supports PDF, DOCX, and image formats
 """
 
+import asyncio
 import base64
-import io
 import json
-from typing import Dict, List, Any, Optional
-import PyPDF2
-from docx import Document
-from PIL import Image
-from openai import OpenAI
+import os
+import sys
+import time
+from typing import AsyncIterator, Callable, Dict, List, Any, Optional, Set, Tuple
+import openai
+from openai import AsyncOpenAI
 import httpx
 
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from resources.extraction_rules import (
+    CHUNK_PROMPT_NOTE,
+    COMPACT_EXTRACTION_USER_PROMPT,
+    EXTRACTION_SECTIONS,
+    EXTRACTION_SYSTEM_PROMPT,
+    EXTRACTION_USER_PROMPT,
+    PRE_PARSER_VERSION,
+    apply_pre_parsed_fields,
+    build_section_prompt,
+    decode_compact_output,
+    decode_compact_section,
+    extract_city_from_address,
+    heuristic_cv_data,
+    pre_parse_cv,
+    validate_cv_data,
+)
+
+from core.extraction_cache import ExtractionCache, build_cache_key, fingerprint_text, get_extraction_cache
+from core.json_stream import SectionStreamParser
+from core.pdf_text import extract_pdf_pages, join_pages
+from core.pdf_raster import (
+    PDF_VISION_CONCURRENCY,
+    PDF_VISION_ENABLED,
+    PDF_VISION_MAX_PAGES,
+    batch_pages,
+    find_scanned_pages,
+    render_pages,
+    split_batch_text,
+    stitch_pages,
+    vision_prompt,
+)
+from core.pdf_raster import settings_fingerprint as pdf_raster_fingerprint
+from core.docx_text import DOCX_READER_VERSION, extract_docx_text
+from core.image_preprocessing import preprocess_image, settings_fingerprint
+from core.long_document import merge_chunk_results, split_into_chunks
+from core.compaction import COMPACTION_ENABLED, compact_text, count_tokens, get_tokenizer
+from core.compaction import settings_fingerprint as compaction_fingerprint
+from core.resilience import (
+    CircuitOpenError, ResilientCaller, deadline_expired, get_resilient_caller, is_retryable,
+)
+from core.endpoints import Endpoint, EndpointPool, get_endpoint_pool
+from core.cascade import CASCADE_FAST_MODEL, get_cascade_stats
+from core.rate_limiter import (
+    RateLimiter,
+    estimate_request_tokens,
+    get_rate_limiter,
+    rate_limit_scope,
+)
+from core.structured_output import (
+    REASK_ENABLED,
+    STRUCTURED_OUTPUT,
+    broken_sections,
+    build_response_format,
+    repair_json,
+    schema_from_prompt,
+    section_schema,
+)
+
+# Models used for the two extraction stages
+STRUCTURING_MODEL = "gpt-4"
+VISION_MODEL = "gpt-4-vision-preview"
+# Default model per stage; endpoints may override them (core.endpoints)
+STAGE_MODELS = {
+    "structuring": STRUCTURING_MODEL,
+    "structuring_fast": CASCADE_FAST_MODEL,
+    "vision": VISION_MODEL,
+}
+
+# Structuring mode: "single" (one call for the whole document),
+# "split" (one smaller call per schema section, run concurrently),
+# "fast" (rule-based pre-parser only, no structuring call - for triage) or
+# "cascade" (fast model first, large model only if validation fails)
+EXTRACTION_MODES = ["single", "split", "fast", "cascade"]
+EXTRACTION_MODE = os.getenv("EXTRACTION_MODE", "single")
+
+# Contact data, date ranges and headings are pre-parsed locally; the
+# structuring prompt only carries the remaining text
+PRE_PARSE_ENABLED = os.getenv("PRE_PARSE_ENABLED", "true").lower() not in ("0", "false", "no")
+
+# Long documents above this many (estimated) input tokens are split into
+# overlapping chunks that are extracted concurrently and merged (map-reduce)
+LONG_DOCUMENT_TOKEN_THRESHOLD = int(os.getenv("LONG_DOCUMENT_TOKEN_THRESHOLD", "6000"))
+LONG_DOCUMENT_CHUNK_TOKENS = int(os.getenv("LONG_DOCUMENT_CHUNK_TOKENS", "3000"))
+LONG_DOCUMENT_OVERLAP_TOKENS = int(os.getenv("LONG_DOCUMENT_OVERLAP_TOKENS", "200"))
+
+# The structuring call answers in the compact wire format (short keys,
+# entries as arrays) to cut generated tokens; decoded after parsing
+COMPACT_OUTPUT = os.getenv("COMPACT_OUTPUT", "true").lower() not in ("0", "false", "no")
+
+# JSON schemas of the structuring response, derived from the prompts
+CV_RESPONSE_SCHEMA = schema_from_prompt(EXTRACTION_USER_PROMPT)
+COMPACT_RESPONSE_SCHEMA = schema_from_prompt(COMPACT_EXTRACTION_USER_PROMPT)
+# Models that rejected response_format; they get prompt-only JSON
+_UNSUPPORTED_FORMAT_MODELS: Set[str] = set()
+
+# Output budget per section in split mode
+SECTION_MAX_TOKENS = {
+    "personal": 600,
+    "experience": 2000,
+    "education": 1000,
+    "skills": 500,
+    "certifications": 600,
+}
+
+
+def _is_transient(error: BaseException) -> bool:
+    """True if the error, or one it was raised from, is a transient upstream error"""
+    while error is not None:
+        if is_retryable(error):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
 
 class CVExtractor:
-    def __init__(self, openai_api_key: str):
-        # Create OpenAI client without proxies to avoid compatibility issues
-        self.client = OpenAI(
-            api_key=openai_api_key,
-            http_client=httpx.Client()
-        )
+    def __init__(self, openai_api_key: Optional[str] = None, cache: Optional[ExtractionCache] = None,
+                 base_url: Optional[str] = None, client: Optional[AsyncOpenAI] = None,
+                 mode: Optional[str] = None, resilience: Optional[ResilientCaller] = None,
+                 rate_limiter: Optional[RateLimiter] = None, endpoints: Optional[EndpointPool] = None,
+                 compact_output: Optional[bool] = None):
+        # Prefer a shared endpoint pool or (pooled) client; otherwise create a
+        # private one. Async client so OpenAI calls don't block the event loop,
+        # created without proxies to avoid compatibility issues.
+        # Retries are handled by the resilience layer, not the SDK
+        self._owns_client = client is None and endpoints is None
+        if endpoints is None:
+            self.client = client or AsyncOpenAI(
+                api_key=openai_api_key,
+                base_url=base_url,
+                max_retries=0,
+                http_client=httpx.AsyncClient()
+            )
+        else:
+            self.client = endpoints.endpoints[0].client
+        self.resilience = resilience or get_resilient_caller()
+        # A single client shares the resilience layer's circuit breaker
+        self.endpoints = endpoints or EndpointPool([Endpoint("default", self.client, breaker=self.resilience.breaker)])
+        # Shared RPM/TPM budget across all processes (None = unlimited)
+        self.rate_limiter = rate_limiter if rate_limiter is not None else get_rate_limiter()
+        self.cache = cache
+        self.mode = mode or EXTRACTION_MODE
+        self.compact_output = COMPACT_OUTPUT if compact_output is None else compact_output
+        # Measurements of the last extraction (text extraction stats etc.)
+        self.metrics: Dict[str, Any] = {}
+    
+    async def aclose(self):
+        """Close the OpenAI client if this extractor created it"""
+        if self._owns_client:
+            await self.client.close()
+    
+    def _cache_key(self, file_bytes: bytes, file_type: str, content_hash: Optional[str] = None) -> str:
+        """Cache key: file content (or its known SHA-256) + prompt version + models involved + mode"""
+        if self.mode == "split":
+            prompt_version = fingerprint_text(
+                EXTRACTION_SYSTEM_PROMPT, *[build_section_prompt(section) for section in EXTRACTION_SECTIONS]
+            )
+        else:
+            prompt_version = fingerprint_text(EXTRACTION_SYSTEM_PROMPT, self._structuring_prompt())
+        models = self._stage_models("structuring")
+        if self.mode == "cascade":
+            models = f"{self._stage_models('structuring_fast')}>{models}"
+        if file_type in ["jpg", "jpeg", "png"]:
+            models = f"{self._stage_models('vision')}+{models}+{settings_fingerprint()}"
+        elif file_type == "docx":
+            models = f"{models}+docx{DOCX_READER_VERSION}"
+        elif file_type == "pdf" and PDF_VISION_ENABLED:
+            # Scanned pages go through the vision model
+            models = f"{self._stage_models('vision')}+{models}+{pdf_raster_fingerprint()}"
+        long_document = f"long{LONG_DOCUMENT_TOKEN_THRESHOLD}/{LONG_DOCUMENT_CHUNK_TOKENS}/{LONG_DOCUMENT_OVERLAP_TOKENS}"
+        pre_parser = f"pre{PRE_PARSER_VERSION}" if PRE_PARSE_ENABLED else "pre-off"
+        return build_cache_key(file_bytes, prompt_version, models, self.mode, long_document, pre_parser,
+                               compaction_fingerprint(), f"out-{STRUCTURED_OUTPUT}", file_sha256=content_hash)
+    
+    def _stage_models(self, stage: str) -> str:
+        """Models that may serve a stage, with the endpoints' overrides resolved"""
+        return "|".join(sorted({
+            endpoint.model_for(stage, STAGE_MODELS[stage])
+            for endpoint in self.endpoints.endpoints if endpoint.supports(stage)
+        }))
     
-    async def extract_cv_data(self, file_bytes: bytes, file_type: str) -> Dict[str, Any]:
+    async def extract_cv_data(self, file_bytes: bytes, file_type: str,
+                              on_progress: Optional[Callable[..., None]] = None,
+                              content_hash: Optional[str] = None) -> Dict[str, Any]:
         """
-        Extract structured data from CV file using OpenAI
+        Extract structured data from CV file using OpenAI.
+        file_bytes may also be a memory-mapped upload (core.upload_spool),
+        content_hash its SHA-256 if already known.
+        on_progress is called with the name of each stage as it starts
+        (plus keyword details such as text extraction metrics).
         """
+        progress = on_progress or (lambda stage, **details: None)
+        self.metrics = {}
         try:
+            cache_key = None
+            if self.cache is not None:
+                cache_key = self._cache_key(file_bytes, file_type, content_hash)
+                cached_data = self.cache.get(cache_key)
+                if cached_data is not None:
+                    progress("cache_hit")
+                    return cached_data
+            
             # Extract text based on file type
-            if file_type == "pdf":
-                text = self._extract_pdf_text(file_bytes)
-            elif file_type == "docx":
-                text = self._extract_docx_text(file_bytes)
-            elif file_type in ["jpg", "jpeg", "png"]:
-                text = await self._extract_image_text(file_bytes)
-            else:
-                raise ValueError(f"Unsupported file type: {file_type}")
+            progress("reading_file")
+            text = self._compact(await self._extract_text(file_bytes, file_type))
+            progress("text_extracted", metrics=dict(self.metrics))
             
             # Use OpenAI to structure the data
-            structured_data = await self._structure_with_openai(text)
+            progress("structuring")
+            structured_data = await self._structure(text)
+            
+            if cache_key is not None:
+                self.cache.put(cache_key, structured_data)
             return structured_data
             
+        except CircuitOpenError:
+            raise
         except Exception as e:
             raise Exception(f"Error extracting CV data: {str(e)}")
     
-    def _extract_pdf_text(self, file_bytes: bytes) -> str:
-        """Extract text from PDF file"""
+    async def stream_cv_data(self, file_bytes: bytes, file_type: str,
+                             content_hash: Optional[str] = None) -> AsyncIterator[Tuple[Optional[str], Any]]:
+        """
+        Streaming variant of extract_cv_data.
+        Yields (section, value) for each top-level section (personal, experience, ...)
+        as soon as the model has finished generating it, then (None, full_data).
+        """
+        self.metrics = {}
+        try:
+            cache_key = None
+            if self.cache is not None:
+                cache_key = self._cache_key(file_bytes, file_type, content_hash)
+                cached_data = self.cache.get(cache_key)
+                if cached_data is not None:
+                    for section, value in cached_data.items():
+                        yield section, value
+                    yield None, cached_data
+                    return
+            
+            text = self._compact(await self._extract_text(file_bytes, file_type))
+            
+            structured_data = None
+            async for section, value in self._stream_structure(text):
+                if section is None:
+                    structured_data = value
+                else:
+                    yield section, value
+            
+            if cache_key is not None:
+                self.cache.put(cache_key, structured_data)
+            yield None, structured_data
+            
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            raise Exception(f"Error extracting CV data: {str(e)}")
+    
+    async def _extract_text(self, file_bytes: bytes, file_type: str) -> str:
+        """Extract raw text based on file type"""
+        # PDF/DOCX parsing is CPU-bound, run it off the event loop
+        if file_type == "pdf":
+            return await self._extract_pdf(file_bytes)
+        elif file_type == "docx":
+            return await asyncio.to_thread(self._extract_docx_text, file_bytes)
+        elif file_type in ["jpg", "jpeg", "png"]:
+            return await self._extract_image_text(file_bytes)
+        raise ValueError(f"Unsupported file type: {file_type}")
+    
+    def _compact(self, text: str) -> str:
+        """Drop headers/footers and whitespace noise, enforce the input token budget"""
+        if COMPACTION_ENABLED:
+            # Long documents are chunked instead of cut to the budget
+            text, stats = compact_text(text, chunk_threshold=LONG_DOCUMENT_TOKEN_THRESHOLD)
+        else:
+            tokens = count_tokens(text)
+            stats = {"tokenizer": get_tokenizer()[0], "tokens_before": tokens, "tokens_after": tokens}
+        self.metrics["tokens"] = stats
+        return text
+    
+    async def _extract_pdf(self, file_bytes: bytes) -> str:
+        """Text layer of the PDF; scanned pages without one are read by the vision model"""
+        pages = await asyncio.to_thread(self._extract_pdf_pages, file_bytes)
+        scanned = find_scanned_pages(pages) if PDF_VISION_ENABLED else []
+        if scanned:
+            pages = await self._read_scanned_pages(file_bytes, pages, scanned)
+        text = join_pages(pages)
+        if not text:
+            raise Exception("Error reading PDF: no text layer and no readable page images")
+        return text
+    
+    def _extract_pdf_pages(self, file_bytes: bytes) -> List[str]:
+        """Extract text per page from PDF file (large documents page-parallel, see core.pdf_text)"""
         try:
-            pdf_file = io.BytesIO(file_bytes)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-            return text.strip()
+            pages, stats = extract_pdf_pages(file_bytes)
+            self.metrics["pdf"] = stats
+            return pages
         except Exception as e:
             raise Exception(f"Error reading PDF: {str(e)}")
     
+    async def _read_scanned_pages(self, file_bytes: bytes, pages: List[str], scanned: List[int]) -> List[str]:
+        """
+        Render the scanned pages, downscale them like uploaded images and read
+        them with the vision model: several pages per request, requests run
+        concurrently; the texts are stitched back in page order
+        """
+        started = time.perf_counter()
+        stats: Dict[str, Any] = {"scanned_pages": [index + 1 for index in scanned]}
+        self.metrics["scanned_pdf"] = stats
+        try:
+            selected = scanned[:PDF_VISION_MAX_PAGES] if PDF_VISION_MAX_PAGES else scanned
+            stats["skipped_pages"] = [index + 1 for index in scanned[len(selected):]]
+            rendered = await asyncio.to_thread(render_pages, file_bytes, selected)
+            indices = sorted(rendered)
+            stats["unreadable_pages"] = [index + 1 for index in selected if index not in rendered]
+            processed = await asyncio.gather(
+                *[asyncio.to_thread(preprocess_image, rendered[index]) for index in indices]
+            )
+            images = {index: (image, mime_type) for index, (image, mime_type, _) in zip(indices, processed)}
+            stats["bytes_rendered"] = sum(len(image) for image in rendered.values())
+            stats["bytes_sent"] = sum(len(image) for image, _ in images.values())
+            
+            semaphore = asyncio.Semaphore(max(1, PDF_VISION_CONCURRENCY))
+            unmarked: List[int] = []
+            
+            async def read_batch(batch: List[int]) -> Dict[int, str]:
+                async with semaphore:
+                    text = await self._read_page_images(batch, [images[index] for index in batch])
+                texts = split_batch_text(text, batch)
+                if texts is None:
+                    # Page markers missing: keep the answer in order on the batch's first page
+                    unmarked.append(batch[0] + 1)
+                    texts = {batch[0]: text.strip()}
+                return texts
+            
+            batches = batch_pages(indices)
+            texts: Dict[int, str] = {}
+            for batch_texts in await asyncio.gather(*[read_batch(batch) for batch in batches]):
+                texts.update(batch_texts)
+            stats.update(
+                requests=len(batches),
+                unmarked_batches=unmarked,
+                chars=sum(len(text) for text in texts.values()),
+                seconds=round(time.perf_counter() - started, 4),
+            )
+            return stitch_pages(pages, texts)
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            raise Exception(f"Error reading scanned PDF pages: {str(e)}")
+    
+    async def _read_page_images(self, indices: List[int], images: List[Tuple[bytes, str]]) -> str:
+        """One vision request for one or more consecutive page images"""
+        content: List[Dict[str, Any]] = [{"type": "text", "text": vision_prompt(indices)}]
+        for image_bytes, mime_type in images:
+            base64_image = base64.b64encode(image_bytes).decode('utf-8')
+            content.append({"type": "image_url", "image_url": {"url": f"data:{mime_type};base64,{base64_image}"}})
+        response = await self._create_completion(
+            "vision",
+            model=VISION_MODEL,
+            messages=[{"role": "user", "content": content}],
+            max_tokens=min(4000, 2000 * len(indices))
+        )
+        return response.choices[0].message.content or ""
+    
     def _extract_docx_text(self, file_bytes: bytes) -> str:
-        """Extract text from DOCX file"""
+        """Extract text from DOCX file (body, tables, text boxes, headers/footers, see core.docx_text)"""
         try:
-            doc_file = io.BytesIO(file_bytes)
-            doc = Document(doc_file)
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text.strip()
+            text, stats = extract_docx_text(file_bytes)
+            self.metrics["docx"] = stats
+            return text
         except Exception as e:
             raise Exception(f"Error reading DOCX: {str(e)}")
     
     async def _extract_image_text(self, file_bytes: bytes) -> str:
         """Extract text from image using GPT-4 Vision"""
         try:
+            # Downscale/grayscale/re-encode before upload, off the event loop
+            image_bytes, mime_type, stats = await asyncio.to_thread(preprocess_image, file_bytes)
+            self.metrics["image"] = stats
+            
             # Convert image to base64
-            base64_image = base64.b64encode(file_bytes).decode('utf-8')
+            base64_image = base64.b64encode(image_bytes).decode('utf-8')
             
-            response = self.client.chat.completions.create(
-                model="gpt-4-vision-preview",
+            response = await self._create_completion(
+                "vision",
+                model=VISION_MODEL,
                 messages=[
                     {
                         "role": "user",
@@ -87,7 +411,7 @@ class CVExtractor:
                             {
                                 "type": "image_url",
                                 "image_url": {
-                                    "url": f"data:image/jpeg;base64,{base64_image}"
+                                    "url": f"data:{mime_type};base64,{base64_image}"
                                 }
                             }
                         ]
@@ -97,59 +421,548 @@ class CVExtractor:
             )
             
             return response.choices[0].message.content
+        except CircuitOpenError:
+            raise
         except Exception as e:
             raise Exception(f"Error extracting text from image: {str(e)}")
     
-    async def _structure_with_openai(self, text: str) -> Dict[str, Any]:
+    def _pre_parse(self, text: str) -> Optional[Dict[str, Any]]:
+        """Run the rule-based pre-parser (always in fast mode)"""
+        if not PRE_PARSE_ENABLED and self.mode != "fast":
+            return None
+        started = time.perf_counter()
+        parsed = pre_parse_cv(text)
+        self.metrics["pre_parse"] = {**parsed["stats"], "seconds": round(time.perf_counter() - started, 5)}
+        return parsed
+    
+    async def _structure(self, text: str) -> Dict[str, Any]:
+        """Structure the extracted text using the configured mode"""
+        parsed = self._pre_parse(text)
+        if self.mode == "fast":
+            return self._postprocess(heuristic_cv_data(parsed))
+        if self.mode == "cascade":
+            return await self._structure_cascade(text, parsed)
+        if parsed is None:
+            return await self._structure_text(text)
+        structured_data = await self._structure_text(parsed["remainder"])
+        return apply_pre_parsed_fields(structured_data, parsed)
+    
+    async def _structure_text(self, text: str) -> Dict[str, Any]:
+        """Structuring calls for (pre-parsed) text: map-reduce, split or single"""
+        if self._is_long_document(text):
+            return await self._structure_map_reduce(text)
+        if self.mode == "split":
+            return await self._structure_split_with_openai(text)
+        return await self._structure_with_openai(text)
+    
+    async def _stream_structure(self, text: str) -> AsyncIterator[Tuple[Optional[str], Any]]:
+        """Streaming counterpart of _structure"""
+        parsed = self._pre_parse(text)
+        if self.mode == "fast":
+            structured_data = self._postprocess(heuristic_cv_data(parsed))
+            for section, value in structured_data.items():
+                yield section, value
+            yield None, structured_data
+            return
+        if self.mode == "cascade":
+            # Only the accepted tier's result is final, sections follow at the end
+            structured_data = await self._structure_cascade(text, parsed)
+            for section, value in structured_data.items():
+                yield section, value
+            yield None, structured_data
+            return
+        
+        if parsed is not None:
+            text = parsed["remainder"]
+        async for section, value in self._stream_structure_text(text):
+            if parsed is not None and section in ("personal", None):
+                # Contact lines were removed from the prompt, fill them in from the rules
+                if section is None:
+                    value = apply_pre_parsed_fields(value, parsed)
+                else:
+                    value = apply_pre_parsed_fields({"personal": value}, parsed)["personal"]
+            yield section, value
+    
+    async def _stream_structure_text(self, text: str) -> AsyncIterator[Tuple[Optional[str], Any]]:
+        """Streaming structuring calls for (pre-parsed) text"""
+        if self._is_long_document(text):
+            # Sections are only final after the merge step
+            structured_data = await self._structure_map_reduce(text)
+            for section, value in structured_data.items():
+                yield section, value
+            yield None, structured_data
+            return
+        
+        if self.mode == "split":
+            stream = self._stream_structure_split_with_openai(text)
+        else:
+            stream = self._stream_structure_with_openai(text)
+        async for section, value in stream:
+            yield section, value
+    
+    async def _structure_cascade(self, text: str, parsed: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Cascade mode: structure with the fast model, validate the result
+        (required fields, non-empty experience, date formats) and escalate
+        to the large model only if problems remain
+        """
+        source = parsed["remainder"] if parsed is not None else text
+        tiers = []
+        structured_data: Dict[str, Any] = {}
+        for tier, stage in (("fast", "structuring_fast"), ("large", "structuring")):
+            started = time.perf_counter()
+            try:
+                if self._is_long_document(source):
+                    structured_data = await self._structure_map_reduce(source, stage=stage)
+                else:
+                    structured_data = await self._structure_with_openai(source, stage=stage)
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                # Fast model unavailable on the endpoint, unparseable output etc.:
+                # escalate. Transient upstream errors would hit the large tier as well
+                if tier == "large" or _is_transient(e):
+                    raise
+                tiers.append({
+                    "tier": tier,
+                    "model": STAGE_MODELS[stage],
+                    "seconds": round(time.perf_counter() - started, 3),
+                    "problems": [f"error: {e}"],
+                })
+                continue
+            if parsed is not None:
+                structured_data = apply_pre_parsed_fields(structured_data, parsed)
+            problems = validate_cv_data(structured_data)
+            tiers.append({
+                "tier": tier,
+                "model": STAGE_MODELS[stage],
+                "seconds": round(time.perf_counter() - started, 3),
+                "problems": problems,
+            })
+            if not problems:
+                break
+        
+        self.metrics["cascade"] = {"tiers": tiers, "escalated": len(tiers) > 1}
+        get_cascade_stats().record(tiers)
+        return structured_data
+    
+    def _is_long_document(self, text: str) -> bool:
+        return LONG_DOCUMENT_TOKEN_THRESHOLD > 0 and count_tokens(text) > LONG_DOCUMENT_TOKEN_THRESHOLD
+    
+    async def _structure_map_reduce(self, text: str, stage: str = "structuring") -> Dict[str, Any]:
+        """
+        Long-document mode: extract overlapping chunks concurrently (map),
+        then merge and deduplicate the entries deterministically (reduce)
+        """
+        chunks = split_into_chunks(text, LONG_DOCUMENT_CHUNK_TOKENS, LONG_DOCUMENT_OVERLAP_TOKENS)
+        self.metrics["long_document"] = {
+            "tokens": count_tokens(text),
+            "chunks": len(chunks),
+            "chunk_tokens": [count_tokens(chunk) for chunk in chunks],
+        }
+        
+        results = await asyncio.gather(*(
+            self._structure_with_openai(
+                chunk, note=CHUNK_PROMPT_NOTE.format(index=index + 1, total=len(chunks)), stage=stage
+            )
+            for index, chunk in enumerate(chunks)
+        ))
+        return self._postprocess(merge_chunk_results(results))
+    
+    async def _structure_with_openai(self, text: str, note: str = "", stage: str = "structuring") -> Dict[str, Any]:
         """Use OpenAI to structure the extracted text into CV data"""
         try:
-            # Import extraction rules
-            import sys
-            import os
-            sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
-            from resources.extraction_rules import EXTRACTION_USER_PROMPT, extract_city_from_address
-            
-            prompt = EXTRACTION_USER_PROMPT
-            
-            from resources.extraction_rules import EXTRACTION_SYSTEM_PROMPT
-            
-            response = self.client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": EXTRACTION_SYSTEM_PROMPT},
-                    {"role": "user", "content": f"{prompt}\n\nCV Text:\n{text}"}
-                ],
+            response = await self._create_completion(
+                stage,
+                stage=stage,
+                model=STAGE_MODELS[stage],
+                messages=self._structuring_messages(text, note),
                 temperature=0.1,
-                max_tokens=3000
+                max_tokens=3000,
+                **self._response_format(self._structuring_schema(), "cv_data")
             )
             
-            # Parse the JSON response
-            json_text = response.choices[0].message.content.strip()
-            # Remove any markdown formatting if present
-            if json_text.startswith("```json"):
-                json_text = json_text[7:]
-            if json_text.endswith("```"):
-                json_text = json_text[:-3]
+            # Parse the JSON response, re-asking for sections that came back broken
+            structured_data, _ = await self._parse_structured_output(
+                response.choices[0].message.content, text, stage=stage
+            )
+            return self._postprocess(structured_data)
             
-            structured_data = json.loads(json_text)
+        except json.JSONDecodeError as e:
+            raise Exception(f"Error parsing OpenAI response as JSON: {str(e)}")
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            raise Exception(f"Error structuring data with OpenAI: {str(e)}")
+    
+    async def _stream_structure_with_openai(self, text: str) -> AsyncIterator[Tuple[Optional[str], Any]]:
+        """
+        Streamed structuring call: yields (section, value) as each top-level
+        section of the JSON response completes, then (None, full_data)
+        """
+        try:
+            stream = await self._create_completion(
+                "structuring_stream",
+                model=STRUCTURING_MODEL,
+                messages=self._structuring_messages(text),
+                temperature=0.1,
+                max_tokens=3000,
+                stream=True,
+                **self._response_format(self._structuring_schema(), "cv_data")
+            )
             
-            # Extract city from address if not already present
-            if "personal" in structured_data and "address" in structured_data["personal"]:
-                if not structured_data["personal"].get("city"):
-                    structured_data["personal"]["city"] = extract_city_from_address(
-                        structured_data["personal"]["address"]
-                    )
+            parser = SectionStreamParser()
+            emitted = set()
+            try:
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    for key, value in parser.feed(delta or ""):
+                        section, value = decode_compact_section(key, value) if self.compact_output else (key, value)
+                        if section == "personal":
+                            value = self._postprocess({"personal": value})["personal"]
+                        emitted.add(section)
+                        yield section, value
+            finally:
+                # Releases the endpoint also when the consumer stops early
+                await stream.aclose()
             
-            return structured_data
+            # Sections the incremental parser could not emit are recovered from
+            # the full text or asked for again
+            structured_data, reasked = await self._parse_structured_output(parser.text, text)
+            structured_data = self._postprocess(structured_data)
+            for section, value in structured_data.items():
+                if section not in emitted or section in reasked:
+                    yield section, value
+            yield None, structured_data
             
         except json.JSONDecodeError as e:
             raise Exception(f"Error parsing OpenAI response as JSON: {str(e)}")
+        except CircuitOpenError:
+            raise
         except Exception as e:
             raise Exception(f"Error structuring data with OpenAI: {str(e)}")
+    
+    async def _structure_split_with_openai(self, text: str) -> Dict[str, Any]:
+        """Schema-split structuring, see _stream_structure_split_with_openai"""
+        structured_data = {}
+        async for section, value in self._stream_structure_split_with_openai(text):
+            if section is None:
+                structured_data = value
+        return structured_data
+    
+    async def _stream_structure_split_with_openai(self, text: str) -> AsyncIterator[Tuple[Optional[str], Any]]:
+        """
+        Schema-split structuring: one focused, smaller call per section, all
+        concurrent, so wall time approaches the slowest section instead of
+        the whole document. Yields (section, value) in completion order,
+        then (None, merged_data) in the usual personal/experience/... shape.
+        """
+        started = time.perf_counter()
+        section_times: Dict[str, float] = {}
+        
+        async def run_section(section: str) -> Tuple[str, Any]:
+            value = await self._structure_section(section, text)
+            section_times[section] = round(time.perf_counter() - started, 3)
+            return section, value
+        
+        tasks = [asyncio.create_task(run_section(section)) for section in EXTRACTION_SECTIONS]
+        sections: Dict[str, Any] = {}
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                section, value = await next_done
+                if section == "personal":
+                    value = self._postprocess({"personal": value})["personal"]
+                sections[section] = value
+                yield section, value
+        finally:
+            for task in tasks:
+                task.cancel()
+        
+        self.metrics["section_seconds"] = section_times
+        yield None, self._merge_sections(sections)
+    
+    async def _structure_section(self, section: str, text: str, stage: str = "structuring") -> Any:
+        """Extract a single top-level section with its focused prompt"""
+        try:
+            response = await self._create_completion(
+                f"section:{section}",
+                stage=stage,
+                model=STAGE_MODELS[stage],
+                messages=[
+                    {"role": "system", "content": EXTRACTION_SYSTEM_PROMPT},
+                    {"role": "user", "content": f"{build_section_prompt(section)}\n\nCV Text:\n{text}"}
+                ],
+                temperature=0.1,
+                max_tokens=SECTION_MAX_TOKENS.get(section, 1000),
+                **self._response_format(section_schema(CV_RESPONSE_SCHEMA, section), f"cv_{section}")
+            )
+            data = self._parse_json_response(response.choices[0].message.content)
+        except json.JSONDecodeError as e:
+            raise Exception(f"Error parsing OpenAI response for section '{section}' as JSON: {str(e)}")
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            raise Exception(f"Error structuring section '{section}' with OpenAI: {str(e)}")
+        
+        # The prompt asks for {"section": ...}, tolerate a bare value as well
+        if isinstance(data, dict) and section in data:
+            return data[section]
+        return data
+    
+    def _merge_sections(self, sections: Dict[str, Any]) -> Dict[str, Any]:
+        """Reassemble per-section results into the standard CV structure"""
+        merged = {}
+        for section in EXTRACTION_SECTIONS:
+            value = sections.get(section)
+            if value is None:
+                value = {} if section == "personal" else []
+            merged[section] = value
+        return merged
+    
+    async def _create_completion(self, kind: str, stage: Optional[str] = None, **kwargs) -> Any:
+        """
+        Chat completion through the resilience layer (retries, deadline,
+        circuit breaker; hedging only for non-streamed calls). RPM/TPM quota
+        is waited for before every upstream request (retries and hedges
+        included), before its deadline and hedge timers start.
+        """
+        estimated_tokens = estimate_request_tokens(kwargs["messages"], kwargs.get("max_tokens", 0))
+        stage = stage or ("vision" if kind == "vision" else "structuring")
+        tried: List[Endpoint] = []
+        # (endpoint, quota scope) picked and paid for, waiting for their attempt
+        ready: List[Tuple[Endpoint, Optional[str]]] = []
+        
+        async def prepare():
+            # Every further attempt (retry or hedge) goes to an endpoint not tried yet, if possible
+            endpoint = self.endpoints.pick(stage, exclude=tried)
+            tried.append(endpoint)
+            try:
+                scope = await self._acquire_quota(
+                    endpoint.client, endpoint.model_for(stage, kwargs["model"]), estimated_tokens
+                )
+            except BaseException:
+                endpoint.breaker.release_probe()
+                self.endpoints.release(endpoint, 0.0, False)
+                raise
+            ready.append((endpoint, scope))
+        
+        async def attempt() -> Any:
+            endpoint, reserved_scope = ready.pop(0)
+            request = dict(kwargs, model=endpoint.model_for(stage, kwargs["model"]))
+            if request["model"] in _UNSUPPORTED_FORMAT_MODELS:
+                request.pop("response_format", None)
+            started = time.perf_counter()
+            failed = False
+            streaming = False
+            try:
+                try:
+                    response = await self._rate_limited_request(endpoint.client, request, estimated_tokens,
+                                                                 reserved_scope)
+                except openai.BadRequestError as e:
+                    if "response_format" not in request or "response_format" not in str(e):
+                        raise
+                    # Model without structured output support: fall back to prompt-only JSON
+                    _UNSUPPORTED_FORMAT_MODELS.add(request["model"])
+                    request.pop("response_format")
+                    # Second upstream request (once per model and process): pays for its own quota
+                    reserved_scope = await self._acquire_quota(endpoint.client, request["model"], estimated_tokens)
+                    response = await self._rate_limited_request(endpoint.client, request, estimated_tokens,
+                                                                 reserved_scope)
+                endpoint.breaker.record_success()
+                if request.get("stream"):
+                    # The request is outstanding until the stream has been consumed
+                    streaming = True
+                    return self._tracked_stream(response, endpoint, started)
+                return response
+            except Exception as e:
+                failed = True
+                if is_retryable(e):
+                    endpoint.breaker.record_failure()
+                else:
+                    # Upstream answered (e.g. 400/401): not a sign of degradation, settles a probe
+                    endpoint.breaker.record_success()
+                raise
+            except BaseException:
+                if deadline_expired():
+                    # Cancelled by the per-attempt deadline: counts as a timeout
+                    failed = True
+                    endpoint.breaker.record_failure()
+                else:
+                    # Client went away or a faster hedge won: says nothing about the endpoint
+                    endpoint.breaker.release_probe()
+                raise
+            finally:
+                if not streaming:
+                    self.endpoints.release(endpoint, time.perf_counter() - started, failed)
+        
+        try:
+            return await self.resilience.call(
+                attempt,
+                kind=kind,
+                hedge=None if not kwargs.get("stream") else False,
+                # Health is tracked per endpoint
+                use_breaker=False,
+                prepare=prepare
+            )
+        finally:
+            for endpoint, _ in ready:
+                # Never attempted (cancelled before the attempt started)
+                endpoint.breaker.release_probe()
+                self.endpoints.release(endpoint, 0.0, False)
+    
+    async def _tracked_stream(self, stream: Any, endpoint: Endpoint, started: float) -> AsyncIterator[Any]:
+        """Chunks of a streamed response; releases the endpoint once the stream ends or is closed"""
+        failed = False
+        try:
+            async for chunk in stream:
+                yield chunk
+        except Exception as e:
+            failed = True
+            if is_retryable(e):
+                endpoint.breaker.record_failure()
+            raise
+        finally:
+            await stream.close()
+            self.endpoints.release(endpoint, time.perf_counter() - started, failed)
+    
+    async def _acquire_quota(self, client: AsyncOpenAI, model: str, estimated_tokens: int) -> Optional[str]:
+        """
+        Wait (queue) for RPM/TPM quota of one request; returns the scope
+        that holds the reservation, None without a rate limiter
+        """
+        if self.rate_limiter is None:
+            return None
+        scope = rate_limit_scope(client.api_key, model)
+        waited = await self.rate_limiter.acquire(scope, estimated_tokens)
+        if waited:
+            self.metrics["rate_limit_wait"] = round(self.metrics.get("rate_limit_wait", 0.0) + waited, 3)
+        return scope
+    
+    async def _rate_limited_request(self, client: AsyncOpenAI, kwargs: Dict[str, Any], estimated_tokens: int,
+                                    reserved_scope: Optional[str] = None) -> Any:
+        """
+        One upstream request (quota was acquired by the caller): feeds the
+        x-ratelimit-* response headers and the actual usage back to the limiter
+        """
+        if self.rate_limiter is None:
+            return await client.chat.completions.create(**kwargs)
+        
+        limiter = self.rate_limiter
+        scope = rate_limit_scope(client.api_key, kwargs["model"])
+        try:
+            raw = await client.chat.completions.with_raw_response.create(**kwargs)
+        except openai.APIStatusError as e:
+            # 429 responses carry the current quota as well
+            await asyncio.to_thread(limiter.update_from_headers, scope, e.response.headers)
+            raise
+        await asyncio.to_thread(limiter.update_from_headers, scope, raw.headers)
+        
+        response = raw.parse()
+        usage = getattr(response, "usage", None)
+        if scope == reserved_scope and usage is not None and usage.total_tokens:
+            # Give back what was reserved but not used
+            await asyncio.to_thread(limiter.adjust, scope, estimated_tokens - usage.total_tokens)
+        return response
+    
+    def _structuring_prompt(self) -> str:
+        return COMPACT_EXTRACTION_USER_PROMPT if self.compact_output else EXTRACTION_USER_PROMPT
+    
+    def _structuring_schema(self) -> Dict[str, Any]:
+        return COMPACT_RESPONSE_SCHEMA if self.compact_output else CV_RESPONSE_SCHEMA
+    
+    def _structuring_messages(self, text: str, note: str = "") -> List[Dict[str, str]]:
+        """Chat messages for the structuring call"""
+        prompt = self._structuring_prompt() + note
+        return [
+            {"role": "system", "content": EXTRACTION_SYSTEM_PROMPT},
+            {"role": "user", "content": f"{prompt}\n\nCV Text:\n{text}"}
+        ]
+    
+    def _response_format(self, schema: Dict[str, Any], name: str) -> Dict[str, Any]:
+        """response_format keyword for the configured STRUCTURED_OUTPUT mode (empty if off)"""
+        response_format = build_response_format(schema, name)
+        return {"response_format": response_format} if response_format else {}
+    
+    def _parse_json_response(self, json_text: Optional[str]) -> Dict[str, Any]:
+        """Parse the model output, tolerating code fences, prose and truncation"""
+        data, info = repair_json(json_text or "")
+        if info["repaired"]:
+            self._record_output_repair(info, [])
+        return data
+    
+    async def _parse_structured_output(self, json_text: Optional[str], text: str,
+                                       stage: str = "structuring") -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Parse a full structuring response. Sections that are broken or were
+        cut off are requested again with their focused section prompt
+        instead of failing the whole extraction.
+        Returns (data, re-asked sections).
+        """
+        try:
+            data, info = repair_json(json_text or "")
+        except json.JSONDecodeError:
+            if not REASK_ENABLED:
+                raise
+            data, info = {}, {"repaired": True, "truncated": True, "partial_section": None}
+        if not isinstance(data, dict):
+            if not REASK_ENABLED:
+                raise json.JSONDecodeError("Model output is not a JSON object", json_text or "", 0)
+            data, info = {}, {"repaired": True, "truncated": True, "partial_section": None}
+        if self.compact_output:
+            data = decode_compact_output(data)
+            if info["partial_section"] is not None:
+                info["partial_section"] = decode_compact_section(info["partial_section"], None)[0]
+        
+        broken = broken_sections(data, CV_RESPONSE_SCHEMA, info) if REASK_ENABLED else []
+        if info["repaired"] or broken:
+            self._record_output_repair(info, broken)
+        if broken:
+            values = await asyncio.gather(*(self._structure_section(section, text, stage) for section in broken))
+            data.update(zip(broken, values))
+            # Keep the usual section order
+            data = {
+                **{section: data[section] for section in CV_RESPONSE_SCHEMA["properties"] if section in data},
+                **data,
+            }
+        return data, broken
+    
+    def _record_output_repair(self, info: Dict[str, Any], reasked: List[str]):
+        """Count repaired/truncated responses and re-asked sections in the metrics"""
+        repairs = self.metrics.setdefault("output_repair", {"repaired": 0, "truncated": 0, "reasked": []})
+        repairs["repaired"] += int(info["repaired"])
+        repairs["truncated"] += int(info["truncated"])
+        repairs["reasked"].extend(reasked)
+    
+    def _postprocess(self, structured_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract city from address if not already present"""
+        personal = structured_data.get("personal")
+        if isinstance(personal, dict) and "address" in personal:
+            if not personal.get("city"):
+                personal["city"] = extract_city_from_address(personal["address"])
+        return structured_data
 
 
 # Convenience function for direct usage
-async def extract_cv_data(file_bytes: bytes, file_type: str, openai_api_key: str) -> Dict[str, Any]:
-    """Extract CV data from file bytes"""
-    extractor = CVExtractor(openai_api_key)
-    return await extractor.extract_cv_data(file_bytes, file_type)
+async def extract_cv_data(file_bytes: bytes, file_type: str, openai_api_key: Optional[str],
+                          use_cache: bool = True,
+                          on_progress: Optional[Callable[..., None]] = None,
+                          mode: Optional[str] = None, content_hash: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Extract CV data from file bytes. Requests go through the configured
+    endpoint pool (OPENAI_ENDPOINTS), or a single endpoint for openai_api_key
+    """
+    cache = get_extraction_cache() if use_cache else None
+    extractor = CVExtractor(cache=cache, endpoints=get_endpoint_pool(openai_api_key), mode=mode)
+    return await extractor.extract_cv_data(file_bytes, file_type, on_progress=on_progress, content_hash=content_hash)
+
+
+async def stream_cv_data(file_bytes: bytes, file_type: str, openai_api_key: Optional[str],
+                         use_cache: bool = True, mode: Optional[str] = None,
+                         content_hash: Optional[str] = None) -> AsyncIterator[Tuple[Optional[str], Any]]:
+    """Stream CV data sections from file bytes, see CVExtractor.stream_cv_data"""
+    cache = get_extraction_cache() if use_cache else None
+    extractor = CVExtractor(cache=cache, endpoints=get_endpoint_pool(openai_api_key), mode=mode)
+    async for section, value in extractor.stream_cv_data(file_bytes, file_type, content_hash=content_hash):
+        yield section, value
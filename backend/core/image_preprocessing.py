@@ -0,0 +1,121 @@
+"""
+Image pre-processing for CV2Profile vision extraction
+Fixes EXIF orientation, downscales, converts to grayscale and re-encodes compactly
+"""
+
+import io
+import math
+import os
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from PIL import Image, ImageOps
+
+from core.upload_spool import Buffer, open_buffer
+
+IMAGE_MAX_EDGE = int(os.getenv("IMAGE_MAX_EDGE", "2000"))
+IMAGE_GRAYSCALE = os.getenv("IMAGE_GRAYSCALE", "true").lower() not in ("0", "false", "no")
+IMAGE_JPEG_QUALITY = int(os.getenv("IMAGE_JPEG_QUALITY", "80"))
+
+
+def settings_fingerprint() -> str:
+    """Identifies the current pre-processing settings (part of the cache key)"""
+    return f"img{IMAGE_MAX_EDGE}{'g' if IMAGE_GRAYSCALE else 'c'}{IMAGE_JPEG_QUALITY}"
+
+
+def sniff_mime_type(file_bytes: Buffer) -> str:
+    """MIME type from the file signature"""
+    header = bytes(file_bytes[:12])
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if header.startswith(b"RIFF") and header[8:12] == b"WEBP":
+        return "image/webp"
+    if header[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    return "image/jpeg"
+
+
+def estimate_vision_tokens(width: int, height: int) -> int:
+    """
+    Approximate high-detail vision input tokens: the image is fitted into
+    2048x2048, its short side scaled to 768, then billed per 512px tile
+    """
+    scale = min(1.0, 2048 / max(width, height))
+    width, height = width * scale, height * scale
+    scale = min(1.0, 768 / min(width, height))
+    width, height = width * scale, height * scale
+    return 85 + 170 * math.ceil(width / 512) * math.ceil(height / 512)
+
+
+def preprocess_image(file_bytes: Buffer, max_edge: Optional[int] = None, grayscale: Optional[bool] = None,
+                     quality: Optional[int] = None) -> Tuple[bytes, str, Dict[str, Any]]:
+    """
+    Prepare an uploaded CV image for the vision model.
+    Returns (image_bytes, mime_type, stats); falls back to the original
+    bytes if decoding fails or re-encoding would not make the image smaller.
+    """
+    max_edge = IMAGE_MAX_EDGE if max_edge is None else max_edge
+    grayscale = IMAGE_GRAYSCALE if grayscale is None else grayscale
+    quality = IMAGE_JPEG_QUALITY if quality is None else quality
+
+    started = time.perf_counter()
+    stats: Dict[str, Any] = {"bytes_before": len(file_bytes)}
+
+    try:
+        image = Image.open(open_buffer(file_bytes))
+        source_format = image.format or "JPEG"
+        stats["size_before"] = list(image.size)
+
+        # JPEG: let the decoder downscale via DCT scaling (much cheaper than a full decode)
+        if source_format == "JPEG" and max_edge:
+            image.draft("L" if grayscale else "RGB", (max_edge, max_edge))
+
+        # Phone photos are often stored rotated with an EXIF orientation tag
+        image = ImageOps.exif_transpose(image)
+
+        # Flatten transparency onto white so text stays readable
+        if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+            rgba = image.convert("RGBA")
+            background = Image.new("RGB", rgba.size, (255, 255, 255))
+            background.paste(rgba, mask=rgba.split()[-1])
+            image = background
+
+        # Grayscale first, so resampling works on a single channel
+        image = image.convert("L" if grayscale else "RGB")
+
+        if max_edge and max(image.size) > max_edge:
+            image.thumbnail((max_edge, max_edge), Image.LANCZOS, reducing_gap=3.0)
+
+        # PNG sources are usually screenshots/scans (sharp text): keep lossless.
+        # Everything else is a photo: JPEG
+        output = io.BytesIO()
+        if source_format == "PNG":
+            image.save(output, format="PNG", optimize=True)
+            mime_type = "image/png"
+        else:
+            image.save(output, format="JPEG", quality=quality, optimize=True)
+            mime_type = "image/jpeg"
+        processed = output.getvalue()
+        stats["size_after"] = list(image.size)
+    except Exception as e:
+        stats.update(error=str(e))
+        processed = None
+
+    unchanged_size = stats.get("size_after") == stats.get("size_before")
+    if processed is None or (unchanged_size and len(processed) >= len(file_bytes)):
+        # Nothing gained: send the original with its real MIME type
+        processed = bytes(file_bytes)
+        mime_type = sniff_mime_type(file_bytes)
+        stats["preprocessed"] = False
+        if "size_before" in stats:
+            stats["size_after"] = stats["size_before"]
+    else:
+        stats["preprocessed"] = True
+
+    stats["bytes_after"] = len(processed)
+    stats["mime_type"] = mime_type
+    stats["seconds"] = round(time.perf_counter() - started, 4)
+    if "size_before" in stats and "size_after" in stats:
+        stats["vision_tokens_before"] = estimate_vision_tokens(*stats["size_before"])
+        stats["vision_tokens_after"] = estimate_vision_tokens(*stats["size_after"])
+    return processed, mime_type, stats
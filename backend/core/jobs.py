@@ -0,0 +1,288 @@
+"""
+In-process job queue for CV2Profile
+Runs extractions on a bounded pool of asyncio workers with status polling and progress events;
+job status can be mirrored to the shared session store so any worker can answer polls
+"""
+
+import asyncio
+import time
+import uuid
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional, Set
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue has reached its maximum depth"""
+
+
+class Job:
+    def __init__(self, payload: Dict[str, Any]):
+        self.id = str(uuid.uuid4())
+        self.payload = payload
+        self.status = JOB_QUEUED
+        self.stage = "queued"
+        self.result: Optional[Any] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._subscribers: Set[asyncio.Queue] = set()
+        # Called on every stage change (JobManager mirrors the status)
+        self.on_stage: Optional[Callable[["Job"], None]] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JOB_COMPLETED, JOB_FAILED)
+
+    def progress(self, stage: str, **details: Any):
+        """Record a progress stage and notify subscribers"""
+        self.stage = stage
+        self._publish({"event": "progress", "stage": stage, **details})
+        if self.on_stage is not None:
+            self.on_stage(self)
+
+    def _publish(self, event: Dict[str, Any]):
+        event = {"job_id": self.id, "status": self.status, **event}
+        for queue in self._subscribers:
+            queue.put_nowait(event)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            "job_id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.status == JOB_COMPLETED:
+            data["result"] = self.result
+        if self.status == JOB_FAILED:
+            data["error"] = self.error
+        return data
+
+
+class JobManager:
+    """
+    handler(job) runs a job. discard(job) releases the payload of a job that
+    will never run (e.g. its spooled upload on shutdown). store() returns the
+    store that job status is mirrored to (core.session_store), None = this
+    process only; status records are written by a background task in a
+    worker thread, the latest state of each job wins.
+    """
+
+    def __init__(self, handler: Callable[[Job], Awaitable[Any]], workers: int = 4,
+                 max_queue: int = 100, result_ttl: float = 3600.0, sample_size: int = 200,
+                 discard: Optional[Callable[[Job], None]] = None, store: Optional[Callable[[], Any]] = None,
+                 poll_interval: float = 1.0):
+        self.handler = handler
+        self.workers = workers
+        self.max_queue = max_queue
+        self.result_ttl = result_ttl
+        self.discard = discard
+        self.store = store
+        self.poll_interval = poll_interval
+        self.store_errors = 0
+        # job id -> latest status not written to the store yet
+        self._unsaved: Dict[str, Dict[str, Any]] = {}
+        self._writer: Optional[asyncio.Task] = None
+        self.jobs: Dict[str, Job] = {}
+        self.completed = 0
+        self.failed = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._finished_order: Deque[Job] = deque()
+        self._wait_times: Deque[float] = deque(maxlen=sample_size)
+        self._run_times: Deque[float] = deque(maxlen=sample_size)
+        self._running = 0
+
+    async def start(self):
+        """Start the worker tasks (call from the running event loop)"""
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """Cancel workers; running and queued jobs fail and their payloads are discarded"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        while self._queue is not None and not self._queue.empty():
+            job = self._queue.get_nowait()
+            if self.discard is not None:
+                self.discard(job)
+            self._finish(job, error="Server shut down before the job ran")
+        # Final states must reach the store before the process exits
+        if self._writer is not None:
+            await self._writer
+
+    def _finish(self, job: Job, result: Any = None, error: Optional[str] = None):
+        """Record the outcome of a job and notify subscribers"""
+        job.finished_at = time.time()
+        if error is None:
+            job.result = result
+            job.status = JOB_COMPLETED
+            self.completed += 1
+        else:
+            job.error = error
+            job.status = JOB_FAILED
+            self.failed += 1
+        self._finished_order.append(job)
+        job.payload = {}
+        self._save(job)
+        job._publish({"event": "done", **job.to_dict()})
+
+    def _save(self, job: Job):
+        """Mirror the job status to the shared store (without blocking the event loop)"""
+        if self.store is None:
+            return
+        self._unsaved[job.id] = job.to_dict()
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.ensure_future(self._write_unsaved())
+
+    async def _write_unsaved(self):
+        """Write pending status records one at a time in a worker thread"""
+        while self._unsaved:
+            job_id = next(iter(self._unsaved))
+            status = self._unsaved.pop(job_id)
+            try:
+                await asyncio.to_thread(self._put, job_id, status)
+            except Exception:
+                # Store unavailable: polls on other workers see the last saved state
+                self.store_errors += 1
+
+    def _put(self, job_id: str, status: Dict[str, Any]):
+        self.store().put(_store_key(job_id), {"id": _store_key(job_id), "job": status},
+                         ttl_seconds=self.result_ttl)
+
+    def lookup(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Status of a job of this process, or of another worker via the shared store"""
+        job = self.jobs.get(job_id)
+        if job is not None:
+            return job.to_dict()
+        if self.store is None:
+            return None
+        stored = self.store().get(_store_key(job_id))
+        return stored["job"] if stored is not None else None
+
+    def submit(self, payload: Dict[str, Any]) -> Job:
+        """Enqueue a new job and return it immediately"""
+        if self._queue is None:
+            raise RuntimeError("JobManager not started")
+
+        self._purge_finished()
+        job = Job(payload)
+        job.on_stage = self._save
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFullError(f"Job queue is full ({self.max_queue} jobs waiting)")
+        self.jobs[job.id] = job
+        self._save(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    async def subscribe(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """Yield progress events for a job until it finishes"""
+        job = self.jobs.get(job_id)
+        if job is None:
+            async for event in self._poll(job_id):
+                yield event
+            return
+        queue: asyncio.Queue = asyncio.Queue()
+        job._subscribers.add(queue)
+        try:
+            # Current state first, so late subscribers don't miss anything
+            yield {"event": "status", **job.to_dict()}
+            if job.finished:
+                return
+            while True:
+                event = await queue.get()
+                yield event
+                if event["event"] == "done":
+                    break
+        finally:
+            job._subscribers.discard(queue)
+
+    async def _poll(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """Events for a job of another worker, polled from the shared store"""
+        last = None
+        while True:
+            status = await asyncio.to_thread(self.lookup, job_id)
+            if status is None:
+                return
+            finished = status["status"] in (JOB_COMPLETED, JOB_FAILED)
+            if finished:
+                yield {"event": "done", **status}
+                return
+            if status != last:
+                yield {"event": "status" if last is None else "progress", **status}
+                last = status
+            await asyncio.sleep(self.poll_interval)
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            job.status = JOB_RUNNING
+            job.started_at = time.time()
+            self._wait_times.append(job.started_at - job.created_at)
+            self._running += 1
+            job.progress("started")
+            try:
+                result = await self.handler(job)
+            except asyncio.CancelledError:
+                # Shutdown: the handler cleaned up its payload
+                self._finish(job, error="Server shut down while the job was running")
+                raise
+            except Exception as e:
+                self._finish(job, error=str(e))
+            else:
+                self._finish(job, result=result)
+            finally:
+                self._running -= 1
+                self._run_times.append(job.finished_at - job.started_at)
+                self._queue.task_done()
+
+    def _purge_finished(self):
+        """Forget finished jobs older than result_ttl (oldest first, amortized O(1))"""
+        cutoff = time.time() - self.result_ttl
+        while self._finished_order and self._finished_order[0].finished_at < cutoff:
+            job = self._finished_order.popleft()
+            self.jobs.pop(job.id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, in-flight jobs and wait/run time percentiles"""
+        return {
+            "workers": self.workers,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue": self.max_queue,
+            "running": self._running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "status_store_errors": self.store_errors,
+            "wait_time": _summarize(self._wait_times),
+            "run_time": _summarize(self._run_times),
+        }
+
+
+def _store_key(job_id: str) -> str:
+    return f"job:{job_id}"
+
+
+def _summarize(samples: Deque[float]) -> Dict[str, float]:
+    if not samples:
+        return {"avg": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+    ordered = sorted(samples)
+    return {
+        "avg": round(sum(ordered) / len(ordered), 3),
+        "p50": round(ordered[len(ordered) // 2], 3),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        "max": round(ordered[-1], 3),
+    }
@@ -0,0 +1,102 @@
+"""
+Incremental JSON parsing for streamed OpenAI responses
+Emits each top-level section of the CV object as soon as its value is complete
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class SectionStreamParser:
+    """
+    Feed the model output chunk by chunk; feed() returns the (key, value)
+    pairs of the top-level object that became complete with that chunk.
+    Text before the opening brace (e.g. a ```json fence) is ignored.
+    """
+
+    def __init__(self):
+        self.sections: Dict[str, Any] = {}
+        self.complete = False
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect_key = False
+        self._key_start: Optional[int] = None
+        self._key: Optional[str] = None
+        self._value_start: Optional[int] = None
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        if self.complete or not chunk:
+            return []
+
+        self._text += chunk
+        text = self._text
+        emitted = []
+        i = self._pos
+
+        while i < len(text):
+            ch = text[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._key_start is not None:
+                        self._key = json.loads(text[self._key_start:i + 1])
+                        self._key_start = None
+            elif self._depth == 0:
+                if ch == "{":
+                    self._depth = 1
+                    self._expect_key = True
+            elif ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expect_key:
+                    self._key_start = i
+                    self._expect_key = False
+            elif ch == ":" and self._depth == 1 and self._value_start is None:
+                self._value_start = i + 1
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 1:
+                    # Nested object/array value just closed
+                    self._emit(text[:i + 1], emitted)
+                elif self._depth == 0:
+                    # End of the top-level object: flush a trailing scalar value
+                    self._emit(text[:i], emitted)
+                    self.complete = True
+                    i += 1
+                    break
+            elif ch == "," and self._depth == 1:
+                self._emit(text[:i], emitted)
+                self._expect_key = True
+
+            i += 1
+
+        self._pos = i
+        return emitted
+
+    def _emit(self, text: str, emitted: List[Tuple[str, Any]]):
+        if self._key is None or self._value_start is None:
+            return
+        try:
+            value = json.loads(text[self._value_start:])
+        except json.JSONDecodeError:
+            # Malformed section; callers fall back to parsing the full text
+            pass
+        else:
+            self.sections[self._key] = value
+            emitted.append((self._key, value))
+        self._key = None
+        self._value_start = None
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far"""
+        return self._text
@@ -0,0 +1,199 @@
+"""
+Long-document support for CV2Profile (map-reduce extraction)
+Splits CV text into overlapping chunks on section boundaries and merges
+the per-chunk extraction results deterministically
+"""
+
+import os
+import re
+import sys
+from typing import Any, Dict, List, Tuple
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from resources.extraction_rules import EXTRACTION_SECTIONS, match_section_heading
+from core.compaction import count_tokens
+
+
+def is_heading(line: str) -> bool:
+    """True for lines that look like a CV section heading"""
+    return match_section_heading(line) is not None
+
+
+def _split_blocks(text: str) -> List[Tuple[bool, str]]:
+    """
+    Split text into (starts_with_heading, block) units: paragraphs separated by
+    blank lines, with a new unit started at every heading line
+    """
+    blocks: List[Tuple[bool, str]] = []
+    current: List[str] = []
+    current_heading = False
+
+    def flush():
+        nonlocal current, current_heading
+        if current:
+            blocks.append((current_heading, "\n".join(current)))
+        current = []
+        current_heading = False
+
+    for line in text.splitlines():
+        if not line.strip():
+            flush()
+        elif is_heading(line):
+            flush()
+            current = [line]
+            current_heading = True
+        else:
+            current.append(line)
+    flush()
+    return blocks
+
+
+def _split_oversized(block: str, max_tokens: int) -> List[str]:
+    """Split a single block that exceeds the budget on line boundaries"""
+    parts: List[str] = []
+    current: List[str] = []
+    size = 0
+    for line in block.splitlines():
+        line_tokens = count_tokens(line) + 1
+        if current and size + line_tokens > max_tokens:
+            parts.append("\n".join(current))
+            current, size = [], 0
+        current.append(line)
+        size += line_tokens
+    if current:
+        parts.append("\n".join(current))
+    return parts
+
+
+def split_into_chunks(text: str, max_tokens: int, overlap_tokens: int = 200) -> List[str]:
+    """
+    Pack text blocks into chunks of at most ~max_tokens, preferring to break
+    before section headings. Each chunk after the first repeats the trailing
+    blocks of its predecessor (up to overlap_tokens) so entries cut at a
+    boundary are seen whole at least once.
+    """
+    units: List[Tuple[bool, str]] = []
+    for starts_heading, block in _split_blocks(text):
+        if count_tokens(block) > max_tokens:
+            pieces = _split_oversized(block, max_tokens)
+            units.append((starts_heading, pieces[0]))
+            units.extend((False, piece) for piece in pieces[1:])
+        else:
+            units.append((starts_heading, block))
+
+    chunks: List[List[str]] = []
+    current: List[str] = []
+    size = 0
+    for starts_heading, block in units:
+        block_tokens = count_tokens(block) + 1
+        full = current and size + block_tokens > max_tokens
+        # Break early at a heading once the chunk is reasonably filled
+        at_boundary = current and starts_heading and size >= max_tokens * 0.6
+        if full or at_boundary:
+            chunks.append(current)
+            current, size = [], 0
+        current.append(block)
+        size += block_tokens
+    if current:
+        chunks.append(current)
+
+    # Add overlap from the previous chunk
+    result: List[str] = []
+    for index, blocks in enumerate(chunks):
+        overlap: List[str] = []
+        if index > 0 and overlap_tokens > 0:
+            budget = overlap_tokens
+            for block in reversed(chunks[index - 1]):
+                block_tokens = count_tokens(block)
+                if block_tokens > budget:
+                    break
+                overlap.insert(0, block)
+                budget -= block_tokens
+        result.append("\n\n".join(overlap + blocks))
+    return result
+
+
+def _normalize(value: Any) -> str:
+    return re.sub(r"[\W_]+", "", str(value or "")).lower()
+
+
+# Fields identifying the same entry across chunks, plus a date field that
+# tells apart repeated entries (same role at the same company twice)
+ENTRY_KEYS = {
+    "experience": (["position", "company"], "start_date"),
+    "education": (["degree", "institution"], "start_date"),
+    "certifications": (["name", "issuer"], "date"),
+}
+
+
+def _find_duplicate(candidates: List[Dict[str, Any]], entry: Dict[str, Any], date_field: str) -> Any:
+    """Entry with the same identity whose date matches (or is missing on either side)"""
+    date = _normalize(entry.get(date_field))
+    for candidate in candidates:
+        candidate_date = _normalize(candidate.get(date_field))
+        if not date or not candidate_date or date == candidate_date:
+            return candidate
+    return None
+
+
+def _merge_entry(existing: Dict[str, Any], new: Dict[str, Any]):
+    """Fill gaps in an entry from a duplicate; keep the longer description"""
+    for field, value in new.items():
+        current = existing.get(field)
+        if not current:
+            existing[field] = value
+        elif field == "description" and isinstance(value, str) and len(value) > len(str(current)):
+            existing[field] = value
+
+
+def merge_chunk_results(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Merge per-chunk extraction results in chunk order:
+    personal fields first non-empty value wins, entries are deduplicated by
+    their normalized key fields, skills by case-insensitive name.
+    """
+    merged: Dict[str, Any] = {
+        "personal": {},
+        "experience": [],
+        "education": [],
+        "skills": [],
+        "certifications": [],
+    }
+    indexes: Dict[str, Dict[str, List[Dict[str, Any]]]] = {section: {} for section in ENTRY_KEYS}
+    seen_skills = set()
+
+    for result in results:
+        personal = result.get("personal") or {}
+        if isinstance(personal, dict):
+            for field, value in personal.items():
+                if value and not merged["personal"].get(field):
+                    merged["personal"][field] = value
+
+        for section, (key_fields, date_field) in ENTRY_KEYS.items():
+            for entry in result.get(section) or []:
+                if not isinstance(entry, dict):
+                    continue
+                key = "|".join(_normalize(entry.get(field)) for field in key_fields)
+                if not key.replace("|", ""):
+                    continue
+                candidates = indexes[section].setdefault(key, [])
+                duplicate = _find_duplicate(candidates, entry, date_field)
+                if duplicate is not None:
+                    _merge_entry(duplicate, entry)
+                else:
+                    entry = dict(entry)
+                    candidates.append(entry)
+                    merged[section].append(entry)
+
+        for skill in result.get("skills") or []:
+            normalized = _normalize(skill)
+            if normalized and normalized not in seen_skills:
+                seen_skills.add(normalized)
+                merged["skills"].append(skill)
+
+        # Keep any additional top-level keys the model produced
+        for section, value in result.items():
+            if section not in merged and section not in EXTRACTION_SECTIONS:
+                merged[section] = value
+
+    return merged
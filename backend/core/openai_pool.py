@@ -0,0 +1,166 @@
+"""
+Process-wide OpenAI client pool for CV2Profile
+One pooled httpx.AsyncClient (keep-alive connections, bounded size) shared by all uploads
+"""
+
+import asyncio
+import atexit
+import os
+import queue
+import threading
+from typing import Any, AsyncIterator, Coroutine, Dict, Iterator, Optional, Tuple
+
+import httpx
+from openai import AsyncOpenAI
+
+
+class OpenAIClientPool:
+    def __init__(self, max_connections: int = 20, max_keepalive_connections: int = 10,
+                 keepalive_expiry: float = 60.0, timeout: float = 120.0):
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._clients: Dict[Tuple[str, Optional[str]], AsyncOpenAI] = {}
+        self._lock = threading.Lock()
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=self.keepalive_expiry,
+                ),
+                timeout=httpx.Timeout(self.timeout, connect=10.0),
+            )
+            self._clients.clear()
+        return self._http_client
+
+    def get_client(self, api_key: str, base_url: Optional[str] = None) -> AsyncOpenAI:
+        """
+        Return an AsyncOpenAI client for api_key/base_url.
+        All clients share the same connection pool.
+        """
+        with self._lock:
+            http_client = self._get_http_client()
+            key = (api_key, base_url)
+            client = self._clients.get(key)
+            if client is None:
+                client = AsyncOpenAI(
+                    api_key=api_key,
+                    base_url=base_url,
+                    timeout=self.timeout,
+                    # Retries are handled by core.resilience
+                    max_retries=0,
+                    http_client=http_client,
+                )
+                self._clients[key] = client
+            return client
+
+    async def close(self):
+        """Close the shared connection pool"""
+        with self._lock:
+            http_client = self._http_client
+            self._http_client = None
+            self._clients.clear()
+        if http_client is not None and not http_client.is_closed:
+            await http_client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "clients": len(self._clients),
+            "open": self._http_client is not None and not self._http_client.is_closed,
+            "max_connections": self.max_connections,
+            "max_keepalive_connections": self.max_keepalive_connections,
+            "keepalive_expiry": self.keepalive_expiry,
+        }
+
+
+_pool: Optional[OpenAIClientPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_client_pool() -> OpenAIClientPool:
+    """Process-wide client pool configured from environment variables"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = OpenAIClientPool(
+                max_connections=int(os.getenv("OPENAI_POOL_MAX_CONNECTIONS", "20")),
+                max_keepalive_connections=int(os.getenv("OPENAI_POOL_MAX_KEEPALIVE", "10")),
+                keepalive_expiry=float(os.getenv("OPENAI_POOL_KEEPALIVE_EXPIRY", "60")),
+                timeout=float(os.getenv("OPENAI_TIMEOUT", "120")),
+            )
+        return _pool
+
+
+async def close_client_pool():
+    """Close the process-wide client pool (call at shutdown)"""
+    global _pool
+    with _pool_lock:
+        pool = _pool
+        _pool = None
+    if pool is not None:
+        await pool.close()
+
+
+# Background event loop for synchronous callers (Streamlit).
+# httpx.AsyncClient connections are bound to the loop they were opened on,
+# so all pooled calls from sync code must run on the same long-lived loop.
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def _get_background_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=_loop.run_forever, name="openai-pool-loop", daemon=True)
+            thread.start()
+            atexit.register(_shutdown_background_loop)
+        return _loop
+
+
+def _shutdown_background_loop():
+    global _loop
+    loop = _loop
+    if loop is None or not loop.is_running():
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(close_client_pool(), loop).result(timeout=5)
+    except Exception:
+        pass
+    loop.call_soon_threadsafe(loop.stop)
+    _loop = None
+
+
+def run_sync(coro: Coroutine[Any, Any, Any], timeout: Optional[float] = None) -> Any:
+    """Run a coroutine on the shared background loop and wait for its result"""
+    future = asyncio.run_coroutine_threadsafe(coro, _get_background_loop())
+    return future.result(timeout=timeout)
+
+
+def iter_sync(async_iterator: AsyncIterator[Any]) -> Iterator[Any]:
+    """Consume an async iterator from sync code, item by item, via the background loop"""
+    items: "queue.Queue[Tuple[bool, Any]]" = queue.Queue()
+
+    async def pump():
+        try:
+            async for item in async_iterator:
+                items.put((False, item))
+        except BaseException as e:
+            items.put((True, e))
+            return
+        items.put((True, None))
+
+    asyncio.run_coroutine_threadsafe(pump(), _get_background_loop())
+    while True:
+        finished, item = items.get()
+        if finished:
+            if item is not None:
+                raise item
+            return
+        yield item
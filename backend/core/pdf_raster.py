@@ -0,0 +1,159 @@
+"""
+Scanned PDF support for CV2Profile
+Detects pages without a text layer and turns them into page images for the
+vision model: rendered with pdfium if installed, otherwise the scanned image
+embedded in the page
+"""
+
+import io
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+import PyPDF2
+from PIL import Image
+
+from core.image_preprocessing import settings_fingerprint as image_fingerprint
+from core.upload_spool import Buffer, open_buffer
+
+# Read pages without a text layer with the vision model
+PDF_VISION_ENABLED = os.getenv("PDF_VISION_ENABLED", "true").lower() not in ("0", "false", "no")
+# Pages with less extracted text than this count as scanned
+SCANNED_PAGE_MIN_CHARS = int(os.getenv("SCANNED_PAGE_MIN_CHARS", "20"))
+# Render resolution (pdfium); pages are downscaled afterwards like uploaded images
+PDF_RENDER_DPI = int(os.getenv("PDF_RENDER_DPI", "150"))
+# Pages per vision request and vision requests in flight per document
+PDF_VISION_PAGES_PER_REQUEST = int(os.getenv("PDF_VISION_PAGES_PER_REQUEST", "2"))
+PDF_VISION_CONCURRENCY = int(os.getenv("PDF_VISION_CONCURRENCY", "4"))
+# Cost guard: at most this many scanned pages per document are sent to the vision model
+PDF_VISION_MAX_PAGES = int(os.getenv("PDF_VISION_MAX_PAGES", "10"))
+
+# The vision model separates pages in a batched answer with this marker
+PAGE_MARKER = "--- Page {page} ---"
+_PAGE_MARKER = re.compile(r"^[ \t]*-{2,}\s*Page\s+(\d+)\s*-{2,}[ \t]*$", re.MULTILINE | re.IGNORECASE)
+
+
+def get_renderer() -> str:
+    """Name of the page renderer: "pdfium" (pypdfium2) or "embedded" (page images via PyPDF2)"""
+    try:
+        import pypdfium2  # noqa: F401
+        return "pdfium"
+    except ImportError:
+        return "embedded"
+
+
+def settings_fingerprint() -> str:
+    """Identifies the scanned-PDF settings (part of the cache key)"""
+    if not PDF_VISION_ENABLED:
+        return "scan-off"
+    return (f"scan{SCANNED_PAGE_MIN_CHARS}/{get_renderer()}{PDF_RENDER_DPI}"
+            f"/{PDF_VISION_PAGES_PER_REQUEST}x{PDF_VISION_MAX_PAGES}/{image_fingerprint()}")
+
+
+def find_scanned_pages(pages: List[str], min_chars: Optional[int] = None) -> List[int]:
+    """Indices of pages whose text layer is missing or (almost) empty"""
+    min_chars = SCANNED_PAGE_MIN_CHARS if min_chars is None else min_chars
+    return [index for index, text in enumerate(pages) if len(text.strip()) < min_chars]
+
+
+def _render_pdfium(file_bytes: Buffer, indices: List[int], dpi: int) -> Dict[int, bytes]:
+    import pypdfium2
+
+    document = pypdfium2.PdfDocument(open_buffer(file_bytes))
+    try:
+        images = {}
+        for index in indices:
+            bitmap = document[index].render(scale=dpi / 72, grayscale=True)
+            output = io.BytesIO()
+            # PNG: rendered text is sharp, core.image_preprocessing keeps it lossless
+            bitmap.to_pil().save(output, format="PNG")
+            images[index] = output.getvalue()
+        return images
+    finally:
+        document.close()
+
+
+def _embedded_page_image(page) -> Optional[bytes]:
+    """The largest image drawn on the page (the scan), rotated like the page"""
+    best: Optional[Tuple[int, bytes]] = None
+    for image_file in page.images:
+        try:
+            with Image.open(io.BytesIO(image_file.data)) as image:
+                area = image.size[0] * image.size[1]
+        except Exception:
+            # Encodings Pillow can't read (JBIG2, CCITT)
+            continue
+        if best is None or area > best[0]:
+            best = (area, image_file.data)
+    if best is None:
+        return None
+    rotation = page.rotation % 360
+    if not rotation:
+        return best[1]
+    with Image.open(io.BytesIO(best[1])) as image:
+        output = io.BytesIO()
+        # /Rotate is clockwise, PIL rotates counter-clockwise
+        image.rotate(-rotation, expand=True).save(output, format="PNG")
+        return output.getvalue()
+
+
+def _render_embedded(file_bytes: Buffer, indices: List[int]) -> Dict[int, bytes]:
+    reader = PyPDF2.PdfReader(open_buffer(file_bytes))
+    images = {}
+    for index in indices:
+        image = _embedded_page_image(reader.pages[index])
+        if image is not None:
+            images[index] = image
+    return images
+
+
+def render_pages(file_bytes: Buffer, indices: List[int], dpi: Optional[int] = None) -> Dict[int, bytes]:
+    """
+    Page images (encoded image files) by page index. Without pdfium, pages
+    that contain no readable image are missing from the result.
+    """
+    dpi = PDF_RENDER_DPI if dpi is None else dpi
+    if get_renderer() == "pdfium":
+        return _render_pdfium(file_bytes, indices, dpi)
+    return _render_embedded(file_bytes, indices)
+
+
+def batch_pages(indices: List[int], size: Optional[int] = None) -> List[List[int]]:
+    """Consecutive groups of pages, one vision request each"""
+    size = max(1, PDF_VISION_PAGES_PER_REQUEST if size is None else size)
+    return [indices[start:start + size] for start in range(0, len(indices), size)]
+
+
+def split_batch_text(text: str, indices: List[int]) -> Optional[Dict[int, str]]:
+    """
+    Split a batched vision answer at the page markers into text per page
+    index. None if the markers don't match the requested pages.
+    """
+    if len(indices) == 1:
+        return {indices[0]: _PAGE_MARKER.sub("", text).strip()}
+    matches = list(_PAGE_MARKER.finditer(text))
+    if [int(match.group(1)) for match in matches] != [index + 1 for index in indices]:
+        return None
+    texts = {}
+    for position, match in enumerate(matches):
+        end = matches[position + 1].start() if position + 1 < len(matches) else len(text)
+        texts[indices[position]] = text[match.end():end].strip()
+    return texts
+
+
+def vision_prompt(indices: List[int]) -> str:
+    """Instruction for one vision request covering the given pages"""
+    if len(indices) == 1:
+        return "Extract all text from this scanned CV page. Return only the raw text content, no formatting or analysis."
+    markers = ", ".join(f'"{PAGE_MARKER.format(page=index + 1)}"' for index in indices)
+    return (
+        f"The images are consecutive scanned pages of one CV, in order. Extract all text from each page. "
+        f"Start each page with its marker line ({markers}), then its raw text content. "
+        f"No formatting or analysis."
+    )
+
+
+def stitch_pages(pages: List[str], texts: Dict[int, str]) -> List[str]:
+    """Page texts with the recognized pages filled in, in page order"""
+    return [texts.get(index, text) for index, text in enumerate(pages)]
+
@@ -0,0 +1,164 @@
+"""
+PDF text extraction for CV2Profile
+Large documents are split into page ranges and extracted in a process pool;
+a page/character budget allows stopping early once enough text is collected
+"""
+
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple
+
+import PyPDF2
+
+from core.upload_spool import Buffer, open_buffer
+
+# Documents with at least this many pages are extracted in parallel
+PARALLEL_PAGE_THRESHOLD = int(os.getenv("PDF_PARALLEL_PAGE_THRESHOLD", "12"))
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Text budget, 0 = unlimited
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "0"))
+PDF_MAX_CHARS = int(os.getenv("PDF_MAX_CHARS", "0"))
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn: safe to use from multi-threaded servers (uvicorn, Streamlit)
+            _executor = ProcessPoolExecutor(
+                max_workers=PDF_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def shutdown_pdf_executor():
+    """Stop the worker processes (call at shutdown)"""
+    global _executor
+    with _executor_lock:
+        executor = _executor
+        _executor = None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _extract_page_range(file_bytes: bytes, start: int, end: int) -> List[Tuple[int, str, float]]:
+    """Worker: extract pages [start, end) as (index, text, seconds)"""
+    reader = PyPDF2.PdfReader(open_buffer(file_bytes))
+    pages = []
+    for index in range(start, end):
+        page_start = time.perf_counter()
+        text = reader.pages[index].extract_text() or ""
+        pages.append((index, text, time.perf_counter() - page_start))
+    return pages
+
+
+def extract_pdf_pages(file_bytes: Buffer, max_pages: Optional[int] = None, max_chars: Optional[int] = None,
+                      parallel_threshold: Optional[int] = None,
+                      workers: Optional[int] = None) -> Tuple[List[str], Dict[str, Any]]:
+    """
+    Extract the text of a PDF, page by page in reading order.
+    Returns (page_texts, stats) where stats contains per-page timings;
+    pages beyond the budget are not included.
+    """
+    max_pages = PDF_MAX_PAGES if max_pages is None else max_pages
+    max_chars = PDF_MAX_CHARS if max_chars is None else max_chars
+    parallel_threshold = PARALLEL_PAGE_THRESHOLD if parallel_threshold is None else parallel_threshold
+    workers = PDF_WORKERS if workers is None else workers
+
+    started = time.perf_counter()
+    reader = PyPDF2.PdfReader(open_buffer(file_bytes))
+    pages_total = len(reader.pages)
+    page_limit = min(pages_total, max_pages) if max_pages else pages_total
+    parallel = workers > 1 and page_limit >= parallel_threshold
+
+    parts: List[str] = []
+    timings: List[Dict[str, Any]] = []
+    chars = 0
+    truncated = False
+
+    def collect(pages: List[Tuple[int, str, float]]) -> bool:
+        """Append pages in order; False once the character budget is reached"""
+        nonlocal chars
+        for index, text, seconds in pages:
+            parts.append(text)
+            chars += len(text)
+            timings.append({"page": index + 1, "seconds": round(seconds, 4), "chars": len(text)})
+            if max_chars and chars >= max_chars:
+                return False
+        return True
+
+    if parallel:
+        # Small ranges, submitted in order, so an early stop skips most of the remaining work
+        range_size = max(2, math.ceil(page_limit / (workers * 2)))
+        try:
+            executor = _get_executor()
+            # Workers get the content pickled; a memory map can't be
+            payload = file_bytes if isinstance(file_bytes, bytes) else bytes(file_bytes)
+            futures = [
+                executor.submit(_extract_page_range, payload, start, min(start + range_size, page_limit))
+                for start in range(0, page_limit, range_size)
+            ]
+            for future in futures:
+                if not collect(future.result()):
+                    truncated = True
+                    break
+            for future in futures:
+                future.cancel()
+        except BrokenProcessPool:
+            # Worker crashed: drop the pool and fall back to in-process extraction
+            shutdown_pdf_executor()
+            parallel = False
+            parts.clear()
+            timings.clear()
+            chars = 0
+
+    if not parallel:
+        for index in range(page_limit):
+            page_start = time.perf_counter()
+            text = reader.pages[index].extract_text() or ""
+            if not collect([(index, text, time.perf_counter() - page_start)]):
+                truncated = True
+                break
+
+    pages_read = len(timings)
+    truncated = truncated or pages_read < pages_total
+
+    stats = {
+        "pages_total": pages_total,
+        "pages_read": pages_read,
+        "chars": chars,
+        "parallel": parallel,
+        "workers": workers if parallel else 1,
+        "truncated": truncated,
+        "seconds": round(time.perf_counter() - started, 4),
+        "page_timings": timings,
+    }
+    return parts, stats
+
+
+def join_pages(pages: List[str]) -> str:
+    """
+    Join page texts once instead of repeated concatenation; pages are
+    separated by a form feed so later stages (core.compaction) can tell them apart
+    """
+    return "\f".join(pages).strip()
+
+
+def extract_pdf_text(file_bytes: Buffer, **options) -> Tuple[str, Dict[str, Any]]:
+    """
+    Extract the text of a PDF, page by page in reading order.
+    Returns (text, stats) where stats contains per-page timings.
+    """
+    pages, stats = extract_pdf_pages(file_bytes, **options)
+    text = join_pages(pages)
+    stats["chars"] = len(text)
+    return text, stats
@@ -0,0 +1,257 @@
+"""
+Cross-process rate limiter for OpenAI requests in CV2Profile
+Token buckets for requests and tokens per minute, stored in SQLite so that all
+uvicorn workers and the Streamlit app share one budget; adapts to the
+x-ratelimit-* response headers
+"""
+
+import asyncio
+import hashlib
+import os
+import random
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Mapping, Optional
+
+from core.compaction import count_tokens
+
+# Rough input tokens for one image in a vision request
+IMAGE_TOKEN_ESTIMATE = 1105
+
+
+class RateLimitTimeout(Exception):
+    """Raised when a caller waited longer than max_wait for quota"""
+
+
+def estimate_request_tokens(messages: List[Dict[str, Any]], max_tokens: int = 0) -> int:
+    """
+    Tokens a chat request counts against the TPM limit: prompt tokens plus
+    max_tokens (OpenAI reserves the requested output budget up front)
+    """
+    tokens = 0
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            tokens += count_tokens(content) + 4
+        elif isinstance(content, list):
+            for part in content:
+                if part.get("type") == "text":
+                    tokens += count_tokens(part.get("text", ""))
+                else:
+                    tokens += IMAGE_TOKEN_ESTIMATE
+    return tokens + (max_tokens or 0)
+
+
+def rate_limit_scope(api_key: str, model: str) -> str:
+    """Quota scope: limits apply per organization (API key) and model"""
+    return f"{hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:12]}:{model}"
+
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute buckets per scope.
+    Every acquire runs in one SQLite write transaction, which serializes
+    callers across processes.
+    """
+
+    def __init__(self, db_path: str, requests_per_minute: float = 500, tokens_per_minute: float = 40000,
+                 max_wait: float = 300.0):
+        self.db_path = db_path
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_wait = max_wait
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.header_updates = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Autocommit mode: transactions are started explicitly (BEGIN IMMEDIATE)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS buckets (
+                scope TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                capacity REAL NOT NULL,
+                level REAL NOT NULL,
+                updated REAL NOT NULL,
+                PRIMARY KEY (scope, kind)
+            )
+            """
+        )
+
+    def _default_capacity(self, kind: str) -> float:
+        return self.requests_per_minute if kind == "requests" else self.tokens_per_minute
+
+    def _load(self, scope: str, now: float) -> Dict[str, List[float]]:
+        """Current [capacity, level] per bucket, refilled up to now (inside a transaction)"""
+        buckets = {}
+        for kind in ("requests", "tokens"):
+            row = self._conn.execute(
+                "SELECT capacity, level, updated FROM buckets WHERE scope = ? AND kind = ?", (scope, kind)
+            ).fetchone()
+            if row is None:
+                capacity = self._default_capacity(kind)
+                buckets[kind] = [capacity, capacity]
+            else:
+                capacity, level, updated = row
+                # Buckets refill continuously at capacity per minute
+                buckets[kind] = [capacity, min(capacity, level + max(0.0, now - updated) * capacity / 60.0)]
+        return buckets
+
+    def _store(self, scope: str, buckets: Dict[str, List[float]], now: float):
+        for kind, (capacity, level) in buckets.items():
+            self._conn.execute(
+                "INSERT OR REPLACE INTO buckets (scope, kind, capacity, level, updated) VALUES (?, ?, ?, ?, ?)",
+                (scope, kind, capacity, level, now)
+            )
+
+    def try_acquire(self, scope: str, tokens: int = 0) -> float:
+        """
+        Take one request and tokens from the buckets if available.
+        Returns 0.0 on success, otherwise the seconds until enough quota is back.
+        """
+        with self._lock:
+            now = time.time()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                buckets = self._load(scope, now)
+                needed = {"requests": 1.0, "tokens": float(tokens)}
+                wait = 0.0
+                for kind, (capacity, level) in buckets.items():
+                    # A request larger than the whole bucket waits for a full bucket
+                    need = min(needed[kind], capacity)
+                    if level < need:
+                        wait = max(wait, (need - level) * 60.0 / capacity if capacity > 0 else 60.0)
+                if wait == 0.0:
+                    for kind in buckets:
+                        buckets[kind][1] -= min(needed[kind], buckets[kind][0])
+                    self._store(scope, buckets, now)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            return wait
+
+    async def acquire(self, scope: str, tokens: int = 0) -> float:
+        """
+        Wait (queue) until the request fits into the quota.
+        Returns the seconds waited; raises RateLimitTimeout after max_wait.
+        """
+        started = time.monotonic()
+        while True:
+            wait = await asyncio.to_thread(self.try_acquire, scope, tokens)
+            waited = time.monotonic() - started
+            if wait == 0.0:
+                if waited > 0.001:
+                    self.waits += 1
+                    self.wait_seconds += waited
+                return waited
+            if waited + wait > self.max_wait:
+                raise RateLimitTimeout(f"OpenAI rate limit: no quota within {self.max_wait:g}s")
+            # Small jitter so queued callers in different processes don't retry in lockstep
+            await asyncio.sleep(min(wait, 5.0) + random.uniform(0, 0.05))
+
+    def adjust(self, scope: str, tokens: int):
+        """Correct the token bucket once actual usage is known (positive = give back)"""
+        if not tokens:
+            return
+        with self._lock:
+            now = time.time()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                buckets = self._load(scope, now)
+                capacity, level = buckets["tokens"]
+                buckets["tokens"][1] = min(capacity, level + tokens)
+                self._store(scope, buckets, now)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def update_from_headers(self, scope: str, headers: Mapping[str, str]):
+        """
+        Adapt to the upstream x-ratelimit-* headers: limits become the bucket
+        capacity, remaining quota lowers the local level (other clients of the
+        same organization use it too)
+        """
+        updates = {}
+        for kind in ("requests", "tokens"):
+            limit = headers.get(f"x-ratelimit-limit-{kind}")
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            try:
+                updates[kind] = (float(limit) if limit else None, float(remaining) if remaining else None)
+            except ValueError:
+                continue
+        if not any(value is not None for pair in updates.values() for value in pair):
+            return
+
+        with self._lock:
+            now = time.time()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                buckets = self._load(scope, now)
+                for kind, (limit, remaining) in updates.items():
+                    if limit:
+                        buckets[kind][0] = limit
+                    if remaining is not None:
+                        buckets[kind][1] = min(buckets[kind][1], remaining, buckets[kind][0])
+                self._store(scope, buckets, now)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self.header_updates += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._conn.execute("SELECT scope, kind, capacity, level, updated FROM buckets").fetchall()
+        now = time.time()
+        buckets: Dict[str, Dict[str, Any]] = {}
+        for scope, kind, capacity, level, updated in rows:
+            level = min(capacity, level + max(0.0, now - updated) * capacity / 60.0)
+            buckets.setdefault(scope, {})[kind] = {"per_minute": capacity, "available": round(level, 1)}
+        return {
+            "requests_per_minute": self.requests_per_minute,
+            "tokens_per_minute": self.tokens_per_minute,
+            "waits": self.waits,
+            "wait_seconds": round(self.wait_seconds, 3),
+            "header_updates": self.header_updates,
+            "buckets": buckets,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """
+    Process-wide rate limiter configured from environment variables.
+    The default database lives in the repository's temp/ directory so the
+    backend and the Streamlit app share it. None if disabled.
+    """
+    global _limiter
+    if os.getenv("OPENAI_RATE_LIMIT_ENABLED", "true").lower() in ("0", "false", "no"):
+        return None
+
+    with _limiter_lock:
+        if _limiter is None:
+            default_path = os.path.join(os.path.dirname(__file__), "..", "..", "temp", "openai_rate_limit.db")
+            _limiter = RateLimiter(
+                db_path=os.path.abspath(os.getenv("OPENAI_RATE_LIMIT_PATH", default_path)),
+                requests_per_minute=float(os.getenv("OPENAI_RPM", "500")),
+                tokens_per_minute=float(os.getenv("OPENAI_TPM", "40000")),
+                max_wait=float(os.getenv("OPENAI_RATE_LIMIT_MAX_WAIT", "300")),
+            )
+        return _limiter
@@ -0,0 +1,136 @@
+"""
+Render cache for CV2Profile
+Keeps rendered previews and exports in memory, keyed by a hash of the CV
+data, company, template and export options; bounded by bytes (LRU)
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Union
+
+RENDER_CACHE_ENABLED = os.getenv("RENDER_CACHE_ENABLED", "true").lower() not in ("0", "false", "no")
+RENDER_CACHE_MAX_BYTES = int(os.getenv("RENDER_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+Rendered = Union[str, bytes]
+
+
+def render_key(kind: str, extracted_data: Dict[str, Any], company: str, **options: Any) -> str:
+    """
+    Stable key for one rendering: output kind ("html", "pdf", "docx"), the
+    CV data (key order doesn't matter), company and options such as the template
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps(
+        {"kind": kind, "company": company.lower(), "options": options, "data": extracted_data},
+        sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str
+    ).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class RenderCache:
+    """
+    LRU cache of rendered output. Entries remember the sessions that rendered
+    them, so editing a session can drop its stale renderings right away
+    (an edited CV hashes to a new key anyway).
+    """
+
+    def __init__(self, max_bytes: int = RENDER_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._bytes = 0
+        # key -> (value, size, sessions)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._by_session: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str, session_id: Optional[str] = None) -> Optional[Rendered]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            if session_id is not None and session_id not in entry[2]:
+                entry[2].add(session_id)
+                self._by_session.setdefault(session_id, set()).add(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, value: Rendered, session_id: Optional[str] = None):
+        size = len(value.encode("utf-8")) if isinstance(value, str) else len(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._remove(key)
+            sessions = {session_id} if session_id is not None else set()
+            self._entries[key] = (value, size, sessions)
+            self._bytes += size
+            if session_id is not None:
+                self._by_session.setdefault(session_id, set()).add(key)
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key: str) -> bool:
+        """Drop one entry (caller holds the lock)"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._bytes -= entry[1]
+        for session_id in entry[2]:
+            keys = self._by_session.get(session_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_session[session_id]
+        return True
+
+    def invalidate(self, session_id: str) -> int:
+        """Drop everything a session rendered; returns the number of entries removed"""
+        with self._lock:
+            keys = self._by_session.pop(session_id, set())
+            removed = sum(1 for key in keys if self._remove(key))
+            self.invalidations += removed
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_session.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, total_bytes = len(self._entries), self._bytes
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "entries": entries,
+            "bytes": total_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+_cache: Optional[RenderCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_render_cache() -> Optional[RenderCache]:
+    """Process-wide render cache, None if disabled (RENDER_CACHE_ENABLED=false)"""
+    global _cache
+    if not RENDER_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = RenderCache()
+        return _cache
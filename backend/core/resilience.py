@@ -0,0 +1,322 @@
+"""
+Resilience layer for OpenAI calls in CV2Profile
+Retries with jittered exponential backoff, per-attempt deadlines, optional
+hedged requests and a circuit breaker that fails fast while upstream is degraded
+"""
+
+import asyncio
+import contextvars
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+import openai
+
+# Status codes worth retrying: timeouts, conflicts, rate limits, server errors
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling upstream while the circuit breaker is open"""
+
+
+# Per-attempt flag, set before the attempt is cancelled for running past its deadline
+_deadline_state: contextvars.ContextVar[Dict[str, bool]] = contextvars.ContextVar("deadline_state")
+
+
+def deadline_expired() -> bool:
+    """
+    Inside an attempt run by ResilientCaller: True if it is being cancelled
+    because its deadline passed, False for other cancellations (client gone,
+    a hedge won, shutdown)
+    """
+    state = _deadline_state.get(None)
+    return state is not None and state["expired"]
+
+
+def is_retryable(error: BaseException) -> bool:
+    """True for transient upstream errors (rate limit, timeout, connection, 5xx)"""
+    if isinstance(error, (asyncio.TimeoutError, openai.APIConnectionError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in RETRYABLE_STATUS_CODES or error.status_code >= 500
+    return False
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    """Server-provided retry delay (Retry-After header) in seconds"""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive upstream failures; after
+    reset_timeout one probe call is let through (half-open) and its outcome
+    closes or re-opens the circuit
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed" or self.failure_threshold <= 0:
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                self._probe_in_flight = False
+            if self.state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or (self.failure_threshold > 0 and self.failures >= self.failure_threshold):
+                self.state = "open"
+                self.opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def release_probe(self):
+        """Give back a probe slot taken by allow() for a request that was never sent"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {"state": self.state, "consecutive_failures": self.failures}
+
+
+class LatencyTracker:
+    """Sliding window of recent call latencies"""
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class ResilientCaller:
+    """
+    Runs upstream calls with retries, deadlines, hedging and a circuit breaker.
+    call() takes a factory that creates a new awaitable per attempt.
+    """
+
+    def __init__(self, max_retries: int = 3, backoff_base: float = 0.5, backoff_max: float = 8.0,
+                 deadline: float = 60.0, hedge: bool = False, hedge_delay: float = 0.0,
+                 hedge_min_samples: int = 20, breaker: Optional[CircuitBreaker] = None):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.deadline = deadline
+        self.hedge = hedge
+        # Fixed hedge delay; 0 = the observed p95 latency of the call kind
+        self.hedge_delay = hedge_delay
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker = breaker or CircuitBreaker()
+        self._latencies: Dict[str, LatencyTracker] = {}
+        self._counters = {"calls": 0, "attempts": 0, "retries": 0, "hedged": 0, "hedge_wins": 0,
+                          "failures": 0, "rejected": 0}
+
+    def _tracker(self, kind: str) -> LatencyTracker:
+        if kind not in self._latencies:
+            self._latencies[kind] = LatencyTracker()
+        return self._latencies[kind]
+
+    def _backoff(self, attempt: int, error: BaseException) -> float:
+        """Full-jitter exponential backoff, at least the server's Retry-After"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, 60.0))
+        return delay
+
+    def _hedge_after(self, kind: str) -> Optional[float]:
+        """Seconds to wait before firing a duplicate request, None = no hedging"""
+        if self.hedge_delay > 0:
+            return self.hedge_delay
+        tracker = self._tracker(kind)
+        if len(tracker) < self.hedge_min_samples:
+            return None
+        return tracker.percentile(0.95)
+
+    async def _with_deadline(self, factory: Callable[[], Awaitable[Any]],
+                             prepare: Optional[Callable[[], Awaitable[Any]]] = None) -> Any:
+        if prepare is not None:
+            await prepare()
+        state = {"expired": False}
+        token = _deadline_state.set(state)
+        try:
+            # The task copies the context, so the attempt sees this state
+            task = asyncio.ensure_future(factory())
+        finally:
+            _deadline_state.reset(token)
+        try:
+            done, _ = await asyncio.wait({task}, timeout=self.deadline)
+        except BaseException:
+            # Caller cancelled: let the attempt clean up before passing it on
+            task.cancel()
+            await asyncio.wait({task})
+            raise
+        if not done:
+            state["expired"] = True
+            task.cancel()
+            await asyncio.wait({task})
+            if task.cancelled():
+                raise asyncio.TimeoutError(f"No response from OpenAI within {self.deadline:g}s")
+        return task.result()
+
+    async def _attempt(self, factory: Callable[[], Awaitable[Any]], hedge_after: Optional[float],
+                       prepare: Optional[Callable[[], Awaitable[Any]]] = None) -> Any:
+        """
+        One attempt, optionally hedged: first successful response wins, the
+        other is cancelled. The hedge runs prepare() before its deadline starts.
+        """
+        if hedge_after is None:
+            return await self._with_deadline(factory)
+
+        tasks = [asyncio.ensure_future(self._with_deadline(factory))]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+            if not done:
+                self._counters["hedged"] += 1
+                tasks.append(asyncio.ensure_future(self._with_deadline(factory, prepare)))
+
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not tasks[0]:
+                            self._counters["hedge_wins"] += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.wait(tasks)
+
+    async def call(self, factory: Callable[[], Awaitable[Any]], kind: str = "default",
+                   hedge: Optional[bool] = None, use_breaker: bool = True,
+                   prepare: Optional[Callable[[], Awaitable[Any]]] = None) -> Any:
+        """
+        Run factory() until it succeeds, a non-retryable error occurs or the
+        retries are used up. Raises CircuitOpenError while the circuit is open.
+        use_breaker=False when the factory tracks health itself (core.endpoints).
+        prepare() is awaited before every upstream request (first attempt,
+        retries, hedges), outside its deadline and the hedge timer, e.g. to
+        wait for rate limit quota.
+        """
+        hedge = self.hedge if hedge is None else hedge
+        breaker = self.breaker if use_breaker else None
+        self._counters["calls"] += 1
+        attempt = 0
+        while True:
+            if breaker is not None and not breaker.allow():
+                self._counters["rejected"] += 1
+                raise CircuitOpenError("OpenAI upstream is degraded (circuit breaker open), try again later")
+
+            self._counters["attempts"] += 1
+            try:
+                if prepare is not None:
+                    await prepare()
+                started = time.perf_counter()
+                result = await self._attempt(factory, self._hedge_after(kind) if hedge else None, prepare)
+            except CircuitOpenError:
+                # No healthy endpoint left (see core.endpoints)
+                self._counters["rejected"] += 1
+                raise
+            except Exception as e:
+                if not is_retryable(e):
+                    # Upstream answered (e.g. 400/401): not a sign of degradation
+                    if breaker is not None:
+                        breaker.record_success()
+                    self._counters["failures"] += 1
+                    raise
+                if breaker is not None:
+                    breaker.record_failure()
+                if attempt >= self.max_retries:
+                    self._counters["failures"] += 1
+                    raise
+                self._counters["retries"] += 1
+                await asyncio.sleep(self._backoff(attempt, e))
+                attempt += 1
+                continue
+
+            if breaker is not None:
+                breaker.record_success()
+            self._tracker(kind).record(time.perf_counter() - started)
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        latencies = {}
+        for kind, tracker in self._latencies.items():
+            p50, p95 = tracker.percentile(0.5), tracker.percentile(0.95)
+            latencies[kind] = {
+                "samples": len(tracker),
+                "p50": round(p50, 3) if p50 is not None else None,
+                "p95": round(p95, 3) if p95 is not None else None,
+            }
+        return {
+            **self._counters,
+            "breaker": self.breaker.stats(),
+            "hedging": self.hedge,
+            "latency": latencies,
+        }
+
+
+_caller: Optional[ResilientCaller] = None
+_caller_lock = threading.Lock()
+
+
+def get_resilient_caller() -> ResilientCaller:
+    """Process-wide resilience layer configured from environment variables"""
+    global _caller
+    with _caller_lock:
+        if _caller is None:
+            _caller = ResilientCaller(
+                max_retries=int(os.getenv("OPENAI_MAX_RETRIES", "3")),
+                backoff_base=float(os.getenv("OPENAI_BACKOFF_BASE", "0.5")),
+                backoff_max=float(os.getenv("OPENAI_BACKOFF_MAX", "8")),
+                deadline=float(os.getenv("OPENAI_CALL_DEADLINE", "60")),
+                hedge=os.getenv("OPENAI_HEDGE", "false").lower() in ("1", "true", "yes"),
+                hedge_delay=float(os.getenv("OPENAI_HEDGE_DELAY", "0")),
+                breaker=CircuitBreaker(
+                    failure_threshold=int(os.getenv("OPENAI_CIRCUIT_FAILURES", "5")),
+                    reset_timeout=float(os.getenv("OPENAI_CIRCUIT_RESET", "30")),
+                ),
+            )
+        return _caller
@@ -0,0 +1,658 @@
+"""
+Session storage for CV2Profile
+Editing sessions behind one interface (get, put, patch, delete, TTL) so they
+survive restarts and are shared between uvicorn workers: in-memory,
+SQLite (WAL) or any server speaking the Redis protocol
+"""
+
+import abc
+import asyncio
+import heapq
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+# "memory" (single process), "sqlite" (shared file, WAL) or "redis"
+SESSION_STORE_BACKENDS = ["memory", "sqlite", "redis"]
+# Sessions expire this many seconds after they were stored (sliding: after the last access)
+SESSION_TTL = int(os.getenv("SESSION_TTL", "3600"))
+SESSION_SLIDING_TTL = os.getenv("SESSION_SLIDING_TTL", "true").lower() not in ("0", "false", "no")
+# Sliding expiry is only written when it moves by at least this many seconds (saves writes on reads)
+SESSION_TOUCH_INTERVAL = float(os.getenv("SESSION_TOUCH_INTERVAL", "60"))
+# Background expiry: run every SESSION_CLEANUP_INTERVAL seconds, purge in batches
+SESSION_CLEANUP_INTERVAL = float(os.getenv("SESSION_CLEANUP_INTERVAL", "60"))
+SESSION_CLEANUP_BATCH = int(os.getenv("SESSION_CLEANUP_BATCH", "500"))
+
+
+class SessionStore(abc.ABC):
+    """
+    Interface of the session backends. Sessions are JSON-serializable dicts;
+    every call returns a copy, changes go through put/patch.
+    """
+
+    backend = "base"
+
+    def __init__(self, ttl_seconds: int = SESSION_TTL, sliding: bool = SESSION_SLIDING_TTL,
+                 touch_interval: float = SESSION_TOUCH_INTERVAL):
+        self.ttl_seconds = ttl_seconds
+        self.sliding = sliding
+        self.touch_interval = touch_interval
+
+    def _ttl(self, ttl_seconds: Optional[float]) -> float:
+        return self.ttl_seconds if ttl_seconds is None else ttl_seconds
+
+    def _touched(self, expires_at: float, ttl: float, now: float) -> Optional[float]:
+        """New expiry after an access (sliding TTL), None if it doesn't have to be written"""
+        if not self.sliding:
+            return None
+        renewed = now + ttl
+        return renewed if renewed - expires_at >= self.touch_interval else None
+
+    @abc.abstractmethod
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Session data, None if unknown or expired; extends a sliding TTL"""
+
+    @abc.abstractmethod
+    def put(self, session_id: str, data: Dict[str, Any], ttl_seconds: Optional[int] = None):
+        """Create or replace a session; it expires after ttl_seconds (default: the store's TTL)"""
+
+    @abc.abstractmethod
+    def patch(self, session_id: str, changes: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Atomically update top-level fields of an existing session (extends a
+        sliding TTL). Returns the updated session, None if unknown or expired.
+        """
+
+    @abc.abstractmethod
+    def delete(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Remove a session; returns its data (for file cleanup), None if unknown"""
+
+    @abc.abstractmethod
+    def purge_expired(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Remove expired sessions, oldest expiry first, at most limit of them.
+        Returns their data (for file cleanup); cost grows with the number of
+        expired sessions, not with the number stored.
+        """
+
+    @abc.abstractmethod
+    def count(self) -> int:
+        """Number of stored sessions (expired ones until they are purged)"""
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.backend, "sessions": self.count(), "ttl_seconds": self.ttl_seconds,
+                "sliding_ttl": self.sliding}
+
+    def close(self):
+        pass
+
+
+class MemorySessionStore(SessionStore):
+    """
+    Process-local sessions (lost on restart, not shared between workers).
+    Expiry order is kept in a min-heap; entries made stale by an access or
+    delete are skipped when they come up and compacted away occasionally.
+    """
+
+    backend = "memory"
+
+    def __init__(self, ttl_seconds: int = SESSION_TTL, **options):
+        super().__init__(ttl_seconds, **options)
+        self._lock = threading.Lock()
+        # session_id -> [expires_at, ttl, JSON]; stored serialized like the other backends
+        self._sessions: Dict[str, List[Any]] = {}
+        # (expires_at, session_id), may contain stale entries
+        self._heap: List[Tuple[float, str]] = []
+
+    def _live(self, session_id: str, now: float) -> Optional[List[Any]]:
+        """Entry of an unexpired session, expiry extended (caller holds the lock)"""
+        entry = self._sessions.get(session_id)
+        if entry is None or entry[0] <= now:
+            return None
+        renewed = self._touched(entry[0], entry[1], now)
+        if renewed is not None:
+            entry[0] = renewed
+            self._push(renewed, session_id)
+        return entry
+
+    def _push(self, expires_at: float, session_id: str):
+        heapq.heappush(self._heap, (expires_at, session_id))
+        if len(self._heap) > 2 * len(self._sessions) + 1024:
+            # Mostly stale entries: rebuild from the live sessions
+            self._heap = [(entry[0], key) for key, entry in self._sessions.items()]
+            heapq.heapify(self._heap)
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._live(session_id, time.time())
+            payload = None if entry is None else entry[2]
+        return None if payload is None else json.loads(payload)
+
+    def put(self, session_id: str, data: Dict[str, Any], ttl_seconds: Optional[float] = None):
+        payload = json.dumps(data, ensure_ascii=False)
+        ttl = self._ttl(ttl_seconds)
+        with self._lock:
+            expires_at = time.time() + ttl
+            self._sessions[session_id] = [expires_at, ttl, payload]
+            self._push(expires_at, session_id)
+
+    def patch(self, session_id: str, changes: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._live(session_id, time.time())
+            if entry is None:
+                return None
+            data = {**json.loads(entry[2]), **changes}
+            entry[2] = json.dumps(data, ensure_ascii=False)
+        return data
+
+    def delete(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+        return None if entry is None else json.loads(entry[2])
+
+    def purge_expired(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        now = time.time()
+        payloads = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now and (limit is None or len(payloads) < limit):
+                expires_at, session_id = heapq.heappop(self._heap)
+                entry = self._sessions.get(session_id)
+                # Stale: deleted, replaced or extended since this entry was pushed
+                if entry is not None and entry[0] == expires_at:
+                    del self._sessions[session_id]
+                    payloads.append(entry[2])
+        return [json.loads(payload) for payload in payloads]
+
+    def count(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Sessions in a SQLite file in WAL mode: readers don't block the writer, so
+    all workers on one host can share it; survives restarts. Expiry uses the
+    index on expires_at.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, db_path: str, ttl_seconds: int = SESSION_TTL, **options):
+        super().__init__(ttl_seconds, **options)
+        self.db_path = db_path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Autocommit mode: transactions are started explicitly (BEGIN IMMEDIATE)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sessions (
+                id TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                ttl REAL NOT NULL
+            )
+            """
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(sessions)")}
+        if "ttl" not in columns:
+            # Database from before sliding expiry
+            self._conn.execute(f"ALTER TABLE sessions ADD COLUMN ttl REAL NOT NULL DEFAULT {float(ttl_seconds)}")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions(expires_at)")
+
+    def _load(self, session_id: str, now: float) -> Optional[str]:
+        """JSON of an unexpired session, expiry extended (caller holds the lock)"""
+        row = self._conn.execute(
+            "SELECT data, expires_at, ttl FROM sessions WHERE id = ? AND expires_at > ?", (session_id, now)
+        ).fetchone()
+        if row is None:
+            return None
+        renewed = self._touched(row[1], row[2], now)
+        if renewed is not None:
+            self._conn.execute("UPDATE sessions SET expires_at = ? WHERE id = ?", (renewed, session_id))
+        return row[0]
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            payload = self._load(session_id, time.time())
+        return None if payload is None else json.loads(payload)
+
+    def put(self, session_id: str, data: Dict[str, Any], ttl_seconds: Optional[float] = None):
+        payload = json.dumps(data, ensure_ascii=False)
+        ttl = self._ttl(ttl_seconds)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (id, data, expires_at, ttl) VALUES (?, ?, ?, ?)",
+                (session_id, payload, time.time() + ttl, ttl)
+            )
+
+    def patch(self, session_id: str, changes: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            # Write lock before reading: no other worker can update in between
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                payload = self._load(session_id, time.time())
+                data = None
+                if payload is not None:
+                    data = {**json.loads(payload), **changes}
+                    self._conn.execute(
+                        "UPDATE sessions SET data = ? WHERE id = ?",
+                        (json.dumps(data, ensure_ascii=False), session_id)
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return data
+
+    def delete(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "DELETE FROM sessions WHERE id = ? RETURNING data", (session_id,)
+            ).fetchall()
+        return json.loads(rows[0][0]) if rows else None
+
+    def purge_expired(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "DELETE FROM sessions WHERE id IN "
+                "(SELECT id FROM sessions WHERE expires_at <= ? ORDER BY expires_at LIMIT ?) RETURNING data",
+                (time.time(), -1 if limit is None else limit)
+            ).fetchall()
+        return [json.loads(data) for data, in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class RedisError(Exception):
+    """Error reply from the Redis server"""
+
+
+class _RedisConnection:
+    """One RESP2 connection (requests are serialized by the pool)"""
+
+    def __init__(self, host: str, port: int, timeout: float):
+        self._socket = socket.create_connection((host, port), timeout=timeout)
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._reader = self._socket.makefile("rb")
+
+    def send(self, *commands: Tuple[Any, ...]):
+        """Write several commands in one round trip (pipelining)"""
+        out = bytearray()
+        for command in commands:
+            out += b"*%d\r\n" % len(command)
+            for argument in command:
+                value = argument if isinstance(argument, bytes) else str(argument).encode("utf-8")
+                out += b"$%d\r\n%s\r\n" % (len(value), value)
+        self._socket.sendall(out)
+
+    def read(self) -> Any:
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Redis connection closed")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode("utf-8")
+        if kind == b"-":
+            raise RedisError(rest.decode("utf-8"))
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            length = int(rest)
+            if length < 0:
+                return None
+            return self._reader.read(length + 2)[:-2]
+        if kind == b"*":
+            length = int(rest)
+            return None if length < 0 else [self.read() for _ in range(length)]
+        raise RedisError(f"Unexpected reply: {line!r}")
+
+    def execute(self, *commands: Tuple[Any, ...]) -> List[Any]:
+        """Send commands pipelined, return all replies (errors raised after reading every reply)"""
+        self.send(*commands)
+        replies, error = [], None
+        for _ in commands:
+            try:
+                replies.append(self.read())
+            except RedisError as e:
+                error = error or e
+                replies.append(None)
+        if error is not None:
+            raise error
+        return replies
+
+    def close(self):
+        try:
+            self._reader.close()
+            self._socket.close()
+        except OSError:
+            pass
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Sessions on a server speaking the Redis protocol (Redis, Valkey, KeyDB),
+    shared by all workers and hosts. Each session is one JSON string; the
+    expiry lives in a sorted set (score = expires_at) so purge_expired reads
+    only expired sessions and hands them back for file cleanup. The key's own
+    TTL (with a grace period) is a safety net.
+    """
+
+    backend = "redis"
+
+    # Keys outlive their session by this long so purge_expired still sees them
+    EXPIRY_GRACE = 24 * 3600
+
+    def __init__(self, url: str = "redis://localhost:6379/0", ttl_seconds: int = SESSION_TTL,
+                 prefix: str = "cv2profile:session:", timeout: float = 5.0, max_connections: int = 16,
+                 **options):
+        super().__init__(ttl_seconds, **options)
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self._username = unquote(parsed.username) if parsed.username else None
+        self._password = unquote(parsed.password) if parsed.password else None
+        self.prefix = prefix
+        self.index_key = f"{prefix}_expiry"
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._idle: List[_RedisConnection] = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_connections)
+
+    def _connect(self) -> _RedisConnection:
+        connection = _RedisConnection(self.host, self.port, self.timeout)
+        setup = []
+        if self._password is not None:
+            setup.append(("AUTH", self._username, self._password) if self._username else ("AUTH", self._password))
+        if self.db:
+            setup.append(("SELECT", self.db))
+        if setup:
+            try:
+                connection.execute(*setup)
+            except BaseException:
+                connection.close()
+                raise
+        return connection
+
+    def _call(self, function):
+        """Run function(connection) on a pooled connection; broken connections are dropped"""
+        with self._slots:
+            with self._lock:
+                connection = self._idle.pop() if self._idle else None
+            if connection is None:
+                connection = self._connect()
+            try:
+                result = function(connection)
+            except BaseException:
+                # Unknown state (pending WATCH/MULTI, half-read reply): don't reuse
+                connection.close()
+                raise
+            with self._lock:
+                self._idle.append(connection)
+            return result
+
+    def _key(self, session_id: str) -> str:
+        return f"{self.prefix}{session_id}"
+
+    def _expiry_commands(self, session_id: str, expires_at: float, ttl: float) -> List[Tuple[Any, ...]]:
+        """Move the session's expiry; XX: never re-adds a session deleted meanwhile"""
+        return [
+            ("ZADD", self.index_key, "XX", repr(expires_at), session_id),
+            ("EXPIRE", self._key(session_id), int(ttl) + self.EXPIRY_GRACE),
+        ]
+
+    def _read(self, connection: _RedisConnection, session_id: str,
+              now: float) -> Tuple[Optional[Dict[str, Any]], Optional[float]]:
+        """(envelope, renewed expiry or None) of an unexpired session, (None, None) otherwise"""
+        payload, score = connection.execute(("GET", self._key(session_id)), ("ZSCORE", self.index_key, session_id))
+        if payload is None or score is None or float(score) <= now:
+            return None, None
+        envelope = json.loads(payload)
+        return envelope, self._touched(float(score), envelope["ttl"], now)
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        def load(connection: _RedisConnection) -> Optional[Dict[str, Any]]:
+            envelope, renewed = self._read(connection, session_id, time.time())
+            if renewed is not None:
+                connection.execute(*self._expiry_commands(session_id, renewed, envelope["ttl"]))
+            return None if envelope is None else envelope["data"]
+
+        return self._call(load)
+
+    def put(self, session_id: str, data: Dict[str, Any], ttl_seconds: Optional[float] = None):
+        ttl = self._ttl(ttl_seconds)
+        payload = json.dumps({"ttl": ttl, "data": data}, ensure_ascii=False)
+        self._call(lambda connection: connection.execute(
+            ("MULTI",),
+            ("SET", self._key(session_id), payload, "EX", int(ttl) + self.EXPIRY_GRACE),
+            ("ZADD", self.index_key, repr(time.time() + ttl), session_id),
+            ("EXEC",),
+        ))
+
+    def patch(self, session_id: str, changes: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        key = self._key(session_id)
+
+        def update(connection: _RedisConnection) -> Optional[Dict[str, Any]]:
+            # Optimistic transaction: EXEC fails if the key changed after WATCH
+            while True:
+                connection.execute(("WATCH", key))
+                envelope, renewed = self._read(connection, session_id, time.time())
+                if envelope is None:
+                    connection.execute(("UNWATCH",))
+                    return None
+                envelope["data"] = {**envelope["data"], **changes}
+                commands = [("SET", key, json.dumps(envelope, ensure_ascii=False), "KEEPTTL")]
+                if renewed is not None:
+                    commands += self._expiry_commands(session_id, renewed, envelope["ttl"])
+                replies = connection.execute(("MULTI",), *commands, ("EXEC",))
+                if replies[-1] is not None:
+                    return envelope["data"]
+
+        return self._call(update)
+
+    def _remove(self, connection: _RedisConnection, session_id: str) -> Optional[bytes]:
+        """Delete one session and its index entry, return the stored envelope"""
+        replies = connection.execute(
+            ("MULTI",),
+            ("GET", self._key(session_id)),
+            ("DEL", self._key(session_id)),
+            ("ZREM", self.index_key, session_id),
+            ("EXEC",),
+        )
+        return replies[-1][0]
+
+    def _purge_one(self, connection: _RedisConnection, session_id: str) -> Optional[bytes]:
+        """
+        Remove a session found in the expiry index unless another worker
+        extended (EXPIRE touches the watched key), purged or deleted it meanwhile
+        """
+        key = self._key(session_id)
+        connection.execute(("WATCH", key))
+        score = connection.execute(("ZSCORE", self.index_key, session_id))[0]
+        if score is None or float(score) > time.time():
+            connection.execute(("UNWATCH",))
+            return None
+        replies = connection.execute(
+            ("MULTI",), ("GET", key), ("DEL", key), ("ZREM", self.index_key, session_id), ("EXEC",)
+        )
+        return None if replies[-1] is None else replies[-1][0]
+
+    def delete(self, session_id: str) -> Optional[Dict[str, Any]]:
+        payload = self._call(lambda connection: self._remove(connection, session_id))
+        return None if payload is None else json.loads(payload)["data"]
+
+    def purge_expired(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        def purge(connection: _RedisConnection) -> List[Dict[str, Any]]:
+            command: Tuple[Any, ...] = ("ZRANGEBYSCORE", self.index_key, "-inf", repr(time.time()))
+            if limit is not None:
+                command += ("LIMIT", 0, limit)
+            sessions = []
+            for session_id in connection.execute(command)[0]:
+                payload = self._purge_one(connection, session_id.decode("utf-8"))
+                if payload is not None:
+                    sessions.append(json.loads(payload)["data"])
+            return sessions
+
+        return self._call(purge)
+
+    def count(self) -> int:
+        return self._call(lambda connection: connection.execute(("ZCARD", self.index_key))[0])
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+
+def create_session_store(backend: Optional[str] = None, ttl_seconds: Optional[int] = None,
+                         namespace: str = "session") -> SessionStore:
+    """
+    Session store for the given backend, configured from environment variables.
+    Other namespaces (e.g. "job" for job status records) get their own
+    SQLite file or Redis key prefix, so they don't mix with the sessions.
+    """
+    backend = backend or os.getenv("SESSION_STORE", "memory")
+    ttl_seconds = SESSION_TTL if ttl_seconds is None else ttl_seconds
+    if backend == "memory":
+        return MemorySessionStore(ttl_seconds)
+    if backend == "sqlite":
+        path = os.getenv("SESSION_STORE_PATH", os.path.join("temp", "sessions.db"))
+        if namespace != "session":
+            root, extension = os.path.splitext(path)
+            path = f"{root}_{namespace}{extension}"
+        return SQLiteSessionStore(path, ttl_seconds)
+    if backend == "redis":
+        prefix = os.getenv("SESSION_REDIS_PREFIX", "cv2profile:session:")
+        return RedisSessionStore(
+            os.getenv("SESSION_REDIS_URL", "redis://localhost:6379/0"),
+            ttl_seconds,
+            prefix=prefix if namespace == "session" else f"{prefix}{namespace}:",
+        )
+    raise ValueError(f"Unknown session store (use one of: {', '.join(SESSION_STORE_BACKENDS)})")
+
+
+_stores: Dict[str, SessionStore] = {}
+_store_lock = threading.Lock()
+
+
+def get_session_store(namespace: str = "session") -> SessionStore:
+    """Process-wide session store (SESSION_STORE: memory, sqlite or redis) of a namespace"""
+    with _store_lock:
+        store = _stores.get(namespace)
+        if store is None:
+            store = _stores[namespace] = create_session_store(namespace=namespace)
+        return store
+
+
+def get_job_store() -> SessionStore:
+    """Store for job status records: the session backend, in its own namespace"""
+    return get_session_store("job")
+
+
+def close_session_store():
+    """Close the process-wide stores of all namespaces (call at shutdown)"""
+    with _store_lock:
+        stores = list(_stores.values())
+        _stores.clear()
+    for store in stores:
+        store.close()
+
+
+class SessionReaper:
+    """
+    Background expiry: purges expired sessions in batches on a timer,
+    outside of requests, and runs cleanup (e.g. deleting the uploads) for
+    each one. cleanup(session_data) returns the number of bytes it freed.
+    Without a store it purges the process-wide store of namespace.
+    """
+
+    def __init__(self, cleanup: Callable[[Dict[str, Any]], int], store: Optional[SessionStore] = None,
+                 interval: float = SESSION_CLEANUP_INTERVAL, batch_size: int = SESSION_CLEANUP_BATCH,
+                 namespace: str = "session"):
+        self.cleanup = cleanup
+        self.store = store
+        self.namespace = namespace
+        self.interval = interval
+        self.batch_size = batch_size
+        self.runs = 0
+        self.expired_sessions = 0
+        self.reclaimed_bytes = 0
+        self.errors = 0
+        self.last_run_seconds: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Start the timer task (call from the running event loop)"""
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+            except Exception:
+                # Store temporarily unavailable: try again next round
+                self.errors += 1
+
+    def _purge_batch(self, store: SessionStore) -> Tuple[int, int]:
+        """(sessions, bytes) of one batch, runs in a worker thread"""
+        expired = store.purge_expired(limit=self.batch_size)
+        freed = 0
+        for session_data in expired:
+            try:
+                freed += self.cleanup(session_data)
+            except OSError:
+                self.errors += 1
+        return len(expired), freed
+
+    async def run_once(self) -> int:
+        """Purge everything that has expired so far; returns the number of sessions"""
+        started = time.perf_counter()
+        store = self.store or get_session_store(self.namespace)
+        total = 0
+        while True:
+            count, freed = await asyncio.to_thread(self._purge_batch, store)
+            total += count
+            self.expired_sessions += count
+            self.reclaimed_bytes += freed
+            if count < self.batch_size:
+                break
+        self.runs += 1
+        self.last_run_seconds = round(time.perf_counter() - started, 4)
+        return total
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "interval_seconds": self.interval,
+            "runs": self.runs,
+            "expired_sessions": self.expired_sessions,
+            "reclaimed_bytes": self.reclaimed_bytes,
+            "errors": self.errors,
+            "last_run_seconds": self.last_run_seconds,
+        }
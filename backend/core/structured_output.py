@@ -0,0 +1,193 @@
+"""
+Structured model output for CV2Profile
+JSON schemas derived from the extraction prompts (OpenAI response_format), a
+tolerant parser that repairs fenced, chatty or truncated output and the check
+which sections have to be requested again
+"""
+
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+# "json_schema" (schema-constrained output), "json_object" (JSON mode) or "off"
+STRUCTURED_OUTPUT_MODES = ["json_schema", "json_object", "off"]
+STRUCTURED_OUTPUT = os.getenv("STRUCTURED_OUTPUT", "json_schema")
+# Broken sections are requested again with their focused prompt instead of failing the upload
+REASK_ENABLED = os.getenv("REASK_ENABLED", "true").lower() not in ("0", "false", "no")
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def schema_from_example(example: Any) -> Dict[str, Any]:
+    """
+    JSON schema for an example value as written in the prompts: objects with
+    all keys required, arrays typed by their first item, strings nullable
+    """
+    if isinstance(example, dict):
+        return {
+            "type": "object",
+            "properties": {key: schema_from_example(value) for key, value in example.items()},
+            "required": list(example),
+            "additionalProperties": False,
+        }
+    if isinstance(example, list):
+        return {"type": "array", "items": schema_from_example(example[0]) if example else {"type": "string"}}
+    if isinstance(example, bool):
+        return {"type": ["boolean", "null"]}
+    if isinstance(example, (int, float)):
+        return {"type": ["number", "null"]}
+    return {"type": ["string", "null"]}
+
+
+def schema_from_prompt(prompt: str) -> Dict[str, Any]:
+    """Schema for the example JSON structure embedded in a prompt"""
+    start, end = prompt.find("{"), prompt.rfind("}")
+    return schema_from_example(json.loads(prompt[start:end + 1]))
+
+
+def section_schema(schema: Dict[str, Any], section: str) -> Dict[str, Any]:
+    """Schema for a single-section response: {"<section>": ...}"""
+    return {
+        "type": "object",
+        "properties": {section: schema["properties"][section]},
+        "required": [section],
+        "additionalProperties": False,
+    }
+
+
+def build_response_format(schema: Dict[str, Any], name: str,
+                          mode: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """response_format parameter for the chat completion, None = prompt-only JSON"""
+    mode = mode or STRUCTURED_OUTPUT
+    if mode == "json_schema":
+        return {"type": "json_schema", "json_schema": {"name": name, "strict": True, "schema": schema}}
+    if mode == "json_object":
+        return {"type": "json_object"}
+    return None
+
+
+def repair_json(text: str) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Parse model output that should be one JSON object. Tolerates code fences
+    and prose around the object and trailing commas; truncated output is cut
+    back to the last complete value and closed.
+    Returns (value, info) where info tells whether the text was repaired or
+    truncated and which top-level key was cut off. Raises
+    json.JSONDecodeError if no object can be recovered.
+    """
+    info: Dict[str, Any] = {"repaired": False, "truncated": False, "partial_section": None}
+    try:
+        return json.loads(text, strict=False), info
+    except json.JSONDecodeError:
+        pass
+
+    start = text.find("{")
+    if start < 0:
+        raise json.JSONDecodeError("No JSON object in model output", text, 0)
+
+    out: List[str] = []
+    stack: List[str] = []
+    # (output length, open containers, top-level key) where the output may be cut
+    safe_points: List[Tuple[int, Tuple[str, ...], Optional[str]]] = []
+    in_string = False
+    escape = False
+    string_start = 0
+    expect_key = False
+    key: Optional[str] = None
+    complete = False
+
+    for ch in text[start:]:
+        if in_string:
+            out.append(ch)
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+                if expect_key and len(stack) == 1:
+                    key = json.loads("".join(out[string_start:]), strict=False)
+                    expect_key = False
+            continue
+
+        if ch == '"':
+            in_string = True
+            string_start = len(out)
+            out.append(ch)
+        elif ch in "{[":
+            stack.append(ch)
+            out.append(ch)
+            expect_key = ch == "{" and len(stack) == 1
+            if len(stack) == 1:
+                safe_points.append((len(out), tuple(stack), key))
+        elif ch in "}]":
+            if not stack or _CLOSERS[stack[-1]] != ch:
+                # Stray closer: drop it
+                continue
+            _drop_trailing_comma(out)
+            stack.pop()
+            out.append(ch)
+            if not stack:
+                complete = True
+                break
+            safe_points.append((len(out), tuple(stack), key))
+        elif ch == ",":
+            safe_points.append((len(out), tuple(stack), key))
+            out.append(ch)
+            if len(stack) == 1:
+                expect_key = True
+        else:
+            out.append(ch)
+
+    info["repaired"] = True
+    if not complete:
+        info["truncated"] = True
+        length, open_containers, cut_key = safe_points[-1] if safe_points else (0, (), None)
+        out = out[:length]
+        _drop_trailing_comma(out)
+        out.extend(_CLOSERS[opener] for opener in reversed(open_containers))
+        if len(open_containers) > 1:
+            info["partial_section"] = cut_key
+
+    return json.loads("".join(out), strict=False), info
+
+
+def _drop_trailing_comma(out: List[str]):
+    """Remove whitespace and one comma at the end of the output"""
+    while out and out[-1].isspace():
+        out.pop()
+    if out and out[-1] == ",":
+        out.pop()
+
+
+def matches_schema(value: Any, schema: Dict[str, Any]) -> bool:
+    """
+    Structural check: objects must be objects and arrays arrays; scalar
+    types are not enforced (dates may come back as numbers etc.)
+    """
+    types = schema.get("type")
+    if types == "object":
+        if not isinstance(value, dict):
+            return False
+        properties = schema.get("properties", {})
+        return all(matches_schema(value[key], properties[key]) for key in value if key in properties)
+    if types == "array":
+        return isinstance(value, list) and all(matches_schema(item, schema.get("items", {})) for item in value)
+    return not isinstance(value, (dict, list))
+
+
+def broken_sections(data: Any, schema: Dict[str, Any], info: Dict[str, Any]) -> List[str]:
+    """
+    Top-level sections that have to be requested again: wrong structure,
+    cut off, or missing because the output was truncated
+    """
+    if not isinstance(data, dict):
+        return list(schema["properties"])
+    broken = []
+    for section, section_schema_ in schema["properties"].items():
+        if section not in data:
+            if info.get("truncated"):
+                broken.append(section)
+        elif section == info.get("partial_section") or not matches_schema(data[section], section_schema_):
+            broken.append(section)
+    return broken
@@ -0,0 +1,344 @@
+"""
+Upload ingestion for CV2Profile
+Uploads are read in chunks and spooled to a file in temp/ while their hash
+is computed; reading stops as soon as the size limit is exceeded. Multipart
+request bodies are parsed as they arrive, so file parts go straight to the
+spool file without a buffered copy. Readers get a read-only memory map of
+the file instead of a copy in memory.
+"""
+
+import asyncio
+import hashlib
+import io
+import mmap
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import AsyncIterable, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
+
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+UPLOAD_SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR", os.path.join("temp", "uploads"))
+# Spool files older than this are leftovers (crashed worker etc.) and get swept
+UPLOAD_SPOOL_MAX_AGE = float(os.getenv("UPLOAD_SPOOL_MAX_AGE", "10800"))
+# Plain form fields (company, mode, ...) are kept in memory up to this size
+FORM_FIELD_MAX_SIZE = 64 * 1024
+
+# File content: bytes in memory or a memory-mapped spool file
+Buffer = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+
+class UploadTooLarge(ValueError):
+    """The upload exceeded the size limit (reading was stopped there)"""
+
+
+class MalformedForm(ValueError):
+    """The request body is not a valid multipart form"""
+
+
+class _BufferReader(io.RawIOBase):
+    """Seekable stream over a buffer without copying it (io.BytesIO copies anything but bytes)"""
+
+    def __init__(self, data: Buffer):
+        self._view = memoryview(data).cast("B")
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, target) -> int:
+        end = min(len(self._view), self._position + len(target))
+        count = max(0, end - self._position)
+        target[:count] = self._view[self._position:end]
+        self._position += count
+        return count
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: len(self._view)}[whence]
+        self._position = max(0, base + offset)
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+    def close(self):
+        self._view.release()
+        super().close()
+
+
+def open_buffer(data: Buffer) -> BinaryIO:
+    """Independent file-like reader over file content (bytes or a memory map)"""
+    if isinstance(data, bytes):
+        # Shares the bytes object until written to
+        return io.BytesIO(data)
+    return io.BufferedReader(_BufferReader(data))
+
+
+class SpooledUpload:
+    """An upload on disk: path, size and SHA-256 of its content"""
+
+    def __init__(self, path: str, filename: str, size: int, sha256: str):
+        self.path = path
+        self.filename = filename
+        self.size = size
+        self.sha256 = sha256
+
+    @contextmanager
+    def mapped(self) -> Iterator[Buffer]:
+        """Read-only memory map of the content; pages are loaded on access"""
+        if self.size == 0:
+            yield b""
+            return
+        with open(self.path, "rb") as handle:
+            buffer = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield buffer
+        finally:
+            try:
+                buffer.close()
+            except BufferError:
+                # A reader still holds a view; the map is released together with it
+                pass
+
+    def discard(self):
+        """Delete the spooled file"""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def _spool_file(directory: Optional[str]):
+    directory = directory or UPLOAD_SPOOL_DIR
+    os.makedirs(directory, exist_ok=True)
+    handle = tempfile.NamedTemporaryFile(dir=directory, prefix="upload_", delete=False)
+    return handle, handle.name
+
+
+def sweep_spool(max_age: Optional[float] = None, directory: Optional[str] = None) -> Tuple[int, int]:
+    """Delete spool files older than max_age seconds; returns (files, bytes)"""
+    max_age = UPLOAD_SPOOL_MAX_AGE if max_age is None else max_age
+    directory = directory or UPLOAD_SPOOL_DIR
+    cutoff = time.time() - max_age
+    removed = freed = 0
+    try:
+        entries = list(os.scandir(directory))
+    except FileNotFoundError:
+        return 0, 0
+    for entry in entries:
+        try:
+            stat = entry.stat()
+            if entry.is_file() and stat.st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+                freed += stat.st_size
+        except FileNotFoundError:
+            # Taken over or discarded in the meantime
+            continue
+    return removed, freed
+
+
+def spool_file(source: BinaryIO, max_bytes: int, filename: str, directory: Optional[str] = None,
+               chunk_size: Optional[int] = None) -> SpooledUpload:
+    """
+    Copy a readable file object (e.g. a ZIP member) chunk by chunk into a
+    spool file. Raises UploadTooLarge as soon as more than max_bytes were read,
+    whatever size the source claims.
+    """
+    chunk_size = chunk_size or UPLOAD_CHUNK_SIZE
+    handle, path = _spool_file(directory)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with handle:
+            for chunk in iter(lambda: source.read(chunk_size), b""):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"File too large (max {max_bytes // (1024 * 1024)}MB)")
+                digest.update(chunk)
+                handle.write(chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    return SpooledUpload(path, filename, size, digest.hexdigest())
+
+
+class FormFile:
+    """
+    A file part of a multipart form. upload is None if the part exceeded
+    its size limit (too_large) and was dropped while it arrived.
+    """
+
+    def __init__(self, field: str, filename: str, content_type: Optional[str]):
+        self.field = field
+        self.filename = filename
+        self.content_type = content_type
+        self.upload: Optional[SpooledUpload] = None
+        self.too_large = False
+
+
+class SpooledForm:
+    """Parsed multipart form: plain fields in memory, file parts spooled to disk"""
+
+    def __init__(self):
+        self.fields: Dict[str, str] = {}
+        self.files: List[FormFile] = []
+
+    def get(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        return self.fields.get(name, default)
+
+    def discard(self):
+        """Delete all spooled files"""
+        for part in self.files:
+            if part.upload is not None:
+                part.upload.discard()
+
+
+class _FormSpooler:
+    """MultipartParser callbacks writing file parts to spool files as they arrive"""
+
+    def __init__(self, form: SpooledForm, file_limit: Callable[[str], int], max_files: int,
+                 directory: Optional[str]):
+        self.form = form
+        self.file_limit = file_limit
+        self.max_files = max_files
+        self.directory = directory
+        self._headers: Dict[bytes, bytes] = {}
+        self._field = b""
+        self._value = b""
+        self._name = ""
+        self._data: Optional[bytearray] = None
+        self._file: Optional[FormFile] = None
+        self._handle = None
+        self._path: Optional[str] = None
+        self._digest = None
+        self._size = 0
+        self._limit = 0
+
+    def callbacks(self) -> Dict[str, Callable]:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+        }
+
+    def on_part_begin(self):
+        self._headers = {}
+
+    def on_header_field(self, data: bytes, start: int, end: int):
+        self._field += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int):
+        self._value += data[start:end]
+
+    def on_header_end(self):
+        self._headers[self._field.lower()] = self._value
+        self._field = self._value = b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        if b"name" not in options:
+            raise MalformedForm("Form part without a name")
+        self._name = options[b"name"].decode("latin-1")
+        if b"filename" not in options:
+            self._data = bytearray()
+            return
+        if len(self.form.files) >= self.max_files:
+            raise MalformedForm(f"Too many files (max {self.max_files})")
+        content_type = self._headers.get(b"content-type")
+        self._file = FormFile(self._name, options[b"filename"].decode("utf-8", "replace"),
+                              content_type.decode("latin-1") if content_type is not None else None)
+        self.form.files.append(self._file)
+        self._limit = self.file_limit(self._file.filename)
+        self._handle, self._path = _spool_file(self.directory)
+        self._digest = hashlib.sha256()
+        self._size = 0
+
+    def on_part_data(self, data: bytes, start: int, end: int):
+        chunk = data[start:end]
+        if self._file is None:
+            self._data += chunk
+            if len(self._data) > FORM_FIELD_MAX_SIZE:
+                raise MalformedForm(f"Form field {self._name} too large")
+            return
+        if self._handle is None:
+            # Over the limit: the rest of the part is dropped as it arrives
+            return
+        self._size += len(chunk)
+        if self._size > self._limit:
+            self._file.too_large = True
+            self.close()
+            return
+        self._digest.update(chunk)
+        self._handle.write(chunk)
+
+    def on_part_end(self):
+        if self._file is None:
+            self.form.fields[self._name] = self._data.decode("utf-8", "replace")
+        elif self._handle is not None:
+            self._handle.close()
+            self._handle = None
+            self._file.upload = SpooledUpload(self._path, self._file.filename, self._size,
+                                              self._digest.hexdigest())
+        self._file = None
+        self._data = None
+
+    def pending(self) -> bool:
+        """A part was started but the body ended before its closing boundary"""
+        return self._file is not None or self._data is not None
+
+    def close(self):
+        """Drop the file part being written"""
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+            os.remove(self._path)
+
+
+async def spool_form(chunks: AsyncIterable[bytes], content_type: str, max_bytes: int,
+                     file_limit: Callable[[str], int], max_files: int = 1000,
+                     directory: Optional[str] = None) -> SpooledForm:
+    """
+    Parse a multipart/form-data body (e.g. Starlette's request.stream())
+    while it arrives and spool each file part to disk, hashing on the way.
+    file_limit(filename) is the size limit of a file part; a part above it
+    is dropped and marked too_large. Raises UploadTooLarge as soon as the
+    body exceeds max_bytes, MalformedForm for an invalid body.
+    """
+    _, options = parse_options_header(content_type or "")
+    boundary = options.get(b"boundary")
+    if not boundary:
+        raise MalformedForm("Missing multipart boundary")
+    form = SpooledForm()
+    spooler = _FormSpooler(form, file_limit, max_files, directory)
+    parser = MultipartParser(boundary, spooler.callbacks())
+    received = 0
+    try:
+        async for chunk in chunks:
+            if not chunk:
+                continue
+            received += len(chunk)
+            if received > max_bytes:
+                raise UploadTooLarge(f"Upload too large (max {max_bytes // (1024 * 1024)}MB)")
+            # Parsing, hashing and disk writes off the event loop
+            await asyncio.to_thread(parser.write, chunk)
+        parser.finalize()
+        if spooler.pending():
+            raise MalformedForm("Incomplete multipart body")
+    except BaseException:
+        spooler.close()
+        form.discard()
+        raise
+    return form
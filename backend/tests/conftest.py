@@ -0,0 +1,10 @@
+"""
+Test setup: modules are imported as core.* from the backend directory
+(like app.py when started from there), shared rules as resources.*
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
@@ -0,0 +1,38 @@
+"""Tests for BlobStore collection of interrupted put_bytes temporary files"""
+
+import os
+import time
+
+from core.blob_store import BlobStore
+
+
+def test_collect_removes_stale_incoming_files(tmp_path):
+    store = BlobStore(str(tmp_path), grace_seconds=60)
+    try:
+        sha256 = store.put_bytes(b"export")
+        store.acquire("session", "export.pdf", sha256)
+
+        stale = tmp_path / "incoming_stale"
+        stale.write_bytes(b"partial")
+        old = time.time() - 120
+        os.utime(stale, (old, old))
+        fresh = tmp_path / "incoming_fresh"
+        fresh.write_bytes(b"in flight")
+
+        assert store.collect() == (0, len(b"partial"))
+        assert not stale.exists()
+        assert fresh.exists()
+        assert os.path.exists(store.path(sha256))
+        assert store.stats()["orphans"] == 1
+    finally:
+        store.close()
+
+
+def test_put_bytes_leaves_no_incoming_files(tmp_path):
+    store = BlobStore(str(tmp_path))
+    try:
+        store.put_bytes(b"a")
+        store.put_bytes(b"a")
+        assert not [name for name in os.listdir(tmp_path) if name.startswith("incoming_")]
+    finally:
+        store.close()
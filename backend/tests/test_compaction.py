@@ -0,0 +1,44 @@
+"""Tests for compact_text: header/footer removal, hyphenation, token budget"""
+
+from core.compaction import compact_text
+
+
+def test_hyphenated_line_break_is_joined():
+    text, _ = compact_text("Erfahrung in Soft-\nware-Entwicklung", token_budget=0)
+    assert text == "Erfahrung in Software-Entwicklung"
+
+
+def test_suspended_hyphen_before_conjunction_is_kept():
+    for source in ("Hard-\nund Software", "Projekt-\nund Teamleitung", "Front-\noder Backend",
+                   "Ein-\nbis Zweijährig", "Vertriebs-\nsowie Marketingleitung", "front-\nand backend"):
+        text, _ = compact_text(source, token_budget=0)
+        assert text == source
+
+
+def test_capitalized_continuation_is_not_joined():
+    text, _ = compact_text("Daten-\nBank", token_budget=0)
+    assert text == "Daten-\nBank"
+
+
+def test_word_starting_like_a_conjunction_is_joined():
+    text, _ = compact_text("Wartungs-\nunderstanding", token_budget=0)
+    assert text == "Wartungsunderstanding"
+
+
+def test_repeated_headers_and_page_numbers_are_removed():
+    bodies = ["Berufserfahrung\nACME GmbH\nEntwickler", "Ausbildung\nTU Berlin\nInformatik", "Kenntnisse\nPython\nSQL"]
+    pages = [f"Max Mustermann - Lebenslauf\n{body}\nSeite {index} von 3" for index, body in enumerate(bodies, 1)]
+    text, stats = compact_text("\f".join(pages), token_budget=0)
+    assert text == "\n\n".join(bodies)
+    assert stats["removed_repeated_lines"] + stats["removed_page_numbers"] == 6
+
+
+def test_budget_truncates_short_documents_only():
+    text = "\n".join(f"Zeile {index} mit etwas Text" for index in range(2000))
+    truncated, stats = compact_text(text, token_budget=500)
+    assert stats["truncated"] and stats["tokens_after"] <= 500
+    assert text.startswith(truncated)
+
+    chunked, stats = compact_text(text, token_budget=500, chunk_threshold=1000)
+    assert chunked == text
+    assert stats["chunked"] and not stats["truncated"]
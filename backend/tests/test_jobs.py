@@ -0,0 +1,71 @@
+"""Tests for JobManager: status mirroring to a shared store and shutdown"""
+
+import asyncio
+import time
+
+from core.jobs import JOB_COMPLETED, JOB_FAILED, JobManager
+from core.session_store import MemorySessionStore
+
+
+class SlowStore(MemorySessionStore):
+    """Session store whose writes block like a busy SQLite file or a slow Redis"""
+
+    def __init__(self, delay: float):
+        super().__init__()
+        self.delay = delay
+        self.writes = 0
+
+    def put(self, session_id, data, ttl_seconds=None):
+        time.sleep(self.delay)
+        self.writes += 1
+        super().put(session_id, data, ttl_seconds)
+
+
+def test_status_writes_do_not_block_the_event_loop():
+    store = SlowStore(delay=0.2)
+
+    async def handler(job):
+        for stage in ("reading_file", "structuring"):
+            job.progress(stage)
+            await asyncio.sleep(0)
+        return {"ok": True}
+
+    async def scenario():
+        manager = JobManager(handler, workers=2, store=lambda: store)
+        await manager.start()
+        started = time.perf_counter()
+        jobs = [manager.submit({"n": index}) for index in range(5)]
+        assert time.perf_counter() - started < 0.1
+        while not all(job.finished for job in jobs):
+            await asyncio.sleep(0.01)
+        await manager.stop()
+        return jobs
+
+    jobs = asyncio.run(scenario())
+    for job in jobs:
+        assert store.get(f"job:{job.id}")["job"]["status"] == JOB_COMPLETED
+    # Intermediate states of the same job are coalesced while a write is in flight
+    assert store.writes < 5 * 4
+
+
+def test_stop_fails_queued_jobs_and_saves_their_status():
+    store = SlowStore(delay=0.05)
+    discarded = []
+
+    async def handler(job):
+        await asyncio.sleep(10)
+
+    async def scenario():
+        manager = JobManager(handler, workers=1, store=lambda: store, discard=discarded.append)
+        await manager.start()
+        jobs = [manager.submit({"n": index}) for index in range(3)]
+        await asyncio.sleep(0.05)
+        await manager.stop()
+        return manager, jobs
+
+    manager, jobs = asyncio.run(scenario())
+    assert [job.status for job in jobs] == [JOB_FAILED] * 3
+    assert discarded == jobs[1:]
+    for job in jobs:
+        assert manager.lookup(job.id)["status"] == JOB_FAILED
+        assert store.get(f"job:{job.id}")["job"]["status"] == JOB_FAILED
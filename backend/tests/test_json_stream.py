@@ -0,0 +1,65 @@
+"""Tests for SectionStreamParser: emitting top-level sections while streaming"""
+
+import json
+
+from core.json_stream import SectionStreamParser
+
+DOCUMENT = {
+    "personal": {"name": "Max Muster", "note": "likes \"quotes\", {braces} and [brackets]"},
+    "experience": [{"company": "ACME", "tasks": ["a", "b"]}],
+    "skills": ["Python", "SQL"],
+    "years": 7,
+    "remote": True,
+}
+
+
+def feed_all(parser, chunks):
+    emitted = []
+    for chunk in chunks:
+        emitted.extend(parser.feed(chunk))
+    return emitted
+
+
+def test_sections_in_one_chunk():
+    parser = SectionStreamParser()
+    emitted = parser.feed(json.dumps(DOCUMENT))
+    assert emitted == list(DOCUMENT.items())
+    assert parser.complete
+    assert parser.sections == DOCUMENT
+
+
+def test_sections_character_by_character():
+    text = json.dumps(DOCUMENT, indent=2)
+    parser = SectionStreamParser()
+    assert feed_all(parser, text) == list(DOCUMENT.items())
+    assert parser.complete
+
+
+def test_section_is_emitted_as_soon_as_it_closes():
+    parser = SectionStreamParser()
+    assert parser.feed('{"personal": {"name": "Max"') == []
+    assert parser.feed('}, "skills": ["Py') == [("personal", {"name": "Max"})]
+    assert parser.feed('thon"]') == [("skills", ["Python"])]
+    assert parser.feed("}") == []
+    assert parser.complete
+
+
+def test_text_before_the_object_is_ignored():
+    parser = SectionStreamParser()
+    emitted = feed_all(parser, ["```json\n", '{"skills": []}', "\n```"])
+    assert emitted == [("skills", [])]
+    assert parser.text.startswith("```json")
+
+
+def test_nothing_is_emitted_after_completion():
+    parser = SectionStreamParser()
+    parser.feed('{"years": 3}')
+    assert parser.feed('{"skills": ["x"]}') == []
+    assert parser.sections == {"years": 3}
+
+
+def test_malformed_section_is_skipped():
+    parser = SectionStreamParser()
+    emitted = parser.feed('{"personal": {"name": Max}, "skills": ["SQL"]}')
+    assert emitted == [("skills", ["SQL"])]
+    assert "personal" not in parser.sections
@@ -0,0 +1,70 @@
+"""Tests for merge_chunk_results: combining per-chunk extraction results"""
+
+from core.long_document import merge_chunk_results
+
+
+def test_personal_first_non_empty_value_wins():
+    merged = merge_chunk_results([
+        {"personal": {"name": "", "email": "max@example.com"}},
+        {"personal": {"name": "Max Muster", "email": "other@example.com"}},
+    ])
+    assert merged["personal"] == {"name": "Max Muster", "email": "max@example.com"}
+
+
+def test_overlapping_entries_are_merged():
+    merged = merge_chunk_results([
+        {"experience": [{"position": "Engineer", "company": "ACME GmbH", "start_date": "2019-01",
+                         "description": "Short"}]},
+        {"experience": [{"position": "engineer", "company": "ACME-GmbH", "start_date": "2019-01",
+                         "end_date": "2021-06", "description": "A much longer description"}]},
+    ])
+    assert merged["experience"] == [{
+        "position": "Engineer",
+        "company": "ACME GmbH",
+        "start_date": "2019-01",
+        "end_date": "2021-06",
+        "description": "A much longer description",
+    }]
+
+
+def test_repeated_role_with_different_dates_is_kept():
+    merged = merge_chunk_results([
+        {"experience": [{"position": "Engineer", "company": "ACME", "start_date": "2015-01"}]},
+        {"experience": [{"position": "Engineer", "company": "ACME", "start_date": "2020-01"}]},
+    ])
+    assert [entry["start_date"] for entry in merged["experience"]] == ["2015-01", "2020-01"]
+
+
+def test_missing_date_matches_existing_entry():
+    merged = merge_chunk_results([
+        {"education": [{"degree": "M.Sc.", "institution": "TU München", "start_date": "2010"}]},
+        {"education": [{"degree": "M.Sc.", "institution": "TU München", "grade": "1,3"}]},
+    ])
+    assert merged["education"] == [
+        {"degree": "M.Sc.", "institution": "TU München", "start_date": "2010", "grade": "1,3"}
+    ]
+
+
+def test_skills_deduplicated_case_insensitive_in_order():
+    merged = merge_chunk_results([{"skills": ["Python", "SQL"]}, {"skills": ["sql", "Docker", "python"]}])
+    assert merged["skills"] == ["Python", "SQL", "Docker"]
+
+
+def test_invalid_and_keyless_entries_are_dropped():
+    merged = merge_chunk_results([
+        {"certifications": ["AWS", {"name": "", "issuer": ""}, {"name": "CKA", "issuer": "CNCF"}]},
+    ])
+    assert merged["certifications"] == [{"name": "CKA", "issuer": "CNCF"}]
+
+
+def test_inputs_are_not_modified():
+    first = {"experience": [{"position": "Dev", "company": "X", "start_date": "2020"}]}
+    second = {"experience": [{"position": "Dev", "company": "X", "start_date": "2020", "end_date": "2022"}]}
+    merge_chunk_results([first, second])
+    assert first["experience"][0] == {"position": "Dev", "company": "X", "start_date": "2020"}
+
+
+def test_unknown_top_level_keys_are_kept_from_first_chunk():
+    merged = merge_chunk_results([{"languages": ["Deutsch"]}, {"languages": ["Englisch"]}])
+    assert merged["languages"] == ["Deutsch"]
+    assert merged["experience"] == []
@@ -0,0 +1,49 @@
+"""Pre-parsed contact data must not end up in the client-facing export"""
+
+import io
+
+import pytest
+from docx import Document
+
+from core.exporters import generate_docx
+from resources.extraction_rules import apply_pre_parsed_fields, heuristic_cv_data, pre_parse_cv
+
+CV_TEXT = """Max Mustermann
+Musterstraße 1, 12345 Berlin
+max@example.com | +49 170 1234567
+linkedin.com/in/maxmustermann
+
+Berufserfahrung
+01/2020 - Heute Softwareentwickler bei ACME GmbH
+Entwicklung von Backend-Diensten
+"""
+
+CONTACT_DATA = ["max@example.com", "1234567", "Musterstraße", "linkedin.com/in/maxmustermann"]
+
+
+def docx_text(data):
+    document = Document(io.BytesIO(generate_docx(data)))
+    return "\n".join(paragraph.text for paragraph in document.paragraphs)
+
+
+def test_pre_parser_finds_contact_data_but_keeps_it_out_of_the_prompt():
+    parsed = pre_parse_cv(CV_TEXT)
+    assert parsed["personal"]["email"] == "max@example.com"
+    assert "max@example.com" not in parsed["remainder"]
+
+
+def test_only_name_and_city_are_filled_in():
+    model_result = {"personal": {"name": "", "summary": "Backend-Entwickler"}, "experience": []}
+    data = apply_pre_parsed_fields(model_result, pre_parse_cv(CV_TEXT))
+    assert data["personal"] == {"name": "Max Mustermann", "city": "Berlin", "summary": "Backend-Entwickler"}
+
+
+@pytest.mark.parametrize("build", [
+    lambda parsed: apply_pre_parsed_fields({"personal": {}, "experience": []}, parsed),
+    heuristic_cv_data,
+], ids=["single", "fast"])
+def test_export_has_no_contact_data(build):
+    text = docx_text(build(pre_parse_cv(CV_TEXT)))
+    assert "Max Mustermann" in text
+    for value in CONTACT_DATA:
+        assert value not in text
@@ -0,0 +1,218 @@
+"""
+Circuit breaker, deadline and rate limiter working together on the
+production path: CVExtractor._create_completion over an endpoint pool,
+against benchmarks.mock_openai_server
+"""
+
+import asyncio
+
+import openai
+import pytest
+
+from benchmarks.mock_openai_server import MockOpenAIServer
+from core.endpoints import build_endpoint_pool, get_endpoint_pool, reset_endpoint_pools
+from core.extractor import CVExtractor
+from core.openai_pool import close_client_pool
+from core.rate_limiter import RateLimiter, rate_limit_scope
+from core.resilience import CircuitOpenError, ResilientCaller
+
+MESSAGES = [{"role": "user", "content": "Lebenslauf"}]
+
+
+class CountingRateLimiter(RateLimiter):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.acquired = 0
+
+    async def acquire(self, scope, tokens=0):
+        self.acquired += 1
+        return await super().acquire(scope, tokens)
+
+
+@pytest.fixture(autouse=True)
+def no_shared_rate_limiter(monkeypatch):
+    # CVExtractor(rate_limiter=None) would open the process-wide limiter database
+    monkeypatch.setenv("OPENAI_RATE_LIMIT_ENABLED", "false")
+
+
+def make_extractor(server, rate_limiter=None, failure_threshold=2, reset_timeout=30.0, **resilience):
+    pool = build_endpoint_pool([{"name": "mock", "api_key": "test-key", "base_url": server.base_url}],
+                               failure_threshold=failure_threshold, reset_timeout=reset_timeout)
+    extractor = CVExtractor(endpoints=pool, resilience=ResilientCaller(**resilience), rate_limiter=rate_limiter,
+                            mode="single")
+    return extractor, pool.endpoints[0]
+
+
+def complete(extractor, **options):
+    return extractor._create_completion("structuring", model="gpt-4", messages=MESSAGES, max_tokens=50, **options)
+
+
+def run(coroutine_function):
+    async def main():
+        try:
+            await coroutine_function()
+        finally:
+            await close_client_pool()
+    asyncio.run(main())
+
+
+def test_deadline_timeouts_open_the_breaker():
+    async def scenario():
+        with MockOpenAIServer(latency=1.0) as server:
+            extractor, endpoint = make_extractor(server, max_retries=0, deadline=0.2)
+            for _ in range(2):
+                with pytest.raises(asyncio.TimeoutError):
+                    await complete(extractor)
+            assert endpoint.breaker.state == "open"
+            sent = server.request_count
+            with pytest.raises(CircuitOpenError):
+                await complete(extractor)
+            assert server.request_count == sent
+            assert endpoint.outstanding == 0
+
+    run(scenario)
+
+
+def test_timed_out_probe_reopens_the_breaker():
+    async def scenario():
+        with MockOpenAIServer(latency=1.0) as server:
+            extractor, endpoint = make_extractor(server, reset_timeout=0.3, max_retries=0, deadline=0.2)
+            for _ in range(2):
+                with pytest.raises(asyncio.TimeoutError):
+                    await complete(extractor)
+            await asyncio.sleep(0.35)
+            # Half-open probe runs into the deadline as well
+            with pytest.raises(asyncio.TimeoutError):
+                await complete(extractor)
+            assert endpoint.breaker.state == "open"
+
+            server.latency = 0.01
+            await asyncio.sleep(0.35)
+            response = await complete(extractor)
+            assert response.choices[0].message.content
+            assert endpoint.breaker.state == "closed"
+            assert endpoint.outstanding == 0
+
+    run(scenario)
+
+
+def test_cancelled_calls_do_not_open_the_breaker():
+    async def scenario():
+        with MockOpenAIServer(latency=1.0) as server:
+            extractor, endpoint = make_extractor(server, max_retries=0, deadline=5.0)
+            for _ in range(3):
+                # Client disconnects while the request is in flight
+                task = asyncio.ensure_future(complete(extractor))
+                await asyncio.sleep(0.1)
+                task.cancel()
+                with pytest.raises(asyncio.CancelledError):
+                    await task
+            assert endpoint.breaker.state == "closed"
+            assert endpoint.breaker.failures == 0
+            assert endpoint.outstanding == 0
+
+    run(scenario)
+
+
+def test_losing_hedges_do_not_open_the_breaker():
+    async def scenario():
+        with MockOpenAIServer(latency=0.2) as server:
+            extractor, endpoint = make_extractor(server, max_retries=0, deadline=5.0, hedge=True, hedge_delay=0.05)
+            for _ in range(4):
+                await complete(extractor)
+            assert extractor.resilience.stats()["hedged"] == 4
+            assert endpoint.breaker.state == "closed"
+            assert endpoint.breaker.failures == 0
+            assert endpoint.outstanding == 0
+
+    run(scenario)
+
+
+def test_quota_wait_does_not_count_against_the_deadline(tmp_path):
+    async def scenario():
+        with MockOpenAIServer(latency=0.01) as server:
+            limiter = RateLimiter(str(tmp_path / "limits.db"), requests_per_minute=120,
+                                  tokens_per_minute=1e7, max_wait=30)
+            scope = rate_limit_scope("test-key", "gpt-4")
+            while limiter.try_acquire(scope) == 0.0:
+                pass
+            extractor, endpoint = make_extractor(server, rate_limiter=limiter, max_retries=0, deadline=0.3)
+            await asyncio.gather(complete(extractor), complete(extractor))
+            assert extractor.metrics["rate_limit_wait"] > 0.3
+            assert endpoint.breaker.state == "closed"
+            assert endpoint.breaker.failures == 0
+
+    run(scenario)
+
+
+def test_quota_is_acquired_for_every_retry(tmp_path):
+    async def scenario():
+        with MockOpenAIServer(latency=0.01, error_rate=1.0, error_status=503) as server:
+            limiter = CountingRateLimiter(str(tmp_path / "limits.db"), requests_per_minute=600,
+                                          tokens_per_minute=1e7)
+            extractor, endpoint = make_extractor(server, rate_limiter=limiter, failure_threshold=10,
+                                                 max_retries=2, backoff_base=0.01, backoff_max=0.02)
+            with pytest.raises(openai.APIStatusError):
+                await complete(extractor)
+            assert server.request_count == 3
+            assert limiter.acquired == 3
+            assert endpoint.breaker.failures == 3
+            assert endpoint.outstanding == 0
+
+    run(scenario)
+
+
+def test_quota_is_acquired_for_every_hedge(tmp_path):
+    async def scenario():
+        with MockOpenAIServer(latency=0.2) as server:
+            limiter = CountingRateLimiter(str(tmp_path / "limits.db"), requests_per_minute=600,
+                                          tokens_per_minute=1e7)
+            extractor, endpoint = make_extractor(server, rate_limiter=limiter, max_retries=0, deadline=5.0,
+                                                 hedge=True, hedge_delay=0.05)
+            for _ in range(3):
+                await complete(extractor)
+            assert server.request_count == 6
+            assert limiter.acquired == 6
+            assert endpoint.outstanding == 0
+
+    run(scenario)
+
+
+def test_stream_holds_the_endpoint_until_consumed():
+    async def scenario():
+        with MockOpenAIServer(latency=0.01, token_latency=0.001) as server:
+            extractor, endpoint = make_extractor(server, max_retries=0, deadline=5.0)
+            stream = await complete(extractor, stream=True)
+            assert endpoint.outstanding == 1
+            chunks = [chunk async for chunk in stream]
+            assert chunks
+            assert endpoint.outstanding == 0
+
+            stream = await complete(extractor, stream=True)
+            await stream.__anext__()
+            await stream.aclose()
+            assert endpoint.outstanding == 0
+
+    run(scenario)
+
+
+def test_circuit_settings_apply_to_endpoint_breakers(monkeypatch):
+    monkeypatch.delenv("OPENAI_ENDPOINTS", raising=False)
+    monkeypatch.delenv("OPENAI_ENDPOINTS_FILE", raising=False)
+    monkeypatch.delenv("OPENAI_ENDPOINT_FAILURES", raising=False)
+    monkeypatch.delenv("OPENAI_ENDPOINT_RESET", raising=False)
+    monkeypatch.setenv("OPENAI_CIRCUIT_FAILURES", "7")
+    monkeypatch.setenv("OPENAI_CIRCUIT_RESET", "12")
+    reset_endpoint_pools()
+    try:
+        pool = get_endpoint_pool("test-key")
+        breaker = pool.endpoints[0].breaker
+        assert (breaker.failure_threshold, breaker.reset_timeout) == (7, 12.0)
+
+        for _ in range(7):
+            breaker.record_failure()
+        stats = pool.breaker_stats()
+        assert stats["state"] == "open"
+        assert stats["endpoints"]["default"]["consecutive_failures"] == 7
+    finally:
+        reset_endpoint_pools()
@@ -0,0 +1,177 @@
+"""Tests for the session store backends (memory, SQLite, Redis protocol)"""
+
+import asyncio
+import time
+
+import pytest
+
+from benchmarks.mock_redis_server import MockRedisServer
+from core.session_store import (
+    MemorySessionStore, RedisError, RedisSessionStore, SessionReaper, SessionStore, SQLiteSessionStore,
+    close_session_store, create_session_store, get_job_store, get_session_store,
+)
+
+
+@pytest.fixture(scope="module")
+def redis_server():
+    with MockRedisServer() as server:
+        yield server
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def make_store(request, tmp_path, redis_server):
+    stores = []
+
+    def make(**options):
+        if request.param == "memory":
+            store = MemorySessionStore(**options)
+        elif request.param == "sqlite":
+            store = SQLiteSessionStore(str(tmp_path / f"sessions{len(stores)}.db"), **options)
+        else:
+            store = RedisSessionStore(redis_server.url, prefix=f"test:{request.node.name}:{len(stores)}:",
+                                      **options)
+        stores.append(store)
+        return store
+
+    yield make
+    for store in stores:
+        store.close()
+
+
+def test_base_class_is_abstract():
+    with pytest.raises(TypeError):
+        SessionStore()
+
+
+def test_put_get_returns_copy(make_store):
+    store = make_store()
+    store.put("a", {"company": "ACME", "data": {"skills": ["Python"]}})
+    session = store.get("a")
+    assert session == {"company": "ACME", "data": {"skills": ["Python"]}}
+    session["data"]["skills"].append("SQL")
+    assert store.get("a")["data"]["skills"] == ["Python"]
+    assert store.get("missing") is None
+
+
+def test_patch_updates_top_level_fields(make_store):
+    store = make_store()
+    store.put("a", {"company": "ACME", "template": "default"})
+    assert store.patch("a", {"template": "modern"}) == {"company": "ACME", "template": "modern"}
+    assert store.get("a") == {"company": "ACME", "template": "modern"}
+    assert store.patch("missing", {"template": "modern"}) is None
+
+
+def test_delete_returns_data(make_store):
+    store = make_store()
+    store.put("a", {"temp_file": "upload.pdf"})
+    assert store.delete("a") == {"temp_file": "upload.pdf"}
+    assert store.delete("a") is None
+    assert store.get("a") is None
+    assert store.count() == 0
+
+
+def test_expired_session_is_invisible_until_purged(make_store):
+    store = make_store()
+    store.put("old", {"n": 1}, ttl_seconds=-1)
+    store.put("live", {"n": 2})
+    assert store.get("old") is None
+    assert store.patch("old", {"n": 3}) is None
+    assert store.count() == 2
+    assert store.purge_expired() == [{"n": 1}]
+    assert store.count() == 1
+    assert store.get("live") == {"n": 2}
+
+
+def test_purge_oldest_first_with_limit(make_store):
+    store = make_store()
+    for index in range(5):
+        store.put(f"s{index}", {"n": index}, ttl_seconds=-10 + index)
+    assert store.purge_expired(limit=2) == [{"n": 0}, {"n": 1}]
+    assert store.purge_expired() == [{"n": 2}, {"n": 3}, {"n": 4}]
+    assert store.purge_expired() == []
+
+
+def test_sliding_ttl_extends_on_access(make_store):
+    store = make_store(ttl_seconds=1, touch_interval=0)
+    store.put("a", {"n": 1})
+    for _ in range(3):
+        time.sleep(0.4)
+        assert store.get("a") == {"n": 1}
+    assert store.purge_expired() == []
+
+
+def test_fixed_ttl_is_not_extended(make_store):
+    store = make_store(ttl_seconds=1, sliding=False)
+    store.put("a", {"n": 1})
+    time.sleep(0.6)
+    assert store.get("a") == {"n": 1}
+    time.sleep(0.6)
+    assert store.get("a") is None
+
+
+def test_sqlite_survives_reopen(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    store = SQLiteSessionStore(path)
+    store.put("a", {"company": "ACME"})
+    store.close()
+    reopened = SQLiteSessionStore(path)
+    assert reopened.get("a") == {"company": "ACME"}
+    reopened.close()
+
+
+def test_redis_connection_dropped_after_any_error(redis_server):
+    store = RedisSessionStore(redis_server.url, prefix="test:errors:", max_connections=2)
+    store.put("a", {"n": 1})
+    used = []
+
+    def fail(connection):
+        used.append(connection)
+        connection.send(("GET", store._key("a")))
+        raise ValueError("boom")
+
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            store._call(fail)
+    # Connections with an unread reply are closed, never pooled, and free their slot
+    assert not any(connection in store._idle for connection in used)
+    assert all(connection._socket.fileno() == -1 for connection in used)
+    assert store.get("a") == {"n": 1}
+    store.close()
+
+
+def test_redis_error_reply_raises(redis_server):
+    store = RedisSessionStore(redis_server.url, prefix="test:reply:")
+    with pytest.raises(RedisError):
+        store._call(lambda connection: connection.execute(("NOSUCHCOMMAND",)))
+    assert store.count() == 0
+    store.close()
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite", "redis"])
+def test_job_records_live_in_their_own_namespace(backend, tmp_path, redis_server, monkeypatch):
+    monkeypatch.setenv("SESSION_STORE", backend)
+    monkeypatch.setenv("SESSION_STORE_PATH", str(tmp_path / "sessions.db"))
+    monkeypatch.setenv("SESSION_REDIS_URL", redis_server.url)
+    monkeypatch.setenv("SESSION_REDIS_PREFIX", f"test:namespace:{backend}:")
+    close_session_store()
+    try:
+        sessions, jobs = get_session_store(), get_job_store()
+        assert sessions is not jobs
+        sessions.put("a", {"company": "ACME"})
+        jobs.put("job:1", {"job": {"status": "completed"}}, ttl_seconds=-1)
+        assert sessions.count() == 1
+        assert sessions.get("job:1") is None
+
+        reaper = SessionReaper(lambda record: 0, namespace="job")
+        assert asyncio.run(reaper.run_once()) == 1
+        assert jobs.count() == 0
+        assert sessions.count() == 1
+    finally:
+        close_session_store()
+
+
+def test_sqlite_job_namespace_uses_its_own_file(tmp_path, monkeypatch):
+    monkeypatch.setenv("SESSION_STORE_PATH", str(tmp_path / "sessions.db"))
+    store = create_session_store("sqlite", namespace="job")
+    assert store.db_path == str(tmp_path / "sessions_job.db")
+    store.close()
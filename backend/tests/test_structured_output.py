@@ -0,0 +1,55 @@
+"""Tests for repair_json: recovering one JSON object from model output"""
+
+import json
+
+import pytest
+
+from core.structured_output import repair_json
+
+
+def test_valid_json_is_not_repaired():
+    value, info = repair_json('{"personal": {"name": "Max"}, "skills": ["Python"]}')
+    assert value == {"personal": {"name": "Max"}, "skills": ["Python"]}
+    assert info == {"repaired": False, "truncated": False, "partial_section": None}
+
+
+def test_code_fence_and_prose_are_stripped():
+    text = 'Here is the result:\n```json\n{"skills": ["Python", "SQL"]}\n```\nLet me know!'
+    value, info = repair_json(text)
+    assert value == {"skills": ["Python", "SQL"]}
+    assert info["repaired"] and not info["truncated"]
+
+
+def test_trailing_commas_are_dropped():
+    value, _ = repair_json('{"skills": ["Python", "SQL",], "experience": [],}')
+    assert value == {"skills": ["Python", "SQL"], "experience": []}
+
+
+def test_stray_closer_is_ignored():
+    value, _ = repair_json('{"skills": ["Python"]], "education": []}')
+    assert value == {"skills": ["Python"], "education": []}
+
+
+def test_braces_inside_strings_are_kept():
+    value, _ = repair_json('```{"summary": "uses {curly} and [square] brackets, too",}```')
+    assert value == {"summary": "uses {curly} and [square] brackets, too"}
+
+
+def test_truncated_output_is_cut_to_last_complete_value():
+    text = '{"personal": {"name": "Max"}, "experience": [{"company": "ACME"}, {"company": "Glob'
+    value, info = repair_json(text)
+    assert value == {"personal": {"name": "Max"}, "experience": [{"company": "ACME"}]}
+    assert info["truncated"]
+    assert info["partial_section"] == "experience"
+
+
+def test_truncation_between_sections_has_no_partial_section():
+    value, info = repair_json('{"skills": ["Python"], "educ')
+    assert value == {"skills": ["Python"]}
+    assert info["truncated"]
+    assert info["partial_section"] is None
+
+
+def test_no_object_raises():
+    with pytest.raises(json.JSONDecodeError):
+        repair_json("Sorry, I cannot help with that.")
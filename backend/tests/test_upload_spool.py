@@ -0,0 +1,91 @@
+"""Tests for spool_form: multipart bodies spooled to disk while they arrive"""
+
+import asyncio
+import hashlib
+import os
+
+import pytest
+
+from core.upload_spool import MalformedForm, UploadTooLarge, spool_form
+
+BOUNDARY = "----cv2profile"
+CONTENT_TYPE = f"multipart/form-data; boundary={BOUNDARY}"
+
+
+def multipart(*parts) -> bytes:
+    body = b""
+    for name, value, filename in parts:
+        disposition = f'form-data; name="{name}"' + (f'; filename="{filename}"' if filename else "")
+        headers = f"--{BOUNDARY}\r\nContent-Disposition: {disposition}\r\n"
+        if filename:
+            headers += "Content-Type: application/pdf\r\n"
+        body += (headers + "\r\n").encode() + value + b"\r\n"
+    return body + f"--{BOUNDARY}--\r\n".encode()
+
+
+class Body:
+    """Request body delivered in small chunks, counting what was consumed"""
+
+    def __init__(self, data: bytes, chunk_size: int = 64):
+        self.data = data
+        self.chunk_size = chunk_size
+        self.consumed = 0
+
+    async def __aiter__(self):
+        for offset in range(0, len(self.data), self.chunk_size):
+            chunk = self.data[offset:offset + self.chunk_size]
+            self.consumed += len(chunk)
+            yield chunk
+
+
+def test_fields_and_files_are_spooled(tmp_path):
+    content = os.urandom(1000)
+    body = Body(multipart(("company", b"ACME", None), ("file", content, "cv.pdf")))
+    form = asyncio.run(spool_form(body, CONTENT_TYPE, 10_000, lambda filename: 5_000, directory=str(tmp_path)))
+    try:
+        assert form.fields == {"company": "ACME"}
+        [part] = form.files
+        assert (part.field, part.filename, part.content_type, part.too_large) == ("file", "cv.pdf",
+                                                                                  "application/pdf", False)
+        assert part.upload.size == 1000
+        assert part.upload.sha256 == hashlib.sha256(content).hexdigest()
+        with open(part.upload.path, "rb") as handle:
+            assert handle.read() == content
+    finally:
+        form.discard()
+    assert os.listdir(tmp_path) == []
+
+
+def test_oversized_file_part_is_dropped_while_it_arrives(tmp_path):
+    body = Body(multipart(("files", b"x" * 5_000, "big.pdf"), ("files", b"small", "small.pdf")))
+    form = asyncio.run(spool_form(body, CONTENT_TYPE, 10_000, lambda filename: 1_000, max_files=5,
+                                  directory=str(tmp_path)))
+    big, small = form.files
+    assert big.too_large and big.upload is None
+    assert small.upload.size == 5
+    form.discard()
+    assert os.listdir(tmp_path) == []
+
+
+def test_body_over_limit_stops_reading(tmp_path):
+    body = Body(multipart(("file", b"x" * 100_000, "cv.pdf")))
+    with pytest.raises(UploadTooLarge):
+        asyncio.run(spool_form(body, CONTENT_TYPE, 10_000, lambda filename: 10_000, directory=str(tmp_path)))
+    assert body.consumed <= 10_000 + body.chunk_size
+    assert os.listdir(tmp_path) == []
+
+
+def test_truncated_body_is_rejected(tmp_path):
+    data = multipart(("file", b"x" * 500, "cv.pdf"))
+    with pytest.raises(MalformedForm):
+        asyncio.run(spool_form(Body(data[:300]), CONTENT_TYPE, 10_000, lambda filename: 10_000,
+                               directory=str(tmp_path)))
+    assert os.listdir(tmp_path) == []
+
+
+def test_too_many_files_are_rejected(tmp_path):
+    body = Body(multipart(*[("files", b"a", f"{index}.pdf") for index in range(3)]))
+    with pytest.raises(MalformedForm):
+        asyncio.run(spool_form(body, CONTENT_TYPE, 10_000, lambda filename: 100, max_files=2,
+                               directory=str(tmp_path)))
+    assert os.listdir(tmp_path) == []
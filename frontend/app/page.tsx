@@ -5,6 +5,25 @@ import { useDropzone } from 'react-dropzone'
 import { Upload, FileText, CheckCircle, AlertCircle } from 'lucide-react'
 import { useRouter } from 'next/navigation'
 
+async function waitForJob(jobId: string) {
+  while (true) {
+    const response = await fetch(`http://localhost:8000/api/jobs/${jobId}`)
+    if (!response.ok) {
+      throw new Error('Job status unavailable')
+    }
+
+    const job = await response.json()
+    if (job.status === 'completed') {
+      return job.result
+    }
+    if (job.status === 'failed') {
+      throw new Error(job.error || 'Extraction failed')
+    }
+
+    await new Promise(resolve => setTimeout(resolve, 1000))
+  }
+}
+
 export default function HomePage() {
   const [company, setCompany] = useState<'galdora' | 'bejob'>('galdora')
   const [isUploading, setIsUploading] = useState(false)
@@ -33,7 +52,9 @@ export default function HomePage() {
         throw new Error(errorData.detail || 'Upload failed')
       }
 
-      const result = await response.json()
+      // Upload returns 202 with a job id; poll until extraction is done
+      const { job_id } = await response.json()
+      const result = await waitForJob(job_id)
       
       // Store session data in localStorage
       localStorage.setItem('cvSession', JSON.stringify({
@@ -3,6 +3,9 @@ Extraction Rules for CV2Profile
 Zentrale Verwaltung aller Parsing- und Extraktionslogiken
 """
 
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
 # OpenAI Extraction Prompt Template
 EXTRACTION_SYSTEM_PROMPT = """
 Du bist ein Experte für das Extrahieren und Strukturieren von Lebenslauf-Daten. 
@@ -54,6 +57,174 @@ Extrahiere Daten im Format MM/YYYY.
 Extrahiere die Stadt separat aus der Adresse ins 'city' Feld.
 """
 
+# Schema-split extraction: one focused prompt per top-level section
+# (same structure as EXTRACTION_USER_PROMPT, requested in parallel)
+EXTRACTION_SECTIONS = ["personal", "experience", "education", "skills", "certifications"]
+
+SECTION_SCHEMAS = {
+    "personal": """
+    "personal": {
+        "name": "Vollständiger Name",
+        "city": "Stadt",
+        "summary": "Professionelle Zusammenfassung oder Zielsetzung"
+    }""",
+    "experience": """
+    "experience": [
+        {
+            "position": "Jobtitel",
+            "company": "Firmenname",
+            "start_date": "MM/YYYY",
+            "end_date": "MM/YYYY oder Heute",
+            "description": "Jobbeschreibung und Erfolge"
+        }
+    ]""",
+    "education": """
+    "education": [
+        {
+            "degree": "Abschlussname",
+            "institution": "Universität/Schule",
+            "start_date": "MM/YYYY",
+            "end_date": "MM/YYYY",
+            "description": "Zusätzliche Details"
+        }
+    ]""",
+    "skills": """
+    "skills": [
+        "Fähigkeit 1", "Fähigkeit 2", "Fähigkeit 3"
+    ]""",
+    "certifications": """
+    "certifications": [
+        {
+            "name": "Zertifikatsname",
+            "issuer": "Ausstellende Organisation",
+            "date": "MM/YYYY"
+        }
+    ]""",
+}
+
+SECTION_INSTRUCTIONS = {
+    "personal": "Extrahiere die Stadt separat aus der Adresse ins 'city' Feld.",
+    "experience": "Erfasse alle Positionen. Extrahiere Daten im Format MM/YYYY.",
+    "education": "Erfasse alle Ausbildungsstationen. Extrahiere Daten im Format MM/YYYY.",
+    "skills": "Liste jede Fähigkeit einzeln auf.",
+    "certifications": "Extrahiere Daten im Format MM/YYYY.",
+}
+
+SECTION_PROMPT_TEMPLATE = """
+Extrahiere aus dem folgenden Lebenslauf-Text NUR den Abschnitt "{section}".
+Gib NUR valides JSON mit dieser exakten Struktur zurück:
+
+{{{schema}
+}}
+
+Wenn nichts gefunden wird, verwende null oder ein leeres Array/String.
+{instructions}
+"""
+
+def build_section_prompt(section: str) -> str:
+    """
+    Fokussierter Extraktions-Prompt für einen einzelnen Abschnitt
+    """
+    return SECTION_PROMPT_TEMPLATE.format(
+        section=section,
+        schema=SECTION_SCHEMAS[section],
+        instructions=SECTION_INSTRUCTIONS.get(section, "")
+    )
+
+# Long documents (map-reduce): hint added to the prompt for every chunk
+CHUNK_PROMPT_NOTE = """
+Der folgende Text ist Teil {index} von {total} eines längeren Lebenslaufs.
+Extrahiere nur, was in diesem Teil steht; fehlende Abschnitte bleiben leer.
+"""
+
+# Compact wire format for the structuring response: short keys, entries as
+# positional arrays (fewer generated tokens); decode_compact_output expands it
+# into the regular personal/experience/... structure
+COMPACT_SECTION_KEYS = {
+    "personal": "p",
+    "experience": "x",
+    "education": "e",
+    "skills": "k",
+    "certifications": "z",
+}
+COMPACT_PERSONAL_KEYS = {"name": "n", "city": "c", "summary": "s"}
+COMPACT_ENTRY_FIELDS = {
+    "experience": ["position", "company", "start_date", "end_date", "description"],
+    "education": ["degree", "institution", "start_date", "end_date", "description"],
+    "certifications": ["name", "issuer", "date"],
+}
+_COMPACT_SECTIONS = {short: section for section, short in COMPACT_SECTION_KEYS.items()}
+_COMPACT_PERSONAL_FIELDS = {short: field for field, short in COMPACT_PERSONAL_KEYS.items()}
+
+COMPACT_EXTRACTION_USER_PROMPT = """
+Extrahiere und strukturiere den folgenden Lebenslauf-Text in ein kompaktes JSON-Format.
+Gib NUR valides, minifiziertes JSON (ohne Einrückung) mit dieser exakten Struktur zurück:
+
+{"p":{"n":"Vollständiger Name","c":"Stadt","s":"Professionelle Zusammenfassung oder Zielsetzung"},"x":[["Jobtitel","Firmenname","MM/YYYY","MM/YYYY oder Heute","Jobbeschreibung und Erfolge"]],"e":[["Abschlussname","Universität/Schule","MM/YYYY","MM/YYYY","Zusätzliche Details"]],"k":["Fähigkeit 1","Fähigkeit 2"],"z":[["Zertifikatsname","Ausstellende Organisation","MM/YYYY"]]}
+
+p = persönliche Daten (n = Name, c = Stadt, s = Zusammenfassung), x = Berufserfahrung,
+e = Ausbildung, k = Fähigkeiten, z = Zertifikate.
+Jede Station in x, e und z ist ein Array mit den Werten in genau dieser Reihenfolge.
+Wenn ein Feld nicht gefunden wird, verwende "" oder ein leeres Array.
+Extrahiere Daten im Format MM/YYYY.
+Extrahiere die Stadt separat aus der Adresse ins 'c' Feld.
+"""
+
+def encode_compact_output(structured_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Wandelt Lebenslauf-Daten ins kompakte Format um (Gegenstück zu
+    decode_compact_output, z.B. für Tests und Benchmarks)
+    """
+    compact: Dict[str, Any] = {}
+    for section, key in COMPACT_SECTION_KEYS.items():
+        value = structured_data.get(section)
+        if section == "personal" and isinstance(value, dict):
+            value = {short: value.get(field, "") for field, short in COMPACT_PERSONAL_KEYS.items()}
+        elif section in COMPACT_ENTRY_FIELDS and isinstance(value, list):
+            value = [[entry.get(field, "") for field in COMPACT_ENTRY_FIELDS[section]] for entry in value]
+        compact[key] = value
+    return compact
+
+def decode_compact_section(key: str, value: Any) -> Tuple[str, Any]:
+    """
+    Ein Abschnitt der kompakten Antwort -> (Abschnittsname, Wert im
+    normalen Format). Unbekannte oder bereits ausgeschriebene Schlüssel
+    bleiben unverändert
+    """
+    section = _COMPACT_SECTIONS.get(key, key)
+    if section == "personal" and isinstance(value, dict):
+        value = {_COMPACT_PERSONAL_FIELDS.get(field, field): field_value for field, field_value in value.items()}
+    elif section in COMPACT_ENTRY_FIELDS and isinstance(value, list):
+        fields = COMPACT_ENTRY_FIELDS[section]
+        value = [
+            {field: (entry[index] if index < len(entry) else "") for index, field in enumerate(fields)}
+            if isinstance(entry, list) else entry
+            for entry in value
+        ]
+    return section, value
+
+def decode_compact_output(compact: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Kompakte Modellantwort -> personal/experience/education/skills/certifications
+    """
+    return dict(decode_compact_section(key, value) for key, value in compact.items())
+
+# Typical CV section headings (German and English), used to split long
+# documents on section boundaries and for rule-based pre-parsing
+SECTION_HEADINGS = {
+    "personal": ["Persönliche Daten", "Persönliches", "Kontakt", "Profil", "Über mich",
+                 "Personal Information", "Personal Details", "Contact", "Profile", "Summary"],
+    "experience": ["Berufserfahrung", "Berufliche Erfahrung", "Beruflicher Werdegang", "Werdegang",
+                   "Praktische Erfahrung", "Projekte", "Projekterfahrung",
+                   "Work Experience", "Professional Experience", "Experience", "Employment", "Projects"],
+    "education": ["Ausbildung", "Bildung", "Bildungsweg", "Schulbildung", "Studium", "Akademischer Werdegang",
+                  "Education", "Academic Background"],
+    "skills": ["Kenntnisse", "Fähigkeiten", "Kompetenzen", "IT-Kenntnisse", "Sprachkenntnisse", "Sprachen",
+               "Skills", "Technical Skills", "Languages"],
+    "certifications": ["Zertifikate", "Zertifizierungen", "Weiterbildung", "Weiterbildungen", "Fortbildungen",
+                       "Certifications", "Certificates", "Training"],
+}
+
 # Field Validation Rules
 REQUIRED_FIELDS = {
     "personal": ["name"],
@@ -116,6 +287,14 @@ EXPORT_DISPLAY_RULES = {
     }
 }
 
+# Persönliche Felder, die der Vor-Parser übernehmen darf: Teil des Extraktions-Schemas
+# und im Export sichtbar (Kontaktdaten landen nicht im Profil)
+PRE_PARSE_PERSONAL_FIELDS = [
+    field for field in ("name", "city")
+    if field in EXPORT_DISPLAY_RULES["show_fields"]["personal"]
+    and field not in EXPORT_DISPLAY_RULES["hide_fields"]["personal"]
+]
+
 def anonymize_name(full_name: str) -> str:
     """
     Anonymisiert einen Namen: 'Max Mustermann' -> 'Max M.'
@@ -149,3 +328,316 @@ def extract_city_from_address(address: str) -> str:
     
     return address.strip()
 
+# Rule-based pre-parsing: contact data, date ranges and section headings are
+# found locally with compiled patterns; the LLM only gets the remaining text.
+# Bump PRE_PARSER_VERSION when the rules change (part of the cache key)
+PRE_PARSER_VERSION = "1"
+
+EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)*\.[A-Za-z]{2,}")
+LINKEDIN_PATTERN = re.compile(r"(?:https?://)?(?:[\w-]+\.)?linkedin\.com/in/[\w%-]+/?", re.IGNORECASE)
+PHONE_PATTERN = re.compile(r"(?<![\w/.])(?:\+|0)\d[\d ()/.-]{5,}\d(?![\w/])")
+POSTCODE_CITY_PATTERN = re.compile(r"\b\d{5}\s+[A-ZÄÖÜ][\wäöüß.-]+")
+CONTACT_LABEL_PATTERN = re.compile(
+    r"\b(?:e-?mail|mail|tel(?:efon)?|phone|mobil(?:e)?|handy|fon|linkedin|kontakt|contact)\b\.?:?",
+    re.IGNORECASE,
+)
+_CONTACT_SEPARATORS = re.compile(r"[\s|•·,;:/()-]+")
+
+MONTHS = {
+    "januar": 1, "january": 1, "jan": 1, "februar": 2, "february": 2, "feb": 2,
+    "märz": 3, "maerz": 3, "march": 3, "mär": 3, "mar": 3, "april": 4, "apr": 4,
+    "mai": 5, "may": 5, "juni": 6, "june": 6, "jun": 6, "juli": 7, "july": 7, "jul": 7,
+    "august": 8, "aug": 8, "september": 9, "sept": 9, "sep": 9,
+    "oktober": 10, "october": 10, "okt": 10, "oct": 10, "november": 11, "nov": 11,
+    "dezember": 12, "december": 12, "dez": 12, "dec": 12,
+}
+_MONTH_NAMES = "|".join(sorted(MONTHS, key=len, reverse=True))
+_DATE = (rf"(?:(?:0?[1-9]|1[0-2])[./]\s?(?:19|20)\d{{2}}"
+         rf"|(?:{_MONTH_NAMES})\.?\s+(?:19|20)\d{{2}}"
+         rf"|(?:19|20)\d{{2}})")
+_CURRENT = "|".join(["bis heute", "heute", "jetzt", "present", "now", "aktuell", "current", "today"])
+DATE_RANGE_PATTERN = re.compile(
+    rf"(?:(?:seit|since|ab)\s+(?P<since>{_DATE})"
+    rf"|(?:von\s+|from\s+)?(?P<start>{_DATE})\s*(?:-|–|—|bis|to|until)\s*(?P<end>{_DATE}|{_CURRENT}))",
+    re.IGNORECASE,
+)
+
+# Single-line headings: known section names, optionally numbered or followed by ':'
+_HEADING_SECTIONS = {heading.lower(): section
+                     for section, headings in SECTION_HEADINGS.items() for heading in headings}
+SECTION_HEADING_PATTERN = re.compile(
+    r"^\s*(?:\d+[.)]\s*)?(?P<heading>"
+    + "|".join(re.escape(heading) for heading in sorted(_HEADING_SECTIONS, key=len, reverse=True))
+    + r")\s*:?\s*$",
+    re.IGNORECASE,
+)
+
+# First lines that are document titles, not the candidate's name
+DOCUMENT_TITLES = ["lebenslauf", "curriculum vitae", "resume", "résumé", "cv", "bewerbung", "tabellarischer lebenslauf"]
+
+def match_section_heading(line: str) -> Optional[str]:
+    """
+    Abschnitt einer Überschriftenzeile ('experience', ...), 'other' für
+    unbekannte Überschriften in Großbuchstaben, sonst None
+    """
+    stripped = line.strip()
+    if not stripped or len(stripped) > 40:
+        return None
+    match = SECTION_HEADING_PATTERN.match(stripped)
+    if match:
+        return _HEADING_SECTIONS[match.group("heading").lower()]
+    # Short all-caps lines ("HOBBYS") are headings in many layouts
+    letters = [ch for ch in stripped if ch.isalpha()]
+    if len(letters) >= 4 and all(ch.isupper() for ch in letters):
+        return "other"
+    return None
+
+def normalize_date(value: str) -> str:
+    """
+    Bringt eine Datumsangabe ins Format MM/YYYY ('Heute' für laufende Stationen,
+    YYYY wenn kein Monat angegeben ist)
+    """
+    value = value.strip().rstrip(".").lower()
+    if value in _CURRENT.split("|"):
+        return "Heute"
+    match = re.match(r"(\d{1,2})[./]\s?(\d{4})$", value)
+    if match:
+        return f"{int(match.group(1)):02d}/{match.group(2)}"
+    match = re.match(r"([a-zäöü]+)\.?\s+(\d{4})$", value)
+    if match and match.group(1) in MONTHS:
+        return f"{MONTHS[match.group(1)]:02d}/{match.group(2)}"
+    return value
+
+def find_date_range(line: str) -> Optional[Dict[str, Any]]:
+    """
+    Erster Zeitraum in einer Zeile: {"start", "end", "rest"}, rest ist die
+    Zeile ohne den Zeitraum
+    """
+    match = DATE_RANGE_PATTERN.search(line)
+    if not match:
+        return None
+    if match.group("since"):
+        start, end = normalize_date(match.group("since")), "Heute"
+    else:
+        start, end = normalize_date(match.group("start")), normalize_date(match.group("end"))
+    rest = (line[:match.start()] + " " + line[match.end():]).strip(" \t|,;:-–—")
+    return {"start": start, "end": end, "rest": re.sub(r"\s{2,}", " ", rest)}
+
+def _find_phone(line: str) -> Optional[str]:
+    for match in PHONE_PATTERN.finditer(line):
+        candidate = match.group(0).strip()
+        digits = re.sub(r"\D", "", candidate)
+        # Date ranges ("01/2020 - 03/2022") look like numbers too
+        if 8 <= len(digits) <= 15 and not DATE_RANGE_PATTERN.search(candidate):
+            return candidate
+    return None
+
+def _looks_like_name(line: str) -> bool:
+    words = line.split()
+    if not 2 <= len(words) <= 4 or line.lower() in DOCUMENT_TITLES:
+        return False
+    return all(re.fullmatch(r"[A-ZÄÖÜ][\wäöüß'.-]*", word) and not any(ch.isdigit() for ch in word)
+               for word in words)
+
+def pre_parse_cv(text: str) -> Dict[str, Any]:
+    """
+    Regelbasierte Vorverarbeitung eines Lebenslauf-Texts.
+    Erkennt Kontaktdaten (E-Mail, Telefon, LinkedIn, Adresse/Stadt),
+    Zeiträume und Abschnitte. Rückgabe:
+    {"personal": {...}, "sections": {Abschnitt: Text}, "remainder": Text
+    ohne reine Kontaktzeilen, "stats": {...}}
+    """
+    personal: Dict[str, str] = {}
+    sections: Dict[str, List[str]] = {}
+    remainder: List[str] = []
+    date_ranges = 0
+    section = "header"
+
+    for line in text.splitlines():
+        stripped = line.strip()
+        heading = match_section_heading(stripped)
+        if heading:
+            section = heading
+            remainder.append(line)
+            continue
+        if not stripped:
+            sections.setdefault(section, []).append("")
+            remainder.append(line)
+            continue
+        sections.setdefault(section, []).append(stripped)
+
+        contact_only = False
+        found = {
+            "email": EMAIL_PATTERN.search(stripped),
+            "linkedin": LINKEDIN_PATTERN.search(stripped),
+        }
+        values = {field: match.group(0) for field, match in found.items() if match}
+        phone = _find_phone(stripped)
+        if phone:
+            values["phone"] = phone
+        if values:
+            for field, value in values.items():
+                personal.setdefault(field, value)
+            rest = stripped
+            for value in values.values():
+                rest = rest.replace(value, " ")
+            rest = _CONTACT_SEPARATORS.sub("", CONTACT_LABEL_PATTERN.sub("", rest))
+            contact_only = not rest
+        elif section in ("header", "personal") and "address" not in personal \
+                and POSTCODE_CITY_PATTERN.search(stripped) and len(stripped) <= 80:
+            personal["address"] = stripped
+            personal["city"] = extract_city_from_address(stripped)
+            contact_only = True
+
+        if section == "header" and "name" not in personal and _looks_like_name(stripped):
+            personal["name"] = stripped
+        if DATE_RANGE_PATTERN.search(stripped):
+            date_ranges += 1
+        if not contact_only:
+            remainder.append(line)
+
+    remainder_text = re.sub(r"\n{3,}", "\n\n", "\n".join(remainder)).strip()
+    return {
+        "personal": personal,
+        "sections": {name: "\n".join(lines).strip() for name, lines in sections.items()},
+        "remainder": remainder_text,
+        "stats": {
+            "chars_before": len(text),
+            "chars_after": len(remainder_text),
+            "fields": sorted(personal),
+            "sections": sorted(sections),
+            "date_ranges": date_ranges,
+        },
+    }
+
+def _split_title(rest: str, title_field: str, org_field: str) -> Dict[str, str]:
+    """'Entwickler bei Firma' / 'Entwickler, Firma' -> Titel + Organisation"""
+    parts = re.split(r"\s+(?:bei|at|@)\s+|\s*[,|]\s*", rest, maxsplit=1)
+    return {title_field: parts[0].strip(), org_field: parts[1].strip() if len(parts) > 1 else ""}
+
+def _entries_from_section(section_text: str, title_field: str, org_field: str) -> List[Dict[str, str]]:
+    """Eine Station pro Zeile mit Zeitraum; folgende Zeilen sind Titel bzw. Beschreibung"""
+    entries: List[Dict[str, str]] = []
+    current: Optional[Dict[str, Any]] = None
+    for line in section_text.splitlines():
+        line = line.strip(" \t•·-–*")
+        if not line:
+            continue
+        date_range = find_date_range(line)
+        if date_range:
+            current = {title_field: "", org_field: "", "start_date": date_range["start"],
+                       "end_date": date_range["end"], "description": []}
+            if date_range["rest"]:
+                current.update(_split_title(date_range["rest"], title_field, org_field))
+            entries.append(current)
+        elif current is not None:
+            if not current[title_field]:
+                current.update(_split_title(line, title_field, org_field))
+            elif not current[org_field]:
+                current[org_field] = line
+            else:
+                current["description"].append(line)
+    for entry in entries:
+        entry["description"] = " ".join(entry["description"])
+    return entries
+
+def heuristic_cv_data(parsed: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Lebenslauf-Daten nur aus den Regeln (ohne KI), im bekannten
+    personal/experience/...-Format - schnell, aber unvollständig (Triage)
+    """
+    sections = parsed["sections"]
+    personal = {"name": "", "city": "", "summary": ""}
+    personal.update(_exportable_personal(parsed))
+    if not personal["summary"] and sections.get("personal"):
+        personal["summary"] = " ".join(sections["personal"].split())
+
+    skills: List[str] = []
+    for item in re.split(r"[,;•·|\n]", sections.get("skills", "")):
+        item = item.strip(" \t-–*:")
+        if item and len(item) <= 60 and item.lower() not in (skill.lower() for skill in skills):
+            skills.append(item)
+
+    certifications = []
+    for line in sections.get("certifications", "").splitlines():
+        line = line.strip(" \t•·-–*")
+        if not line:
+            continue
+        date_range = find_date_range(line)
+        single_date = re.search(_DATE, line, re.IGNORECASE) if not date_range else None
+        if date_range:
+            name, date = date_range["rest"], date_range["end"]
+        elif single_date:
+            name = (line[:single_date.start()] + line[single_date.end():]).strip(" \t|,;:-–—()")
+            date = normalize_date(single_date.group(0))
+        else:
+            name, date = line, ""
+        certifications.append({**_split_title(name, "name", "issuer"), "date": date})
+
+    return {
+        "personal": personal,
+        "experience": _entries_from_section(sections.get("experience", ""), "position", "company"),
+        "education": _entries_from_section(sections.get("education", ""), "degree", "institution"),
+        "skills": skills,
+        "certifications": certifications,
+    }
+
+def _exportable_personal(parsed: Dict[str, Any]) -> Dict[str, str]:
+    """Lokal erkannte persönliche Daten ohne Kontaktdaten (siehe PRE_PARSE_PERSONAL_FIELDS)"""
+    return {field: value for field, value in parsed["personal"].items() if field in PRE_PARSE_PERSONAL_FIELDS}
+
+def apply_pre_parsed_fields(structured_data: Dict[str, Any], parsed: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Ergänzt die KI-Ergebnisse um die lokal erkannten persönlichen Daten
+    (die Kontaktzeilen wurden aus dem Prompt entfernt); KI-Werte haben Vorrang.
+    E-Mail, Telefon, Adresse und LinkedIn werden nicht übernommen.
+    """
+    personal = structured_data.get("personal")
+    if not isinstance(personal, dict):
+        personal = {}
+        structured_data["personal"] = personal
+    for field, value in _exportable_personal(parsed).items():
+        if not personal.get(field):
+            personal[field] = value
+    return structured_data
+
+# Accepted date values: MM/YYYY, YYYY or a "current" synonym (see CLEANING_RULES)
+VALID_DATE_PATTERN = re.compile(r"^(?:(?:0[1-9]|1[0-2])/)?(?:19|20)\d{2}$")
+
+def validate_cv_data(structured_data: Dict[str, Any]) -> List[str]:
+    """
+    Plausibilitätsprüfung eines Extraktionsergebnisses: Pflichtfelder
+    (REQUIRED_FIELDS), mindestens eine Berufsstation und Datumsformate.
+    Gibt die gefundenen Probleme zurück (leer = Ergebnis ist plausibel)
+    """
+    problems = []
+    current = {synonym.lower() for synonym in CLEANING_RULES["dates"]["current_synonyms"]} | set(_CURRENT.split("|"))
+
+    personal = structured_data.get("personal")
+    if not isinstance(personal, dict):
+        personal = {}
+        problems.append("personal: kein Objekt")
+    for field in REQUIRED_FIELDS["personal"]:
+        if not str(personal.get(field) or "").strip():
+            problems.append(f"personal.{field}: fehlt")
+
+    for section in ("experience", "education"):
+        entries = structured_data.get(section)
+        if not isinstance(entries, list):
+            problems.append(f"{section}: keine Liste")
+            continue
+        if section == "experience" and not entries:
+            problems.append("experience: leer")
+        for index, entry in enumerate(entries):
+            if not isinstance(entry, dict):
+                problems.append(f"{section}[{index}]: kein Objekt")
+                continue
+            for field in REQUIRED_FIELDS[section]:
+                if not str(entry.get(field) or "").strip():
+                    problems.append(f"{section}[{index}].{field}: fehlt")
+            for field in ("start_date", "end_date"):
+                value = str(entry.get(field) or "").strip()
+                if value and value.lower() not in current and not VALID_DATE_PATTERN.match(value):
+                    problems.append(f"{section}[{index}].{field}: ungültiges Datum '{value}'")
+
+    return problems
@@ -10,7 +10,6 @@ import uuid
 from datetime import datetime
 import base64
 from io import BytesIO
-import asyncio
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -19,7 +18,8 @@ load_dotenv()
 # Import our core modules
 import sys
 sys.path.append('backend')
-from core.extractor import extract_cv_data
+from core.extractor import stream_cv_data
+from core.openai_pool import iter_sync
 from core.template_renderer import render_profile_html
 from core.exporters import ProfileExporter
 
@@ -565,13 +565,28 @@ def show_upload_section():
                         st.error("Unsupported file type!")
                         return
                     
-                    # Extract data using AI (run async function)
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    extracted_data = loop.run_until_complete(
-                        extract_cv_data(file_bytes, file_type, os.getenv("OPENAI_API_KEY"))
-                    )
-                    loop.close()
+                    # Extract data using AI, streamed section by section
+                    # (async generator runs on the shared client pool loop)
+                    section_labels = {
+                        "personal": "Persönliche Daten",
+                        "experience": "Berufserfahrung",
+                        "education": "Ausbildung",
+                        "skills": "Fähigkeiten",
+                        "certifications": "Zertifizierungen"
+                    }
+                    progress_placeholder = st.empty()
+                    found_sections = []
+                    extracted_data = None
+                    for section, value in iter_sync(
+                        stream_cv_data(file_bytes, file_type, os.getenv("OPENAI_API_KEY"))
+                    ):
+                        if section is None:
+                            extracted_data = value
+                        elif section in section_labels:
+                            found_sections.append(section_labels[section])
+                            progress_placeholder.markdown(
+                                "\n".join(f"✅ {label} erkannt" for label in found_sections)
+                            )
                     
                     # Store in session state
                     st.session_state.cv_data = extracted_data